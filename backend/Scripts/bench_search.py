@@ -0,0 +1,147 @@
+# scripts/bench_search.py
+"""
+Benchmark search karya: ILIKE '%q%' lama vs full-text + trigram + prefix hash.
+
+Data dibuat di schema terpisah `bench_search` (tabel asli nggak disentuh):
+- N baris karya dummy (default 1 juta), judul dari kombinasi kata acak
+- tabel `plain` = tanpa index search (kondisi sekarang)
+- tabel `indexed` = kolom search_tsv + GIN tsvector + GIN pg_trgm + bpchar_pattern_ops
+
+Jalankan (dari folder backend, DATABASE_URL di .env / env):
+    python Scripts/bench_search.py --rows 1000000 --repeat 5
+    python Scripts/bench_search.py --reuse          # pakai data yang sudah dibuat
+    python Scripts/bench_search.py --drop           # hapus schema bench_search
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+for k, v in {
+    "JWT_SECRET": "bench",
+    "SEPOLIA_RPC": "http://localhost:8545",
+    "KREARSIP_V2_ADDRESS": "0x" + "0" * 40,
+    "REGISTRAR_PRIVATE_KEY": "0x" + "1" * 64,
+    "REGISTRAR_ADDRESS": "0x" + "0" * 40,
+}.items():
+    os.environ.setdefault(k, v)
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.utils.search import build_search  # noqa: E402
+
+WORDS = [
+    "lagu", "puisi", "lukisan", "foto", "novel", "cerpen", "desain", "logo", "musik", "video",
+    "senja", "hujan", "laut", "gunung", "kota", "rindu", "cinta", "malam", "pagi", "jalan",
+    "nusantara", "batik", "wayang", "kopi", "merah", "biru", "emas", "angin", "bulan", "bintang",
+]
+
+QUERIES = ["senja", "batik nusantara", "lagu rindu malam", "ujan", "xyz-nggak-ada"]
+
+SETUP_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE SCHEMA IF NOT EXISTS bench_search",
+    "DROP TABLE IF EXISTS bench_search.plain, bench_search.indexed",
+    """
+    CREATE TABLE bench_search.plain AS
+    SELECT
+        gen_random_uuid() AS id,
+        initcap(
+            (CAST(:words AS text[]))[1 + (random() * (cardinality(CAST(:words AS text[])) - 1))::int] || ' ' ||
+            (CAST(:words AS text[]))[1 + (random() * (cardinality(CAST(:words AS text[])) - 1))::int] || ' ' ||
+            (CAST(:words AS text[]))[1 + (random() * (cardinality(CAST(:words AS text[])) - 1))::int]
+        ) || ' #' || g AS judul,
+        CAST(encode(sha256(CAST(g::text AS bytea)), 'hex') AS character(64)) AS hash_berkas,
+        now() - (random() * interval '365 days') AS updated_at
+    FROM generate_series(1, :rows) g
+    """,
+    "CREATE TABLE bench_search.indexed AS SELECT * FROM bench_search.plain",
+    """
+    ALTER TABLE bench_search.indexed
+      ADD COLUMN search_tsv tsvector
+      GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(judul, ''))) STORED
+    """,
+    "CREATE INDEX ON bench_search.indexed USING gin (search_tsv)",
+    "CREATE INDEX ON bench_search.indexed USING gin (judul gin_trgm_ops)",
+    "CREATE INDEX ON bench_search.indexed (hash_berkas bpchar_pattern_ops)",
+    "ANALYZE bench_search.plain",
+    "ANALYZE bench_search.indexed",
+]
+
+
+async def setup(engine, rows: int) -> None:
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        for stmt in SETUP_SQL:
+            await conn.execute(text(stmt), {"words": WORDS, "rows": rows})
+    print(f"setup {rows} baris: {time.perf_counter() - t0:.1f}s")
+
+
+async def timed(conn, sql: str, params: dict, repeat: int) -> tuple[float, int]:
+    samples = []
+    n = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len((await conn.execute(text(sql), params)).all())
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), n
+
+
+async def run(engine, repeat: int, limit: int) -> None:
+    async with engine.connect() as conn:
+        hash_sample = (
+            await conn.execute(text("SELECT hash_berkas FROM bench_search.plain LIMIT 1"))
+        ).scalar_one()
+        queries = QUERIES + [hash_sample[:10]]
+
+        print(f"{'q':<22} {'ILIKE (ms)':>11} {'baru (ms)':>10} {'speedup':>8}  hasil")
+        for q in queries:
+            old_sql = f"""
+                SELECT id FROM bench_search.plain k
+                WHERE k.judul ILIKE :q_old OR k.hash_berkas ILIKE :q_old
+                ORDER BY k.updated_at DESC LIMIT {limit}
+            """
+            old_ms, old_n = await timed(conn, old_sql, {"q_old": f"%{q}%"}, repeat)
+
+            where, rank, params = build_search(q)
+            new_sql = f"""
+                SELECT id FROM bench_search.indexed k
+                WHERE {where}
+                ORDER BY {rank} DESC, k.updated_at DESC LIMIT {limit}
+            """
+            new_ms, new_n = await timed(conn, new_sql, params, repeat)
+            print(f"{q:<22} {old_ms:>11.1f} {new_ms:>10.1f} {old_ms / max(new_ms, 0.001):>7.1f}x  {old_n}/{new_n}")
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--reuse", action="store_true", help="skip generate data")
+    ap.add_argument("--drop", action="store_true", help="hapus schema bench_search lalu keluar")
+    args = ap.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        if args.drop:
+            async with engine.begin() as conn:
+                await conn.execute(text("DROP SCHEMA IF EXISTS bench_search CASCADE"))
+            return
+        if not args.reuse:
+            await setup(engine, args.rows)
+        await run(engine, args.repeat, args.limit)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,16 @@
-from pathlib import Path
-import json
-
 from web3 import Web3
 from eth_account import Account
 
 from app.core.config import settings
+from app.eth.provider import load_abi, provider
+from app.services.fee_oracle import fee_oracle
 
-w3 = Web3(Web3.HTTPProvider(settings.SEPOLIA_RPC))
+w3 = provider.w3
 
-ABI_PATH = Path(__file__).parent / "KrearsipV2.abi.json"
-with ABI_PATH.open() as f:
-    KREARSIP_ABI = json.load(f)
+# ABI dari artifact yang sama dengan app/eth (dulu KrearsipV2.abi.json terpisah di folder ini)
+KREARSIP_ABI = list(load_abi("KrearsipV2"))
 
-KREARSIP_CONTRACT = w3.eth.contract(
-    address=Web3.to_checksum_address(settings.KREARSIP_V2_ADDRESS),
-    abi=KREARSIP_ABI,
-)
+KREARSIP_CONTRACT = provider.contract(settings.KREARSIP_V2_ADDRESS, "KrearsipV2")
 
 DEPLOYER = Account.from_key(settings.KREARSIP_DEPLOYER_PRIVATE_KEY)
 
@@ -32,16 +27,30 @@ async def send_register_tx(hash_berkas_hex: str, title: str, creator_address: st
 
     nonce = w3.eth.get_transaction_count(DEPLOYER.address)
 
-    tx = KREARSIP_CONTRACT.functions.registerWork(
+    # fee dari cache feeHistory per blok, gas per bucket panjang title (lihat fee_oracle)
+    call = KREARSIP_CONTRACT.functions.registerWork(
         file_hash_bytes32,
         creator,
         title,
-    ).build_transaction({
+    )
+    fees = await fee_oracle.fees()
+    gas = await fee_oracle.gas_limit(
+        title,
+        {
+            "from": DEPLOYER.address,
+            "to": KREARSIP_CONTRACT.address,
+            "data": KREARSIP_CONTRACT.encodeABI(
+                fn_name="registerWork", args=[file_hash_bytes32, creator, title]
+            ),
+        },
+    )
+
+    tx = call.build_transaction({
         "from": DEPLOYER.address,
         "nonce": nonce,
-        "gas": 300_000,
-        "maxFeePerGas": w3.to_wei("2", "gwei"),
-        "maxPriorityFeePerGas": w3.to_wei("1", "gwei"),
+        "gas": gas,
+        "maxFeePerGas": fees.max_fee,
+        "maxPriorityFeePerGas": fees.priority_fee,
         "chainId": 11155111,  # Sepolia
     })
 
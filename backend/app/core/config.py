@@ -5,6 +5,10 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # --- DB (Supabase) ---
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10          # koneksi yang dijaga tetap terbuka per proses
+    DB_MAX_OVERFLOW: int = 10       # koneksi tambahan saat ramai (ditutup lagi setelah dipakai)
+    DB_POOL_TIMEOUT: float = 30.0   # detik nunggu koneksi kosong
+    DB_POOL_RECYCLE: int = 1800     # detik, tutup koneksi tua sebelum diputus pooler Supabase
 
     # --- Admin ---
     ADMIN_API_TOKEN: str = ""
@@ -16,16 +20,133 @@ class Settings(BaseSettings):
     JWT_EXPIRE_MIN: int = 120
     JWT_ALGORITHM: str = "HS256"
 
+    PRINCIPAL_CACHE_TTL: float = 60.0   # detik, cache hasil decode JWT + user
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
     # --- SIWE ---
     SIWE_DOMAIN: str = "localhost"
     SIWE_URI: str = "http://localhost:3000"
+    NONCE_STORE: str = "db"             # "db" (multi worker) / "memory" (1 proses, dev)
+    NONCE_TTL: int = 600                # detik
+    NONCE_MEMORY_MAXSIZE: int = 10_000
+    NONCE_PURGE_INTERVAL: float = 300.0
+
+    # --- Upload file (hash SHA-256 di server) ---
+    UPLOAD_MAX_BYTES: int = 10 * 1024 ** 3   # 10 GiB, 0 = tanpa batas
+    UPLOAD_HASH_CHUNK: int = 1024 * 1024     # byte per update hash (di thread)
+    UPLOAD_SPOOL_DIR: str = "/tmp/krearsip-uploads"  # upload resumable (per mesin)
+    UPLOAD_CHUNK_MAX: int = 64 * 1024 ** 2   # byte per PUT chunk
+    UPLOAD_SESSION_TTL: float = 24 * 3600.0  # detik
+
+    # --- Verifikasi publik (POST /public/verify/batch) ---
+    VERIFY_BATCH_MAX: int = 5000
+    VERIFY_ONCHAIN_MAX: int = 50            # maks hash per request kalau onchain=true (1 eth_call per hash)
+    BLOOM_ENABLED: bool = True              # bloom filter hash terdaftar (skip DB untuk miss)
+    BLOOM_CAPACITY: int = 1_000_000
+    BLOOM_FP_RATE: float = 0.001
+    BLOOM_REFRESH_INTERVAL: float = 5.0     # detik, refresh delta dari DB
+    BLOOM_REFRESH_OVERLAP: float = 60.0     # detik mundur dari refresh terakhir (transaksi telat commit)
+
+    # --- Executor kripto (recover signature SIWE) ---
+    CRYPTO_EXECUTOR: str = "thread"     # "thread" / "process"
+    CRYPTO_WORKERS: int = 0             # 0 = min(8, jumlah CPU)
+    CRYPTO_MAX_PENDING: int = 256       # batas job jalan + antri
+    CRYPTO_QUEUE_TIMEOUT: float = 5.0   # detik nunggu slot sebelum 503
 
     # --- RPC On-chain (untuk sync ke Sepolia) ---
-    SEPOLIA_RPC: str
-    KREARSIP_V2_ADDRESS: str
-    REGISTRAR_PRIVATE_KEY: str
-    REGISTRAR_ADDRESS: str
+    # boleh kosong (mis. replika read-only): fitur chain baru error saat dipakai, bukan saat start
+    SEPOLIA_RPC: str = ""
+    KREARSIP_V2_ADDRESS: str = ""
+    REGISTRAR_PRIVATE_KEY: str = ""
+    REGISTRAR_ADDRESS: str = ""
     CHAIN_ID: int = 11155111  # Sepolia
+    # key registrar tambahan (dipisah koma), masing-masing harus isRegistrar di kontrak
+    REGISTRAR_PRIVATE_KEYS: str = ""
+    REGISTRAR_MAX_FAILURES: int = 3        # gagal beruntun sebelum lane di-cooldown
+    REGISTRAR_COOLDOWN_SECONDS: float = 60.0
+
+    # --- JSON-RPC client (shared, raw httpx) ---
+    RPC_TIMEOUT: float = 10.0
+    RPC_MAX_CONNECTIONS: int = 20
+    RPC_BATCH_SIZE: int = 100   # max item per JSON-RPC batch array
+    RPC_HTTP2: bool = True      # aktif kalau paket `h2` terpasang
+    # beberapa endpoint dipisah koma (kosong = SEPOLIA_RPC saja)
+    RPC_URLS: str = ""
+    RPC_EWMA_ALPHA: float = 0.2         # bobot sampel latency terbaru
+    RPC_BREAKER_FAILURES: int = 3       # gagal beruntun -> endpoint di-skip...
+    RPC_BREAKER_COOLDOWN: float = 30.0  # ...selama segini detik
+    RPC_HEDGE: bool = True              # hedge call read-only ke endpoint kedua setelah p95
+    RPC_HEDGE_MIN_DELAY: float = 0.05   # detik, jeda minimal sebelum hedge
+    # kuota provider (token bucket, dipakai rpc_client + provider Web3)
+    RPC_RATE_LIMIT: float = 0.0         # request/detik, 0 = tanpa limit
+    RPC_RATE_BURST: float = 0.0         # kapasitas bucket, 0 = sama dengan RPC_RATE_LIMIT
+    RPC_RATE_INTERACTIVE_RESERVE: float = 0.2  # porsi bucket yang cuma boleh dipakai aksi admin
+
+    # --- Provider Web3 shared (app/eth/provider.py) ---
+    WEB3_POOL_SIZE: int = 20    # koneksi keep-alive maksimal (sync & async)
+    WEB3_TIMEOUT: float = 10.0
+    WEB3_RETRIES: int = 2       # retry gagal connect saja
+
+    # --- Block cache (block_number -> timestamp, hash) ---
+    BLOCK_CACHE_SIZE: int = 10_000
+    BLOCK_CACHE_TTL: float = 120.0             # detik, untuk blok yang belum final
+    BLOCK_CACHE_FINALITY_DEPTH: int = 64       # blok <= head - N dianggap final
+    BLOCK_CACHE_PERSIST: bool = True           # simpan blok final ke tabel block_cache
+
+    # --- Deploy queue (worker background untuk registerWork) ---
+    DEPLOY_WORKERS: int = 2            # 0 = worker nggak dijalankan di proses ini
+    DEPLOY_POLL_INTERVAL: float = 2.0  # detik, jeda kalau antrian kosong
+    DEPLOY_RETRY_BACKOFF: float = 10.0 # detik, jeda setelah error RPC
+    DEPLOY_MODE: str = "single"        # "single" (1 tx per karya) / "merkle" (1 tx per batch)
+    MERKLE_BATCH_MAX: int = 256        # karya per batch
+    MERKLE_BATCH_MIN: int = 16         # kirim kalau sudah segini...
+    MERKLE_MAX_WAIT: float = 60.0      # ...atau job tertua sudah nunggu segini detik
+    DEPLOY_PREFLIGHT: bool = True          # cek duplikat / simulasi sebelum kirim tx (lihat preflight)
+    DEPLOY_PREFLIGHT_SIMULATE: bool = True # eth_call registerWork, bukan cuma isRegistered
+
+    # --- Fee & gas registerWork (fee_oracle) + replacement tx nyangkut (tx_replacer) ---
+    FEE_HISTORY_BLOCKS: int = 20
+    FEE_PRIORITY_PERCENTILE: float = 50.0
+    FEE_BASE_MULTIPLIER: float = 2.0   # maxFee = baseFee * ini + priority (tahan baseFee naik beberapa blok)
+    FEE_MIN_PRIORITY_GWEI: float = 1.0
+    FEE_MAX_GWEI: float = 30.0         # batas atas maxFee (juga fee fallback kalau RPC gagal)
+    FEE_CACHE_TTL: float = 12.0        # detik, maksimal umur fee (~1 blok)
+    GAS_MARGIN: float = 1.2            # pengali hasil eth_estimateGas
+    GAS_FALLBACK: int = 200_000        # kalau estimasi gagal
+    TX_REPLACER_ENABLED: bool = True
+    TX_REPLACER_INTERVAL: float = 30.0
+    TX_STUCK_BLOCKS: int = 10          # pending lebih dari ini -> kirim ulang fee lebih tinggi
+    TX_BUMP_PERCENT: float = 12.5      # node minta minimal +10%
+    TX_REPLACE_MAX: int = 5
+
+    # --- Receipt watcher (auto sync status_onchain) ---
+    RECEIPT_WATCHER_ENABLED: bool = True
+    RECEIPT_CONFIRMATIONS: int = 2      # 1 = cukup masuk blok
+    RECEIPT_POLL_MIN: float = 3.0       # detik, kalau ada tx pending
+    RECEIPT_POLL_MAX: float = 60.0      # detik, batas atas backoff kalau idle
+    RECEIPT_BATCH_SIZE: int = 200
+
+    # --- Event indexer WorkRegistered (mirror registry on-chain) ---
+    INDEXER_ENABLED: bool = False
+    INDEXER_START_BLOCK: int = 0        # isi dengan blok deploy KrearsipV2
+    INDEXER_CONFIRMATIONS: int = 5      # index sampai latest - N
+    INDEXER_REORG_DEPTH: int = 20       # mundur berapa blok kalau reorg
+    INDEXER_MAX_RANGE: int = 2000       # range eth_getLogs maksimal
+    INDEXER_POLL_INTERVAL: float = 12.0
+
+    # --- Search karya ---
+    # harus sama dengan config di kolom generated karya.search_tsv (docs/schema.sql)
+    SEARCH_TS_CONFIG: str = "simple"
+
+    # --- Count cache (total list endpoint, total_mode=cached) ---
+    COUNT_CACHE_TTL: float = 30.0
+    COUNT_CACHE_SIZE: int = 1000
+
+    # --- Warmup saat startup (GET /readyz baru 200 setelah selesai) ---
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 5      # koneksi DB yang dibuka duluan (maks DB_POOL_SIZE)
+    WARMUP_RPC_CONNECTIONS: int = 4     # koneksi keep-alive per endpoint RPC
+    WARMUP_TIMEOUT: float = 60.0        # detik per langkah warmup
 
 
     # Pydantic v2 style: ganti class Config dengan model_config
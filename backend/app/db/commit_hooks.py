@@ -0,0 +1,67 @@
+# app/db/commit_hooks.py
+"""
+Callback "tabel X ditulis" yang baru jalan SETELAH transaksi commit (dipakai invalidasi cache).
+
+- listener `after_cursor_execute` di engine: statement yang cocok regex hook -> koneksinya ditandai
+  (Connection.info, raw SQL maupun ORM)
+- Session `after_begin` mencatat koneksi yang dipakai transaksi session
+- Session `after_commit` -> callback hook yang koneksinya ditandai dipanggil (sekali per commit);
+  `after_rollback` cuma buang tanda
+Invalidasi sebelum commit bikin reader yang jalan barengan bisa nge-cache ulang data lama
+sampai TTL habis. Cuma berlaku per proses; penulisan lewat engine.connect() langsung (tanpa
+Session) baru ketahuan di commit session berikutnya yang pakai koneksi itu.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+
+_DIRTY = "commit_hooks_dirty"     # di Connection.info: nama hook yang statement-nya sudah jalan
+_CONNS = "commit_hooks_conns"     # di Session.info: koneksi yang dipakai transaksi session
+
+_hooks: dict[str, tuple[re.Pattern, Callable[[], None]]] = {}
+
+
+def on_commit_after_write(name: str, pattern: re.Pattern, callback: Callable[[], None]) -> None:
+    """Daftarkan callback: dipanggil setelah commit transaksi yang menjalankan statement cocok `pattern`."""
+    _hooks[name] = (pattern, callback)
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _mark_write(conn, cursor, statement, parameters, context, executemany):
+    for name, (pattern, _) in _hooks.items():
+        if pattern.match(statement):
+            conn.info.setdefault(_DIRTY, set()).add(name)
+
+
+@event.listens_for(Session, "after_begin")
+def _track_connection(session, transaction, connection):
+    session.info.setdefault(_CONNS, set()).add(connection)
+
+
+def _pop_dirty(session) -> set[str]:
+    dirty: set[str] = set()
+    for conn in session.info.pop(_CONNS, ()):
+        try:
+            dirty |= conn.info.pop(_DIRTY, set())
+        except Exception:  # koneksi sudah ditutup / invalid
+            pass
+    return dirty
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for name in _pop_dirty(session):
+        hook = _hooks.get(name)
+        if hook is not None:
+            hook[1]()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    _pop_dirty(session)
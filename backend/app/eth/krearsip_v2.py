@@ -1,23 +1,18 @@
 # app/eth/krearsip_v2.py
-from pathlib import Path
-import json
-from web3 import Web3
 from app.core.config import settings
+from app.eth.provider import load_abi, provider
 
-BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend/app
-ARTIFACT_PATH = BASE_DIR / "eth_artifacts" / "KrearsipV2.json"
-
-with ARTIFACT_PATH.open() as f:
-    artifact = json.load(f)
+KREARSIP_V2_ADDRESS = settings.KREARSIP_V2_ADDRESS  # dari env
 
-KREARSIP_V2_ABI = artifact["abi"]
 
-KREARSIP_V2_ADDRESS = settings.KREARSIP_V2_ADDRESS  # dari env
+def __getattr__(name: str):
+    # lazy: ABI / Web3 baru dibuat saat pertama diakses, bukan waktu import
+    if name == "KREARSIP_V2_ABI":
+        return list(load_abi("KrearsipV2"))
+    if name == "w3":
+        return provider.w3  # Web3 shared (pool koneksi dari provider manager)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-w3 = Web3(Web3.HTTPProvider(settings.SEPOLIA_RPC))
 
 def get_krearsip_contract():
-    return w3.eth.contract(
-        address=Web3.to_checksum_address(KREARSIP_V2_ADDRESS),
-        abi=KREARSIP_V2_ABI,
-    )
+    return provider.contract(KREARSIP_V2_ADDRESS, "KrearsipV2")
@@ -0,0 +1,213 @@
+# app/eth/provider.py
+"""
+Provider Web3 tunggal untuk seluruh app (pengganti Web3(HTTPProvider(...)) per modul).
+
+- sync : 1 requests.Session dengan HTTPAdapter ber-pool (WEB3_POOL_SIZE koneksi keep-alive),
+         retry cuma untuk gagal connect (request belum terkirim -> aman, termasuk sendRawTransaction)
+- async: AsyncWeb3 + 1 aiohttp.ClientSession (dibuat lazy di event loop yang jalan)
+- ABI dibaca sekali dari app/eth_artifacts/<nama>.json, objek contract di-cache per (alamat, ABI)
+- nggak ada koneksi dibuka waktu import; socket baru dibuat saat call pertama
+  (paket web3 sendiri juga baru di-import saat handle pertama diminta -> cold start cepat)
+- tiap request (sync & async) ambil token dari rpc_limiter, kuota yang sama dengan rpc_client
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import requests
+from eth_utils import to_checksum_address
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+from app.services.rate_limit import rpc_limiter
+
+if TYPE_CHECKING:
+    from web3 import AsyncWeb3, Web3
+
+ARTIFACTS_DIR = Path(__file__).resolve().parent.parent / "eth_artifacts"
+
+
+@lru_cache(maxsize=None)
+def load_abi(name: str) -> tuple:
+    """ABI dari artifact Hardhat (di-cache; tuple biar nggak bisa diubah pemanggil)."""
+    with (ARTIFACTS_DIR / f"{name}.json").open() as f:
+        return tuple(json.load(f)["abi"])
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session yang nunggu token rpc_limiter sebelum tiap request (dipanggil dari thread)."""
+
+    def request(self, method, url, *args, **kwargs):
+        rpc_limiter.acquire_sync()
+        return super().request(method, url, *args, **kwargs)
+
+
+async def _on_request_start(session, ctx, params) -> None:
+    await rpc_limiter.acquire()
+
+
+class ProviderManager:
+    def __init__(
+        self,
+        url: str = settings.SEPOLIA_RPC,
+        pool_size: int = settings.WEB3_POOL_SIZE,
+        timeout: float = settings.WEB3_TIMEOUT,
+        retries: int = settings.WEB3_RETRIES,
+    ):
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._adapter: Optional[HTTPAdapter] = None
+        self._w3: Optional[Web3] = None
+        self._async_w3: Optional[AsyncWeb3] = None
+        self._async_session = None  # aiohttp.ClientSession
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._contracts: dict[tuple[str, str, bool], object] = {}
+
+    @staticmethod
+    def _checksum(address: str) -> str:
+        if not address:
+            raise RuntimeError("KREARSIP_V2_ADDRESS belum diset")
+        return to_checksum_address(address)
+
+    # ---------------- sync ----------------
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(total=self.retries, connect=self.retries, read=0, status=0, backoff_factor=0.2)
+        self._adapter = HTTPAdapter(
+            pool_connections=1,  # 1 host RPC
+            pool_maxsize=self.pool_size,
+            pool_block=True,  # lebih dari pool_size thread -> nunggu, bukan buka socket baru
+            max_retries=retry,
+        )
+        session = RateLimitedSession()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        return session
+
+    def _require_url(self) -> None:
+        if not self.url:
+            raise RuntimeError("SEPOLIA_RPC belum diset")
+
+    @property
+    def w3(self) -> Web3:
+        if self._w3 is None:
+            with self._lock:
+                if self._w3 is None:
+                    self._require_url()
+                    from web3 import Web3
+                    from web3.middleware import geth_poa_middleware
+
+                    self._session = self._build_session()
+                    w3 = Web3(
+                        Web3.HTTPProvider(
+                            self.url,
+                            request_kwargs={"timeout": self.timeout},
+                            session=self._session,
+                        )
+                    )
+                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                    self._w3 = w3
+        return self._w3
+
+    def contract(self, address: str = settings.KREARSIP_V2_ADDRESS, abi: str = "KrearsipV2"):
+        key = (self._checksum(address), abi, False)
+        c = self._contracts.get(key)
+        if c is None:
+            c = self._contracts[key] = self.w3.eth.contract(address=key[0], abi=list(load_abi(abi)))
+        return c
+
+    # ---------------- async ----------------
+
+    async def get_async_w3(self) -> AsyncWeb3:
+        if self._async_w3 is not None:
+            return self._async_w3
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._async_w3 is None:
+                self._require_url()
+                import aiohttp  # dependency web3, cuma dibutuhkan jalur async
+                from web3 import AsyncHTTPProvider, AsyncWeb3
+                from web3.middleware import async_geth_poa_middleware
+
+                provider = AsyncHTTPProvider(self.url)
+                limiter = aiohttp.TraceConfig()
+                limiter.on_request_start.append(_on_request_start)
+                self._async_session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    trace_configs=[limiter],
+                )
+                await provider.cache_async_session(self._async_session)
+                w3 = AsyncWeb3(provider)
+                w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+                self._async_w3 = w3
+        return self._async_w3
+
+    async def async_contract(self, address: str = settings.KREARSIP_V2_ADDRESS, abi: str = "KrearsipV2"):
+        key = (self._checksum(address), abi, True)
+        c = self._contracts.get(key)
+        if c is None:
+            w3 = await self.get_async_w3()
+            c = self._contracts[key] = w3.eth.contract(address=key[0], abi=list(load_abi(abi)))
+        return c
+
+    # ---------------- lifecycle & metrics ----------------
+
+    def warm(self, address: str = settings.KREARSIP_V2_ADDRESS) -> int:
+        """
+        Blocking (panggil lewat asyncio.to_thread): import web3, bangun objek contract
+        (ABI di-cache) dan buka 1 koneksi keep-alive sync. Return block number.
+        """
+        self.contract(address)
+        return self.w3.eth.block_number
+
+    async def aclose(self) -> None:
+        if self._async_session is not None:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_w3 = None
+        self._contracts = {k: v for k, v in self._contracts.items() if not k[2]}
+        if self._session is not None:
+            self._session.close()  # pool sync ditutup; dibuat lagi otomatis kalau masih dipakai
+
+    def stats(self) -> dict:
+        pools = []
+        if self._adapter is not None:
+            pools = [
+                self._adapter.poolmanager.pools[k] for k in list(self._adapter.poolmanager.pools.keys())
+            ]
+        opened = sum(p.num_connections for p in pools)
+        requests_sent = sum(p.num_requests for p in pools)
+        connector = self._async_session.connector if self._async_session is not None else None
+        return {
+            "url": self.url,
+            "pool_size": self.pool_size,
+            "sync": {
+                "ready": self._w3 is not None,
+                "connections_opened": opened,
+                "requests": requests_sent,
+                "idle_connections": sum(p.pool.qsize() for p in pools if p.pool is not None),
+                # 1.0 = tiap request buka socket baru; makin kecil makin banyak keep-alive dipakai ulang
+                "connections_per_request": round(opened / requests_sent, 4) if requests_sent else None,
+            },
+            "async": {
+                "ready": self._async_w3 is not None,
+                "limit": connector.limit if connector is not None else None,
+                "closed": connector.closed if connector is not None else None,
+            },
+            "contracts_cached": len(self._contracts),
+        }
+
+
+provider = ProviderManager()
@@ -1,13 +1,16 @@
 # app/eth/web3_client.py
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from app.eth.provider import provider
 
-from app.core.config import settings
 
-w3 = Web3(Web3.HTTPProvider(settings.SEPOLIA_RPC))
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+def __getattr__(name: str):
+    # instance shared dari provider manager (middleware PoA sudah dipasang di sana), dibuat lazy
+    if name == "w3":
+        return provider.w3
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def get_w3() -> Web3:
+
+def get_w3():
+    w3 = provider.w3
     if not w3.is_connected():
         raise RuntimeError("Web3 not connected to RPC")
     return w3
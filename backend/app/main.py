@@ -1,8 +1,69 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, works, public, admin
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.eth.provider import provider
+from app.routers import auth, works, public, admin, uploads
+from app.services.crypto_pool import crypto_pool
+from app.services.deploy_queue import deploy_pool
+from app.services.event_indexer import event_indexer
+from app.services.hash_bloom import hash_bloom
+from app.services.nonce_store import nonce_purger
+from app.services.onchain import chain, check_registrars
+from app.services.receipt_watcher import receipt_watcher
+from app.services.rpc_client import rpc_client
+from app.services.tx_replacer import tx_replacer
+from app.services.warmup import warmup
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warmup (pool DB, koneksi RPC, cache) jalan di background; /readyz 503 sampai selesai
+    warmup.start()
 
-app = FastAPI(title="Krearsip API", version="0.1.0")
+    rpc_ready = bool(rpc_client.endpoints)
+    chain_ready = chain.configured
+    if not chain_ready:
+        # replika read-only: API jalan, worker yang butuh chain nggak dijalankan
+        logger.warning(
+            "chain belum dikonfigurasi (%s kosong): deploy worker & tx replacer nggak dijalankan",
+            ", ".join(chain.missing()),
+        )
+
+    if settings.DEPLOY_WORKERS > 0 and chain_ready:
+        try:
+            for lane in await check_registrars():
+                if lane["authorized"] is False:
+                    logger.warning("registrar %s belum diotorisasi kontrak, lane di-skip", lane["address"])
+        except Exception as e:
+            logger.warning("cek otorisasi registrar gagal: %s", e)
+        deploy_pool.start()
+    if settings.RECEIPT_WATCHER_ENABLED and rpc_ready:
+        receipt_watcher.start()
+    if settings.TX_REPLACER_ENABLED and settings.DEPLOY_WORKERS > 0 and chain_ready:
+        tx_replacer.start()
+    if settings.INDEXER_ENABLED and rpc_ready and settings.KREARSIP_V2_ADDRESS:
+        event_indexer.start()
+    nonce_purger.start()
+    yield
+    await warmup.stop()
+    await hash_bloom.stop()
+    await nonce_purger.stop()
+    await event_indexer.stop()
+    await tx_replacer.stop()
+    await receipt_watcher.stop()
+    await deploy_pool.stop()
+    await rpc_client.aclose()
+    await provider.aclose()
+    crypto_pool.shutdown()
+
+
+app = FastAPI(title="Krearsip API", version="0.1.0", lifespan=lifespan)
 origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173"
@@ -18,7 +79,15 @@ app.include_router(auth.router)
 app.include_router(works.router)
 app.include_router(public.router)
 app.include_router(admin.router)
+app.include_router(uploads.router)
 
 @app.get("/healthz")
 async def health():
     return {"ok": True}
+
+@app.get("/readyz")
+async def ready():
+    """Beda dengan /healthz: 503 selama instance masih warmup (jangan dikasih traffic dulu)."""
+    if not warmup.ready and not await warmup.recheck():
+        return JSONResponse(status_code=503, content={"ok": False, **warmup.stats()})
+    return {"ok": True, **warmup.stats()}
@@ -0,0 +1,83 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class WorkEventRepository:
+    """Query ke mirror lokal event WorkRegistered (pengganti eth_call isRegistered/getWork)."""
+
+    @staticmethod
+    async def get_work(session: AsyncSession, file_hash: str):
+        q = text("""
+            SELECT file_hash, creator, registrar, title, registered_at,
+                   block_number, tx_hash
+            FROM work_registered_event
+            WHERE file_hash = lower(:h)
+            ORDER BY block_number DESC
+            LIMIT 1
+        """)
+        row = await session.execute(q, {"h": file_hash})
+        return row.mappings().first()
+
+    @staticmethod
+    async def is_registered(session: AsyncSession, file_hash: str) -> bool:
+        return await WorkEventRepository.get_work(session, file_hash) is not None
+
+    @staticmethod
+    async def get_many(session: AsyncSession, file_hashes: list[str]):
+        q = text("""
+            SELECT DISTINCT ON (file_hash)
+                   file_hash, creator, registrar, title, registered_at,
+                   block_number, tx_hash
+            FROM work_registered_event
+            WHERE file_hash = ANY(CAST(:hs AS text[]))
+            ORDER BY file_hash, block_number DESC
+        """)
+        rs = await session.execute(q, {"hs": [h.lower() for h in file_hashes]})
+        return {r["file_hash"]: r for r in rs.mappings().all()}
+
+    @staticmethod
+    async def reconcile(session: AsyncSession, limit: int = 100):
+        """
+        Bandingkan DB vs chain (mirror):
+        - missing_onchain: karya berhasil on-chain di DB tapi event-nya nggak ada
+          (karya batch Merkle dicocokkan lewat root batch-nya)
+        - unknown_onchain: event ada tapi nggak ada karya dengan hash itu
+        - tx_mismatch: event & karya ada tapi tx_hash beda
+        """
+        missing = await session.execute(text("""
+            SELECT k.id::text AS id, k.hash_berkas, k.tx_hash, k.block_number
+            FROM karya k
+            LEFT JOIN batch_anchor b ON b.id = k.batch_id
+            WHERE k.status_onchain = 'berhasil'
+              AND NOT EXISTS (
+                SELECT 1 FROM work_registered_event e
+                WHERE e.file_hash = COALESCE(b.merkle_root, k.hash_berkas)
+              )
+            ORDER BY k.block_number
+            LIMIT :n
+        """), {"n": limit})
+        unknown = await session.execute(text("""
+            SELECT e.file_hash, e.tx_hash, e.block_number, e.creator
+            FROM work_registered_event e
+            WHERE NOT EXISTS (
+                SELECT 1 FROM karya k WHERE k.hash_berkas = e.file_hash
+            )
+              AND NOT EXISTS (
+                SELECT 1 FROM batch_anchor b WHERE b.merkle_root = e.file_hash
+            )
+            ORDER BY e.block_number
+            LIMIT :n
+        """), {"n": limit})
+        mismatch = await session.execute(text("""
+            SELECT k.id::text AS id, k.hash_berkas, k.tx_hash AS karya_tx, e.tx_hash AS event_tx
+            FROM karya k
+            LEFT JOIN batch_anchor b ON b.id = k.batch_id
+            JOIN work_registered_event e ON e.file_hash = COALESCE(b.merkle_root, k.hash_berkas)
+            WHERE k.tx_hash IS DISTINCT FROM e.tx_hash
+            LIMIT :n
+        """), {"n": limit})
+        return {
+            "missing_onchain": missing.mappings().all(),
+            "unknown_onchain": unknown.mappings().all(),
+            "tx_mismatch": mismatch.mappings().all(),
+        }
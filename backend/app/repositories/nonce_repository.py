@@ -3,13 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 class NonceRepository:
     @staticmethod
-    async def create(session: AsyncSession, wallet: str, nonce: str):
+    async def create(session: AsyncSession, wallet: str, nonce: str, ttl_seconds: int = 600):
         q = text("""
             INSERT INTO auth_nonce (alamat_wallet, nonce, expired_at)
-            VALUES (lower(:w), :n, NOW() + INTERVAL '10 minutes')
+            VALUES (lower(:w), :n, NOW() + make_interval(secs => :ttl))
             RETURNING id
         """)
-        row = await session.execute(q, {"w": wallet, "n": nonce})
+        row = await session.execute(q, {"w": wallet, "n": nonce, "ttl": ttl_seconds})
         return row.mappings().first()
 
     @staticmethod
@@ -23,6 +23,31 @@ class NonceRepository:
         row = await session.execute(q, {"w": wallet})
         return row.mappings().first()
 
+    @staticmethod
+    async def consume(session: AsyncSession, wallet: str, nonce: str) -> bool:
+        """Cek + hapus nonce dalam 1 statement (aman kalau 2 request pakai nonce yang sama)."""
+        q = text("""
+            DELETE FROM auth_nonce
+            WHERE alamat_wallet = lower(:w) AND nonce = :n AND expired_at > NOW()
+            RETURNING id
+        """)
+        row = await session.execute(q, {"w": wallet, "n": nonce})
+        return row.first() is not None
+
+    @staticmethod
+    async def purge_expired(session: AsyncSession, batch_size: int = 1000) -> int:
+        q = text("""
+            DELETE FROM auth_nonce
+            WHERE id IN (
+                SELECT id FROM auth_nonce
+                WHERE expired_at <= NOW()
+                LIMIT :n
+                FOR UPDATE SKIP LOCKED
+            )
+        """)
+        rs = await session.execute(q, {"n": batch_size})
+        return rs.rowcount or 0
+
     @staticmethod
     async def delete_by_id(session: AsyncSession, id_: str):
         q = text("DELETE FROM auth_nonce WHERE id = :id")
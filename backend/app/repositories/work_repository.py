@@ -25,7 +25,7 @@ class WorkRepository:
                 status = 'on_chain',
                 updated_at = NOW()
             WHERE id = :kid AND pengguna_id = :uid
-            RETURNING id, judul, tx_hash, alamat_kontrak, jaringan_ket, waktu_blok, status
+            RETURNING id, judul, hash_berkas, tx_hash, alamat_kontrak, jaringan_ket, waktu_blok, status
         """)
         row = await session.execute(q, {
             "kid": karya_id,
@@ -7,19 +7,37 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from jose import jwt
-import httpx
 from datetime import datetime, timezone
 
 from app.core.config import settings
 from app.db.session import get_session
 # from app.routers.works import get_current_user
 from app.routers.auth import get_admin_user
-from app.schemas.admin_works import AdminWorksListResponse, AdminWorkItem, AdminWorkCreator, AdminWorkVerifier, RejectBody
+from app.schemas.admin_works import AdminWorksListResponse, AdminWorkItem, AdminWorkCreator, AdminWorkVerifier, RejectBody, SyncTxBulkBody
 # from app.blockchain.krearsip import send_register_tx
-from app.services.onchain import send_register_tx_for_karya, sync_tx_for_karya    
+from app.utils.pagination import decode_cursor, next_cursor
+from app.services.count_cache import count_cache, count_total
+from app.services.crypto_pool import crypto_pool
+from app.services.hash_bloom import hash_bloom
+from app.services.merkle_anchor import process_next_batch
+from app.services.nonce_store import nonce_store
+from app.services.principal_cache import principal_cache
+from app.services.preflight import preflight_stats, skip_report
+from app.services.fee_oracle import fee_oracle
+from app.services.tx_replacer import tx_replacer
+from app.services.rate_limit import interactive_rpc, rpc_limiter
+from app.eth.provider import provider
+from app.services.onchain import chain, check_registrars, sync_tx_for_karya, sync_txs
+from app.services.receipt_watcher import receipt_watcher
+from app.services.block_cache import block_cache
+from app.services.event_indexer import event_indexer
+from app.repositories.event_repository import WorkEventRepository
+from app.services.rpc_client import RpcError, RpcTransportError, rpc_client
+from app.services.deploy_queue import enqueue_deploy
 # from app.blockchain.krearsip import w3
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+# semua call RPC dari endpoint admin masuk lane "interactive" rate limiter
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(interactive_rpc)])
 security = HTTPBearer()
 
 
@@ -66,78 +84,155 @@ ONCHAIN_GAGAL = "gagal"
 
 # --- Helper: call RPC Sepolia ---
 
+def _rpc_http_error(e: RpcError) -> HTTPException:
+    # masalah jaringan -> 502, error dari node / respon aneh -> 400
+    if isinstance(e, RpcTransportError):
+        return HTTPException(status_code=502, detail=str(e))
+    return HTTPException(status_code=400, detail=str(e))
+
+
 async def fetch_tx_receipt(tx_hash: str):
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                settings.SEPOLIA_RPC,
-                json={
-                    "jsonrpc": "2.0",
-                    "method": "eth_getTransactionReceipt",
-                    "params": [tx_hash],
-                    "id": 1,
-                },
-            )
-    except httpx.RequestError as e:
-        # Masalah jaringan / DNS / dll
-        raise HTTPException(status_code=502, detail=f"RPC connection error: {e}")
+        return await rpc_client.call("eth_getTransactionReceipt", [tx_hash])
+    except RpcError as e:
+        raise _rpc_http_error(e)
 
-    # Respon HTTP 200 dan JSON
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=400,
-            detail=f"RPC HTTP {resp.status_code}: {resp.text[:200]}",
-        )
 
+async def fetch_block(block_number_hex: str):
+    """Info blok (number/hash/timestamp, hex) lewat block_cache -- bukan full block."""
+    try:
+        info = await block_cache.get(int(block_number_hex, 16))
+    except RpcError as e:
+        raise _rpc_http_error(e)
+    return {"number": hex(info.number), "hash": info.hash, "timestamp": hex(info.timestamp)}
+
+@router.get("/debug/rpc", summary="Lihat RPC yang dipakai backend")
+async def debug_rpc():
+    return {"sepolia_rpc": settings.SEPOLIA_RPC, "rpc_urls": [e.url for e in rpc_client.endpoints]}
+
+@router.get("/registrars", summary="Status pool registrar (lane nonce + health)")
+async def admin_registrars(user=Depends(get_admin_user)):
     try:
-        data = resp.json()
+        return {"items": await check_registrars()}
     except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"RPC response is not JSON: {e}; body={resp.text[:200]}",
-        )
+        raise HTTPException(status_code=502, detail=f"Gagal cek registrar: {e}")
+
+@router.get("/metrics", summary="Statistik runtime (cache, executor, worker background)")
+async def admin_metrics(user=Depends(get_admin_user)):
+    return {
+        "crypto_pool": crypto_pool.stats(),
+        "count_cache": count_cache.stats(),
+        "block_cache": block_cache.stats(),
+        "hash_bloom": hash_bloom.stats(),
+        "nonce_store": nonce_store.stats(),
+        "principal_cache": principal_cache.stats(),
+        "registrars": chain.registrar_pool.stats() if chain.configured else [],
+        "chain_missing_settings": chain.missing(),
+        "receipt_watcher": receipt_watcher.stats(),
+        "event_indexer": event_indexer.stats(),
+        "deploy_preflight": preflight_stats.as_dict(),
+        "fee_oracle": fee_oracle.stats(),
+        "tx_replacer": tx_replacer.stats(),
+        "web3_provider": provider.stats(),
+        "rpc_client": rpc_client.stats(),
+        "rpc_limiter": rpc_limiter.stats(),
+        "warmup": warmup.stats(),
+    }
+
+@router.get("/deploy/preflight", summary="Rekap tx registerWork yang dilewati preflight")
+async def admin_preflight_report(
+    days: int = Query(30, ge=1, le=365),
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await skip_report(session, days)
 
-    if "error" in data:
-        raise HTTPException(status_code=400, detail=f"RPC error: {data['error']}")
-    return data.get("result")
+@router.post("/bloom/rebuild", summary="Bangun ulang bloom filter hash terdaftar dari DB")
+async def admin_bloom_rebuild(user=Depends(get_admin_user)):
+    try:
+        return await hash_bloom.build()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rebuild bloom filter gagal: {e}")
+
+@router.get("/batches", summary="List batch Merkle yang sudah di-anchor")
+async def admin_list_batches(
+    limit: int = Query(50, ge=1, le=200),
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    rs = await session.execute(
+        text("""
+            SELECT b.id::text AS id, b.merkle_root, b.leaf_count, b.label, b.tx_hash, b.created_at,
+                   COUNT(k.id) FILTER (WHERE k.status_onchain = 'berhasil') AS berhasil,
+                   COUNT(k.id) FILTER (WHERE k.status_onchain = 'gagal')    AS gagal
+            FROM batch_anchor b
+            LEFT JOIN karya k ON k.batch_id = b.id
+            GROUP BY b.id
+            ORDER BY b.created_at DESC
+            LIMIT :n
+        """),
+        {"n": limit},
+    )
+    return {"items": rs.mappings().all(), "deploy_mode": settings.DEPLOY_MODE}
 
 
-async def fetch_block(block_number_hex: str):
+@router.post("/batches/flush", summary="Kirim batch Merkle sekarang (tanpa nunggu MERKLE_BATCH_MIN)")
+async def admin_flush_batch(
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                settings.SEPOLIA_RPC,
-                json={
-                    "jsonrpc": "2.0",
-                    "method": "eth_getBlockByNumber",
-                    "params": [block_number_hex, False],
-                    "id": 2,
-                },
-            )
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=502, detail=f"RPC connection error: {e}")
+        processed = await process_next_batch(session, force=True)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Kirim batch gagal: {e}")
+    return {"processed": processed}
+
+@router.get("/indexer", summary="Status indexer event WorkRegistered")
+async def admin_indexer_status(
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    rs = await session.execute(
+        text("SELECT nama, block_number, block_hash, updated_at FROM indexer_checkpoint")
+    )
+    return {"indexer": event_indexer.stats(), "checkpoints": rs.mappings().all()}
+
+
+@router.get("/reconcile", summary="Rekonsiliasi DB vs registry on-chain (dari mirror event)")
+async def admin_reconcile(
+    limit: int = Query(100, ge=1, le=1000),
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await WorkEventRepository.reconcile(session, limit)
 
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=400,
-            detail=f"RPC HTTP {resp.status_code}: {resp.text[:200]}",
-        )
 
+# --- Sync banyak tx sekaligus (JSON-RPC batch) ---
+@router.post("/sync-tx", summary="Sync banyak transaksi dari Sepolia ke DB (batch)")
+async def admin_sync_tx_bulk(
+    body: SyncTxBulkBody,
+    user=Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Sync banyak tx_hash dalam ~2 round-trip RPC (batch receipt + batch block).
+    Hanya karya berstatus 'on_chain' yang di-update.
+    """
     try:
-        data = resp.json()
+        result = await sync_txs(session, body.tx_hashes)
+    except RpcError as e:
+        raise _rpc_http_error(e)
     except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"RPC response is not JSON: {e}; body={resp.text[:200]}",
-        )
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Gagal sync transaksi: {e}")
 
-    if "error" in data:
-        raise HTTPException(status_code=400, detail=f"RPC error: {data['error']}")
-    return data.get("result")
+    synced = {r["tx_hash"] for r in result["updated"]}
+    result["not_found"] = [
+        h for h in dict.fromkeys(t.strip().lower() for t in body.tx_hashes)
+        if h not in synced and h not in result["pending"] and h not in result["errors"]
+    ]
+    return result
 
-@router.get("/debug/rpc", summary="Lihat RPC yang dipakai backend")
-async def debug_rpc():
-    return {"sepolia_rpc": settings.SEPOLIA_RPC}
 
 # --- Endpoint utama: /admin/sync-tx/{tx_hash} ---
 @router.post("/sync-tx/{tx_hash}", summary="Sync 1 transaksi dari Sepolia ke DB")
@@ -177,6 +272,8 @@ async def admin_sync_tx(
 
     try:
         data = await sync_tx_for_karya(str(karya_id), session)
+    except RpcError as e:
+        raise _rpc_http_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -260,6 +357,9 @@ async def admin_list_works(
     ),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor dari next_cursor halaman sebelumnya (keyset)"),
+    include_total: bool = Query(True, description="false = skip COUNT(*)"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated|cached)$", description="exact | estimated (statistik planner) | cached"),
     user=Depends(get_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
@@ -288,11 +388,12 @@ async def admin_list_works(
         elif queue in ("onchain", "ready_deploy"):
             # Antrian On-chain:
             # - status = draft
-            # - status_onchain = 'menunggu'
+            # - status_onchain = 'menunggu' (siap deploy) / 'dalam antrian' (lagi diproses worker)
             where_parts.append("k.status = :status_draft_onchain")
-            where_parts.append("k.status_onchain = :status_onchain_menunggu")
+            where_parts.append("k.status_onchain IN (:status_onchain_menunggu, :status_onchain_antrian)")
             params["status_draft_onchain"] = STATUS_DRAFT
             params["status_onchain_menunggu"] = ONCHAIN_MENUNGGU
+            params["status_onchain_antrian"] = ONCHAIN_DALAM_ANTRIAN
 
         elif queue == "verified":
             # Sudah On-chain:
@@ -314,7 +415,20 @@ async def admin_list_works(
         WHERE {where_clause}
     """
 
-    count_sql = text("SELECT COUNT(*) " + base_from)
+    # keyset (created_at, id) kalau ada cursor, selain itu OFFSET biasa
+    keyset = ""
+    page_clause = "OFFSET :offset"
+    count_params = dict(params)
+    if cursor:
+        try:
+            c_ts, c_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        keyset = "AND (k.created_at, k.id) < (:c_ts, CAST(:c_id AS uuid))"
+        params.update({"c_ts": c_ts, "c_id": c_id})
+        page_clause = ""
+    else:
+        params["offset"] = offset
 
     data_sql = text(
         """
@@ -337,20 +451,20 @@ async def admin_list_works(
 
             v.id AS verifier_id,
             COALESCE(v.nama_tampil, v.email) AS verifier_nama_tampil
-        """ + base_from + """
-        ORDER BY k.created_at DESC
-        LIMIT :limit OFFSET :offset
-        """
+        """ + base_from + keyset + """
+        ORDER BY k.created_at DESC, k.id DESC
+        LIMIT :limit """ + page_clause
     )
 
-    # param limit/offset
+    # param limit
     params["limit"] = limit
-    params["offset"] = offset
 
     # ------------------------------------------------------------------
     # Eksekusi query
     # ------------------------------------------------------------------
-    total = (await session.execute(count_sql, params)).scalar_one()
+    total = None
+    if include_total:
+        total = await count_total(session, base_from, count_params, total_mode)
 
     rs = await session.execute(data_sql, params)
     rows = rs.mappings().all()
@@ -391,8 +505,10 @@ async def admin_list_works(
     return AdminWorksListResponse(
         items=items,
         total=total,
+        total_mode=total_mode,
         limit=limit,
-        offset=offset,
+        offset=0 if cursor else offset,
+        next_cursor=next_cursor(rows, limit, "created_at"),
     )
 
 
@@ -541,28 +657,31 @@ async def reject_work(
         raise HTTPException(status_code=500, detail=f"Unexpected error in reject_work: {e}")
 
 
-@router.post("/works/{karya_id}/deploy", summary="Trigger blockchain deployment")
+@router.post(
+    "/works/{karya_id}/deploy",
+    status_code=202,
+    summary="Masukkan karya ke antrian deploy blockchain",
+)
 async def admin_deploy_work(
     karya_id: UUID,
     user=Depends(get_admin_user),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Trigger deployment ke chain untuk 1 karya:
+    Enqueue deployment ke chain untuk 1 karya:
     - hanya boleh untuk karya draft + status_onchain='menunggu'
-    - pakai registrar account backend
+    - status_onchain jadi 'dalam antrian', tx dikirim deploy worker (registrar account backend)
+    - tx_hash muncul di karya setelah worker selesai kirim
     """
     try:
-        tx_hash = await send_register_tx_for_karya(karya_id, session)
+        row = await enqueue_deploy(karya_id, user["user_id"], session)
     except ValueError as e:
-        # error terkontrol (validasi, dll)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # error tak terduga dari web3 / RPC
-        raise HTTPException(status_code=500, detail=f"Gagal mengirim transaksi: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Gagal memasukkan ke antrian deploy: {e}")
 
     return {
         "karya_id": karya_id,
-        "tx_hash": tx_hash,
-        "status_onchain": "menunggu",
-    }
\ No newline at end of file
+        "status_onchain": row["status_onchain"],
+    }
@@ -3,24 +3,23 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from eth_account.messages import encode_defunct
-from eth_account import Account
 
 from datetime import datetime, timedelta
-import secrets
 from jose import JWTError, jwt
 
 from app.schemas.auth import MeResponse
 from app.core.config import settings
 from app.db.session import get_session
+from app.services.crypto_pool import CryptoPoolBusy, crypto_pool
+from app.services.nonce_store import nonce_store
+from app.services.principal_cache import resolve_principal
+from app.utils.siwe import recover_address
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 security = HTTPBearer()
 
-NONCE_STORE = {}
-
 class NonceRequest(BaseModel):
     alamat_wallet: str
 
@@ -31,8 +30,7 @@ class SiweVerifyRequest(BaseModel):
 
 @router.post("/nonce")
 async def get_nonce(req: NonceRequest):
-    nonce = secrets.token_hex(8)
-    NONCE_STORE[req.alamat_wallet.lower()] = nonce
+    nonce = await nonce_store.issue(req.alamat_wallet)
     return {"nonce": nonce}
 
 
@@ -55,22 +53,22 @@ async def verify_siwe(req: SiweVerifyRequest, session: AsyncSession = Depends(ge
             raise ValueError("Nonce tidak ditemukan dalam pesan")
         nonce = nonce_line[0].split(":", 1)[1].strip()
 
-        # --- cek nonce ---
-        if NONCE_STORE.get(wallet) != nonce:
-            raise HTTPException(status_code=400, detail="Nonce tidak valid atau sudah kedaluwarsa")
-
-        # --- verifikasi signature ---
-        msg = encode_defunct(text=req.message)
-        recovered = Account.recover_message(msg, signature=req.signature)
+        # --- verifikasi signature (ECDSA recover di executor, bukan di event loop) ---
+        recovered = await crypto_pool.run(recover_address, req.message, req.signature)
         if recovered.lower() != wallet:
             raise HTTPException(status_code=401, detail="Signature tidak cocok dengan wallet")
 
+        # --- cek + pakai nonce (sekali pakai, atomik) ---
+        # sesudah cek signature, biar orang lain nggak bisa "membakar" nonce wallet ini
+        if not await nonce_store.consume(wallet, nonce):
+            raise HTTPException(status_code=400, detail="Nonce tidak valid atau sudah kedaluwarsa")
+
         # --- upsert ke tabel `pengguna` ---
         # cek pengguna berdasarkan alamat_wallet
         q_select = text("""
             SELECT id, peran
             FROM pengguna
-            WHERE lower(alamat_wallet) = :w
+            WHERE alamat_wallet = :w
             LIMIT 1
         """)
         row = (await session.execute(q_select, {"w": wallet})).mappings().first()
@@ -104,13 +102,12 @@ async def verify_siwe(req: SiweVerifyRequest, session: AsyncSession = Depends(ge
 
         token = jwt.encode(payload, settings.JWT_SECRET, algorithm="HS256")
 
-        # nonce sekali pakai: hapus
-        NONCE_STORE.pop(wallet, None)
-
         return {"access_token": token, "token_type": "bearer"}
 
     except HTTPException:
         raise
+    except CryptoPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"SIWE gagal: {e}")
     
@@ -124,26 +121,11 @@ async def get_me(
     """
     Balikin profil user saat ini berdasarkan JWT yang dikirim di Authorization: Bearer <token>.
     """
-    token = creds.credentials
-
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            audience=settings.JWT_AUD,
-            issuer=settings.JWT_ISS,
-        )
-    except JWTError as e:
+        principal = await resolve_principal(creds.credentials, session)
+    except (JWTError, ValueError) as e:
         raise HTTPException(status_code=401, detail=f"Token tidak valid: {e}")
 
-    user_id = payload.get("sub")
-    wallet = (payload.get("wallet") or "").lower()
-    peran = payload.get("peran")
-
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token tidak punya sub (user_id)")
-
     # ---- OPSIONAL: ambil nama dari DB kalau ada kolomnya ----
     # ganti 'nama' dengan nama kolom sebenarnya di tabel `pengguna`
     # rs = await session.execute(
@@ -154,10 +136,10 @@ async def get_me(
     # name = row["nama"] if row else None
 
     return MeResponse(
-        id=str(user_id),
-        wallet_address=wallet,
+        id=principal["user_id"],
+        wallet_address=principal["wallet"] or "",
         name=None,
-        peran = payload.get("peran")
+        peran=principal["peran"],
     )
 
 
@@ -165,42 +147,17 @@ async def get_admin_user(
     creds: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session),
 ):
-    """Autentikasi + cek peran verifikator/admin."""
-    token = creds.credentials
-
+    """Autentikasi + cek peran verifikator/admin (principal di-cache per token)."""
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            audience=settings.JWT_AUD,
-            issuer=settings.JWT_ISS,
-        )
-    except JWTError as e:
+        principal = await resolve_principal(creds.credentials, session)
+    except (JWTError, ValueError) as e:
         raise HTTPException(status_code=401, detail=f"Token tidak valid: {e}")
 
-    user_id = payload.get("sub")
-    wallet = (payload.get("wallet") or "").lower()
-    peran = payload.get("peran")  # <-- PAKE "peran", BUKAN "peran"
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token tidak punya sub (user_id)")
-
-    # kalau peran di token kosong, cek DB
-    if peran is None:
-        rs = await session.execute(
-            text("SELECT peran FROM pengguna WHERE id = :uid"),
-            {"uid": user_id},
-        )
-        peran = rs.scalar_one_or_none()
-
+    peran = principal["peran"]
     if peran not in ("verifikator", "admin"):
         raise HTTPException(
             status_code=403,
             detail=f"Hanya verifikator / admin (peran sekarang: {peran!r})",
         )
 
-    return {
-        "user_id": user_id,
-        "wallet": wallet,
-        "peran": peran,
-    }
\ No newline at end of file
+    return principal
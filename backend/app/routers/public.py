@@ -1,11 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
+from starlette.requests import ClientDisconnect
+from typing import List, Optional
+from app.core.config import settings
 from app.db.session import get_session
+from app.schemas.verify import VerifyBatchBody
+from app.services.count_cache import count_total
+from app.services.rpc_client import RpcError
+from app.services.verify_service import verify_hashes
+from app.services.warmup import warmup
+from app.utils.hashing import UploadTooLarge, sha256_stream
+from app.utils.merkle import with_merkle
+from app.utils.pagination import decode_cursor, next_cursor
+from app.utils.search import build_search
 
 router = APIRouter(prefix="/public", tags=["public"])
 
+PUBLIC_FILTER = "k.status = 'terverifikasi' AND k.block_number IS NOT NULL"
+# total list publik tanpa search (halaman depan) -> di-prime waktu warmup
+warmup.add_count(f"FROM karya k WHERE TRUE AND {PUBLIC_FILTER}")
+
 # GET detail public
 # @router.get("/works/{karya_id}")
 # async def public_get_work(karya_id: str, session: AsyncSession = Depends(get_session)):
@@ -54,8 +69,12 @@ async def public_get_work(karya_id: str, session: AsyncSession = Depends(get_ses
                  AND k.tx_hash ~* '^0x[0-9a-f]{64}$'
             THEN 'https://sepolia.etherscan.io/tx/' || lower(k.tx_hash)
             ELSE NULL
-          END AS etherscan_url
+          END AS etherscan_url,
+          k.batch_id::text  AS batch_id,
+          b.merkle_root,
+          k.merkle_proof
         FROM karya k
+        LEFT JOIN batch_anchor b ON b.id = k.batch_id
         WHERE k.id = :id
     """)
 
@@ -70,7 +89,7 @@ async def public_get_work(karya_id: str, session: AsyncSession = Depends(get_ses
             detail="Karya belum terverifikasi untuk publik",
         )
 
-    return row
+    return with_merkle(dict(row))
 
 
 # GET list public (dengan query sederhana)
@@ -127,26 +146,52 @@ async def public_list_works(
     qstr: str = Query("", alias="q"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor dari next_cursor halaman sebelumnya (keyset)"),
+    include_total: bool = Query(True, description="false = skip COUNT(*)"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated|cached)$", description="exact | estimated (statistik planner) | cached"),
 ):
     """
     List karya untuk publik:
     - Hanya karya berstatus 'terverifikasi'
     - Hanya yang sudah punya block_number (sudah benar-benar on-chain & disync)
-    - Bisa di-search dengan q (judul, ILIKE)
+    - Bisa di-search dengan q: full-text + trigram judul (urut relevansi), atau prefix hash_berkas
+    - Pagination: offset (lama) atau cursor (keyset (updated_at, id), nggak melambat di halaman dalam)
     """
     base_filter = "TRUE"
-    params = {"limit": limit, "offset": offset}
+    rank_sql = None
+    params: dict = {"limit": limit}
 
-    if qstr:
-        base_filter = "k.judul ILIKE :q"
-        params["q"] = f"%{qstr}%"
+    if qstr.strip():
+        if cursor:
+            # hasil search diurut by rank -> nggak cocok dengan keyset (updated_at, id)
+            raise HTTPException(status_code=400, detail="cursor tidak bisa dipakai bersama q, pakai offset")
+        base_filter, rank_sql, q_params = build_search(qstr)
+        params.update(q_params)
 
     # Tambahkan filter status & block_number
-    filter_clause = f"{base_filter} AND k.status = 'terverifikasi' AND k.block_number IS NOT NULL"
+    filter_clause = f"{base_filter} AND {PUBLIC_FILTER}"
+
+    # Hitung total untuk pagination (opsional)
+    total = None
+    if include_total:
+        total = await count_total(session, f"FROM karya k WHERE {filter_clause}", params, total_mode)
 
-    # Hitung total untuk pagination
-    q_total = text(f"SELECT COUNT(*) FROM karya k WHERE {filter_clause}")
-    total = (await session.execute(q_total, params)).scalar_one()
+    page_clause = "OFFSET :offset"
+    where_clause = filter_clause
+    if cursor:
+        try:
+            c_ts, c_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        where_clause += " AND (k.updated_at, k.id) < (:c_ts, CAST(:c_id AS uuid))"
+        params.update({"c_ts": c_ts, "c_id": c_id})
+        page_clause = ""
+    else:
+        params["offset"] = offset
+
+    order_by = "k.updated_at DESC, k.id DESC"
+    if rank_sql:
+        order_by = f"{rank_sql} DESC, " + order_by
 
     # Ambil data list
     q = text(f"""
@@ -164,9 +209,9 @@ async def public_list_works(
               ELSE NULL
             END AS etherscan_url
         FROM karya k
-        WHERE {filter_clause}
-        ORDER BY k.updated_at DESC
-        LIMIT :limit OFFSET :offset
+        WHERE {where_clause}
+        ORDER BY {order_by}
+        LIMIT :limit {page_clause}
     """)
 
     items = (await session.execute(q, params)).mappings().all()
@@ -174,6 +219,55 @@ async def public_list_works(
     return {
         "items": items,
         "total": total,
+        "total_mode": total_mode,
         "limit": limit,
-        "offset": offset,
-    }
\ No newline at end of file
+        "offset": 0 if cursor else offset,
+        "next_cursor": None if rank_sql else next_cursor(items, limit, "updated_at"),
+    }
+
+
+@router.post("/verify", summary="Cek file sudah terdaftar (upload file, hash di server)")
+async def public_verify_file(
+    request: Request,
+    onchain: bool = Query(False, description="Cross-check isRegistered di kontrak"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Body = isi file mentah (application/octet-stream). File cuma di-hash (streaming), nggak disimpan.
+    """
+    try:
+        file_hash, size = await sha256_stream(request.stream(), settings.UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="Upload terputus")
+
+    try:
+        items = await verify_hashes(session, [file_hash], onchain)
+    except RpcError as e:
+        raise HTTPException(status_code=502, detail=f"Cek on-chain gagal: {e}")
+    return {**items[0], "ukuran_berkas": size}
+
+
+@router.post("/verify/batch", summary="Cek banyak hash sekaligus")
+async def public_verify_batch(
+    body: VerifyBatchBody,
+    onchain: bool = Query(
+        False,
+        description=f"Cross-check isRegistered di kontrak (1 batch eth_call, maks {settings.VERIFY_ONCHAIN_MAX} hash)",
+    ),
+    session: AsyncSession = Depends(get_session),
+):
+    try:
+        items = await verify_hashes(session, body.hashes, onchain)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RpcError as e:
+        raise HTTPException(status_code=502, detail=f"Cek on-chain gagal: {e}")
+    return {
+        "items": items,
+        "registered": sum(1 for i in items if i["registered"]),
+        "total": len(items),
+    }
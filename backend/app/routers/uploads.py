@@ -0,0 +1,84 @@
+# app/routers/uploads.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.db.session import get_session
+from app.routers.works import get_current_user
+from app.schemas.uploads import UploadCreate
+from app.services.upload_sessions import upload_sessions
+from app.services.work_service import WorkService
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+def _http_error(e: Exception) -> HTTPException:
+    if isinstance(e, LookupError):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, PermissionError):
+        return HTTPException(status_code=403, detail=str(e))
+    return HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("", summary="Buat sesi upload resumable")
+async def create_upload(body: UploadCreate, user=Depends(get_current_user)):
+    try:
+        return await upload_sessions.create(user["user_id"], body.judul, body.size)
+    except (ValueError, OSError) as e:
+        raise _http_error(e)
+
+
+@router.get("/{upload_id}", summary="Status sesi upload (range yang sudah diterima / masih hilang)")
+async def get_upload(upload_id: str, user=Depends(get_current_user)):
+    try:
+        return await upload_sessions.status(upload_id, user["user_id"])
+    except (LookupError, PermissionError) as e:
+        raise _http_error(e)
+
+
+@router.put("/{upload_id}", summary="Kirim 1 chunk di offset tertentu (boleh paralel / acak urutan)")
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    user=Depends(get_current_user),
+):
+    """Body = byte mentah chunk (application/octet-stream)."""
+    try:
+        return await upload_sessions.put_chunk(upload_id, user["user_id"], offset, request.stream())
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="Upload chunk terputus, kirim ulang chunk ini")
+    except (LookupError, PermissionError, ValueError) as e:
+        raise _http_error(e)
+
+
+@router.post("/{upload_id}/finalize", summary="Selesaikan upload -> hash_berkas -> buat draft")
+async def finalize_upload(
+    upload_id: str,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    try:
+        meta, hash_berkas = await upload_sessions.finalize(upload_id, user["user_id"])
+    except (LookupError, PermissionError) as e:
+        raise _http_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        row = await WorkService.create_draft(session, user["user_id"], meta["judul"], hash_berkas)
+    except Exception as e:
+        # sesi dibiarkan -> finalize bisa diulang
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await upload_sessions.discard(upload_id)
+    return {**row, "ukuran_berkas": meta["size"]}
+
+
+@router.delete("/{upload_id}", summary="Batalkan sesi upload")
+async def abort_upload(upload_id: str, user=Depends(get_current_user)):
+    try:
+        await upload_sessions.abort(upload_id, user["user_id"])
+    except (LookupError, PermissionError) as e:
+        raise _http_error(e)
+    return {"ok": True}
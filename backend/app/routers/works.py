@@ -1,88 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from jose import jwt
+from starlette.requests import ClientDisconnect
 
 from app.core.config import settings
 from app.db.session import get_session
 from app.schemas.works import WorkCreate, WorkOnChainUpdate, WorkPublic  # pastikan ini ada
+from app.services.count_cache import count_total
+from app.services.hash_bloom import hash_bloom
+from app.services.principal_cache import resolve_principal
 from app.services.work_service import WorkService
+from app.utils.hashing import UploadTooLarge, sha256_stream
+from app.utils.pagination import decode_cursor, next_cursor
 
 router = APIRouter(prefix="/works", tags=["works"])
 security = HTTPBearer()
 
 
-def _looks_like_uuid(s: str) -> bool:
-    return isinstance(s, str) and len(s) == 36 and "-" in s
-
-
 async def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Decode JWT:
+    Decode JWT (hasilnya di-cache per token, lihat principal_cache):
     - Kalau sub sudah UUID -> langsung pakai
     - Kalau sub masih 0x... (wallet lama) -> map ke tabel `pengguna` via alamat_wallet
     """
     try:
-        payload = jwt.decode(
-            creds.credentials,
-            settings.JWT_SECRET,
-            audience=settings.JWT_AUD,
-            issuer=settings.JWT_ISS,
-        )
-        sub = payload.get("sub")
-        wallet = (payload.get("wallet") or "").lower()
-
-        # 1) Sudah UUID? langsung gas
-        if sub and _looks_like_uuid(sub):
-            return {
-                "user_id": sub,
-                "wallet": wallet or None,
-                "peran": payload.get("peran", "pencipta"),
-            }
-
-        # 2) sub masih alamat wallet (token versi awal)
-        addr = (wallet or sub or "").lower()
-        if not addr.startswith("0x"):
-            raise HTTPException(status_code=401, detail="Format token tidak dikenali")
-
-        # Cari user di tabel `pengguna`
-        q_sel = text(
-            """
-            SELECT id, peran
-            FROM pengguna
-            WHERE lower(alamat_wallet) = :w
-            LIMIT 1
-            """
-        )
-        row = (await session.execute(q_sel, {"w": addr})).mappings().first()
-
-        if row:
-            user_id = row["id"]
-            peran = row["peran"]
-        else:
-            # Kalau belum ada, buat user baru
-            q_ins = text(
-                """
-                INSERT INTO pengguna (alamat_wallet)
-                VALUES (:w)
-                RETURNING id, peran
-                """
-            )
-            new_row = (await session.execute(q_ins, {"w": addr})).mappings().one()
-            await session.commit()
-            user_id = new_row["id"]
-            peran = new_row["peran"]
-
-        return {
-            "user_id": str(user_id),
-            "wallet": addr,
-            "peran": peran,
-        }
-
+        return await resolve_principal(creds.credentials, session)
     except HTTPException:
         raise
     except Exception as e:
@@ -98,21 +46,39 @@ async def list_works(
     session: AsyncSession = Depends(get_session),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor dari next_cursor halaman sebelumnya (keyset)"),
+    include_total: bool = Query(True, description="false = skip COUNT(*)"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated|cached)$", description="exact | estimated (statistik planner) | cached"),
 ):
     try:
-        # Hitung total
-        q_total = text(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM karya
-            WHERE pengguna_id = :uid
-            """
-        )
-        rs_total = await session.execute(q_total, {"uid": user["user_id"]})
-        total = rs_total.scalar_one()
+        params = {"uid": user["user_id"], "limit": limit}
+
+        # Hitung total (opsional)
+        total = None
+        if include_total:
+            total = await count_total(
+                session,
+                "FROM karya WHERE pengguna_id = :uid",
+                {"uid": user["user_id"]},
+                total_mode,
+            )
+
+        # keyset (updated_at, id) kalau ada cursor, selain itu OFFSET biasa
+        keyset = ""
+        page_clause = "OFFSET :offset"
+        if cursor:
+            try:
+                c_ts, c_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            keyset = "AND (k.updated_at, k.id) < (:c_ts, CAST(:c_id AS uuid))"
+            params.update({"c_ts": c_ts, "c_id": c_id})
+            page_clause = ""
+        else:
+            params["offset"] = offset
 
         # Ambil list item
-        q_list = text("""
+        q_list = text(f"""
             SELECT
                 k.id::text AS id,
                 k.judul,
@@ -123,23 +89,30 @@ async def list_works(
                 k.updated_at,
                 CASE
                     WHEN k.jaringan_ket = 'sepolia'
-                    AND k.tx_hash ~* '^0x[0-9a-f]{64}$'
+                    AND k.tx_hash ~* '^0x[0-9a-f]{{64}}$'
                     THEN 'https://sepolia.etherscan.io/tx/' || lower(k.tx_hash)
                     ELSE NULL
                 END AS etherscan_url
             FROM karya k
             WHERE k.pengguna_id = :uid
-            ORDER BY k.updated_at DESC
-            LIMIT :limit OFFSET :offset
+            {keyset}
+            ORDER BY k.updated_at DESC, k.id DESC
+            LIMIT :limit {page_clause}
         """)
-        rs_list = await session.execute(
-            q_list,
-            {"uid": user["user_id"], "limit": limit, "offset": offset},
-        )
+        rs_list = await session.execute(q_list, params)
         items = rs_list.mappings().all()
 
-        return {"items": items, "total": total, "limit": limit, "offset": offset}
+        return {
+            "items": items,
+            "total": total,
+            "total_mode": total_mode,
+            "limit": limit,
+            "offset": 0 if cursor else offset,
+            "next_cursor": next_cursor(items, limit, "updated_at"),
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -169,6 +142,37 @@ async def create_work(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/upload", summary="Upload file -> hash SHA-256 di server -> buat draft")
+async def upload_work(
+    request: Request,
+    judul: str = Query(..., min_length=1, description="Judul karya"),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Body = isi file mentah (Content-Type: application/octet-stream, boleh chunked).
+    Body di-stream ke SHA-256 per potongan (nggak pernah di-buffer utuh),
+    file-nya sendiri nggak disimpan -> cuma hash + judul yang masuk draft.
+    """
+    # upload bisa lama -> jangan tahan koneksi/transaksi DB (kalau auth sempat query)
+    await session.rollback()
+
+    try:
+        hash_berkas, size = await sha256_stream(request.stream(), settings.UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="Upload terputus")
+
+    try:
+        row = await WorkService.create_draft(session, user["user_id"], judul, hash_berkas)
+        return {**row, "ukuran_berkas": size}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/{karya_id}/onchain", summary="Update status on-chain")
 async def update_on_chain(
     karya_id: str,
@@ -190,6 +194,7 @@ async def update_on_chain(
             raise HTTPException(
                 status_code=404, detail="Karya tidak ditemukan / bukan milik Anda"
             )
+        hash_bloom.add(row["hash_berkas"])
         return row
     except HTTPException:
         raise
@@ -126,9 +126,11 @@ class AdminWorkItem(BaseModel):
 
 class AdminWorksListResponse(BaseModel):
     items: List[AdminWorkItem]
-    total: int
+    total: Optional[int] = None  # None kalau include_total=false
+    total_mode: str = "exact"
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 # Request schemas
@@ -158,4 +160,7 @@ class WorkActionResponse(BaseModel):
     work: AdminWorkDetail
 
 class RejectBody(BaseModel):
-    reason: str | None = None
\ No newline at end of file
+    reason: str | None = None
+
+class SyncTxBulkBody(BaseModel):
+    tx_hashes: List[str] = Field(..., min_length=1, max_length=500)
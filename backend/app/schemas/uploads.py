@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class UploadCreate(BaseModel):
+    judul: str = Field(..., min_length=1)
+    size: int = Field(..., gt=0, description="Ukuran file total (byte)")
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class VerifyBatchBody(BaseModel):
+    hashes: List[str] = Field(..., min_length=1, max_length=settings.VERIFY_BATCH_MAX)
@@ -9,6 +9,7 @@ from fastapi import HTTPException, status
 
 from app.models.work import Work  # Your SQLAlchemy model
 from app.models.user import User  # Your user model
+from app.utils.search import escape_like, hash_prefix
 
 
 def list_admin_works(
@@ -35,13 +36,13 @@ def list_admin_works(
     if status_onchain_filter:
         filters.append(Work.status_onchain == status_onchain_filter)
     if search:
-        search_pattern = f"%{search}%"
-        filters.append(
-            or_(
-                Work.judul.ilike(search_pattern),
-                Work.hash_berkas.ilike(search_pattern)
-            )
-        )
+        prefix = hash_prefix(search)
+        if prefix:
+            # hash -> prefix match (index bpchar_pattern_ops), bukan ILIKE '%..%'
+            filters.append(Work.hash_berkas.startswith(prefix))
+        else:
+            # ILIKE judul ke-cover index pg_trgm
+            filters.append(Work.judul.ilike(f"%{escape_like(search)}%"))
     
     if filters:
         query = query.where(and_(*filters))
@@ -0,0 +1,178 @@
+# app/services/block_cache.py
+"""
+Cache block_number -> (timestamp, hash) yang dipakai semua jalur sync.
+
+- LRU + TTL untuk blok yang belum final (masih bisa kena reorg)
+- blok <= head - BLOCK_CACHE_FINALITY_DEPTH dianggap final -> nggak pernah expire
+- opsional: blok final ditulis ke tabel `block_cache` biar restart langsung hangat
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
+
+
+class BlockInfo(NamedTuple):
+    number: int
+    timestamp: int
+    hash: str
+
+
+class BlockCache:
+    def __init__(
+        self,
+        maxsize: int = settings.BLOCK_CACHE_SIZE,
+        ttl: float = settings.BLOCK_CACHE_TTL,
+        finality_depth: int = settings.BLOCK_CACHE_FINALITY_DEPTH,
+        persist: bool = settings.BLOCK_CACHE_PERSIST,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.finality_depth = finality_depth
+        self.persist = persist
+        self.head: Optional[int] = None
+        # number -> (info, expires_at | None kalau final)
+        self._entries: "OrderedDict[int, tuple[BlockInfo, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def note_head(self, latest: int) -> None:
+        if self.head is None or latest > self.head:
+            self.head = latest
+
+    def _is_final(self, number: int) -> bool:
+        return self.head is not None and number <= self.head - self.finality_depth
+
+    def _put(self, info: BlockInfo, final: bool = False) -> None:
+        expires = None if final or self._is_final(info.number) else time.monotonic() + self.ttl
+        self._entries[info.number] = (info, expires)
+        self._entries.move_to_end(info.number)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _get(self, number: int) -> Optional[BlockInfo]:
+        entry = self._entries.get(number)
+        if entry is None:
+            return None
+        info, expires = entry
+        if expires is not None:
+            if time.monotonic() >= expires:
+                del self._entries[number]
+                return None
+            if self._is_final(number):
+                # sudah final sejak di-cache -> naik ke tier permanen
+                self._entries[number] = (info, None)
+        self._entries.move_to_end(number)
+        return info
+
+    async def _load_persisted(self, session: AsyncSession, numbers: list[int]) -> list[BlockInfo]:
+        rs = await session.execute(
+            text("""
+                SELECT block_number, block_ts, block_hash
+                FROM block_cache
+                WHERE block_number = ANY(CAST(:ns AS bigint[]))
+            """),
+            {"ns": numbers},
+        )
+        return [BlockInfo(r[0], r[1], r[2]) for r in rs.all()]
+
+    async def _store_persisted(self, session: AsyncSession, infos: list[BlockInfo]) -> None:
+        final = [i for i in infos if self._is_final(i.number)]
+        if not final:
+            return
+        await session.execute(
+            text("""
+                INSERT INTO block_cache (block_number, block_ts, block_hash)
+                VALUES (:number, :timestamp, :hash)
+                ON CONFLICT (block_number) DO NOTHING
+            """),
+            [i._asdict() for i in final],
+        )
+
+    async def get_many(
+        self,
+        numbers: Iterable[int],
+        session: Optional[AsyncSession] = None,
+    ) -> dict[int, BlockInfo | RpcError]:
+        """
+        Ambil info banyak blok: memori -> tabel block_cache (kalau ada session) -> 1 batch RPC.
+        Kalau pakai session, insert ke block_cache ikut transaksi caller (commit di caller).
+        """
+        out: dict[int, BlockInfo | RpcError] = {}
+        missing: list[int] = []
+        for n in sorted(set(numbers)):
+            info = self._get(n)
+            if info is None:
+                missing.append(n)
+            else:
+                out[n] = info
+        self.hits += len(out)
+
+        use_db = self.persist and session is not None
+        if missing and use_db:
+            for info in await self._load_persisted(session, missing):
+                self._put(info, final=True)  # yang di tabel pasti final
+                out[info.number] = info
+            missing = [n for n in missing if n not in out]
+
+        if missing:
+            self.misses += len(missing)
+            fetched: list[BlockInfo] = []
+            for n, block in (await rpc_client.get_blocks(missing)).items():
+                if block is None:
+                    out[n] = RpcError(f"Blok {n} tidak ditemukan")
+                elif isinstance(block, RpcError):
+                    out[n] = block
+                else:
+                    info = BlockInfo(n, hex_to_int(block["timestamp"]), block["hash"].lower())
+                    self._put(info)
+                    fetched.append(info)
+                    out[n] = info
+            if use_db:
+                await self._store_persisted(session, fetched)
+
+        return out
+
+    async def get(self, number: int, session: Optional[AsyncSession] = None) -> BlockInfo:
+        info = (await self.get_many([number], session))[number]
+        if isinstance(info, RpcError):
+            raise info
+        return info
+
+    async def warm(self, session: AsyncSession, limit: int = 1000) -> int:
+        """Muat blok final terbaru dari tabel ke memori (dipanggil waktu startup)."""
+        if not self.persist:
+            return 0
+        rs = await session.execute(
+            text("""
+                SELECT block_number, block_ts, block_hash
+                FROM block_cache
+                ORDER BY block_number DESC
+                LIMIT :n
+            """),
+            {"n": min(limit, self.maxsize)},
+        )
+        rows = rs.all()
+        for r in reversed(rows):
+            self._put(BlockInfo(r[0], r[1], r[2]), final=True)
+        return len(rows)
+
+    def stats(self) -> dict:
+        final = sum(1 for _, exp in self._entries.values() if exp is None)
+        return {
+            "size": len(self._entries),
+            "final": final,
+            "head": self.head,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+block_cache = BlockCache()
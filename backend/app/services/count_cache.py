@@ -0,0 +1,115 @@
+# app/services/count_cache.py
+"""
+Total untuk list endpoint tanpa selalu COUNT(*) penuh.
+
+total_mode:
+- exact     : SELECT COUNT(*) (perilaku lama)
+- estimated : estimasi planner dari EXPLAIN (FORMAT JSON) -> "Plan Rows" (pakai statistik ANALYZE)
+- cached    : COUNT(*) exact, disimpan per filter (SQL + param yang dipakai) selama COUNT_CACHE_TTL
+
+Invalidasi: INSERT/UPDATE/DELETE ke tabel karya (raw SQL maupun ORM) -> cache dikosongkan
+setelah transaksinya commit (app/db/commit_hooks.py). Cuma berlaku per proses; proses lain
+ketinggalan paling lama TTL.
+"""
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.commit_hooks import on_commit_after_write
+
+TOTAL_MODES = ("exact", "estimated", "cached")
+
+_KARYA_WRITE_RE = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(?:public\.)?karya\b",
+    re.IGNORECASE | re.DOTALL,
+)
+_BIND_RE = re.compile(r"(?<!:):([A-Za-z_][A-Za-z0-9_]*)")
+
+
+class CountCache:
+    def __init__(self, ttl: float = settings.COUNT_CACHE_TTL, maxsize: int = settings.COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, tuple[int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(from_where: str, params: dict[str, Any]) -> tuple:
+        """Normalisasi filter: whitespace dirapikan, cuma param yang muncul di SQL."""
+        sql = " ".join(from_where.split())
+        used = sorted(set(_BIND_RE.findall(sql)))
+        return (sql, tuple((name, str(params.get(name))) for name in used))
+
+    def get(self, key: tuple) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: tuple, count: int) -> None:
+        self._entries[key] = (count, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        if self._entries:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+count_cache = CountCache()
+
+
+on_commit_after_write("count_cache", _KARYA_WRITE_RE, count_cache.invalidate)
+
+
+async def count_total(
+    session: AsyncSession,
+    from_where: str,
+    params: dict[str, Any],
+    mode: str = "exact",
+) -> int:
+    """
+    Hitung total untuk `SELECT ... <from_where>` (from_where = "FROM ... WHERE ...").
+    """
+    if mode == "estimated":
+        rs = await session.execute(text("EXPLAIN (FORMAT JSON) SELECT 1 " + from_where), params)
+        plan = rs.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    key = None
+    if mode == "cached":
+        key = count_cache.key(from_where, params)
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached
+
+    total = (await session.execute(text("SELECT COUNT(*) " + from_where), params)).scalar_one()
+    if key is not None:
+        count_cache.put(key, total)
+    return total
@@ -0,0 +1,108 @@
+# app/services/crypto_pool.py
+"""
+Executor untuk operasi kripto CPU-bound (secp256k1 recover / sign) biar nggak jalan di event loop.
+
+- CRYPTO_EXECUTOR = "thread" (default; coincurve/eth_keys lepas GIL di bagian C)
+                  | "process" (isolasi penuh, ada overhead pickle per call)
+- antrian dibatasi CRYPTO_MAX_PENDING: kalau penuh > CRYPTO_QUEUE_TIMEOUT detik -> CryptoPoolBusy
+  (router map ke 503), daripada request numpuk tanpa batas
+- fungsi yang dikirim harus top-level (bisa di-pickle) kalau mode process
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class CryptoPoolBusy(Exception):
+    """Antrian executor kripto penuh."""
+
+
+class CryptoPool:
+    def __init__(
+        self,
+        mode: str = settings.CRYPTO_EXECUTOR,
+        workers: int = settings.CRYPTO_WORKERS,
+        max_pending: int = settings.CRYPTO_MAX_PENDING,
+        queue_timeout: float = settings.CRYPTO_QUEUE_TIMEOUT,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"CRYPTO_EXECUTOR tidak dikenal: {mode!r} (pakai 'thread' / 'process')")
+        self.mode = mode
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.run_ms_total = 0.0
+        self.run_ms_max = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crypto")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise CryptoPoolBusy("Server sedang sibuk memproses signature, coba lagi")
+
+        self.in_flight += 1
+        try:
+            t1 = time.perf_counter()
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            t2 = time.perf_counter()
+            self.in_flight -= 1
+            self._slots.release()
+            self.wait_ms_total += (t1 - t0) * 1000
+            run_ms = (t2 - t1) * 1000
+            self.run_ms_total += run_ms
+            self.run_ms_max = max(self.run_ms_max, run_ms)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_ms_total / done, 3) if done else None,
+            "avg_run_ms": round(self.run_ms_total / done, 3) if done else None,
+            "max_run_ms": round(self.run_ms_max, 3),
+        }
+
+
+crypto_pool = CryptoPool()
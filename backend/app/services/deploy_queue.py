@@ -0,0 +1,240 @@
+# app/services/deploy_queue.py
+"""
+Antrian deploy on-chain berbasis tabel `karya` (Postgres).
+
+Alur:
+- admin hit /admin/works/{id}/deploy -> karya di-set status_onchain='dalam antrian' (enqueue)
+- worker background claim 1 row pakai FOR UPDATE SKIP LOCKED, reserve nonce + tanda tangan tx
+- 2 fase: tx_hash (sudah pasti dari tanda tangan) + registrar_tx dicommit DULU, baru broadcast
+  * proses mati sebelum commit    -> rollback, row tetap 'dalam antrian', nonce belum terpakai
+    (tx belum pernah dikirim, jadi kirim ulang aman)
+  * proses mati setelah commit    -> row sudah 'menunggu' dengan tx_hash-nya; kalau tx ternyata
+    nggak sampai node, tx_replacer kirim ulang di nonce yang sama (bukan tx kedua yang revert)
+  * node menolak tx (error RPC)   -> row dikembalikan ke 'dalam antrian' (requeue_unsent)
+- DEPLOY_MODE="merkle": worker claim banyak row sekaligus, 1 tx untuk root Merkle (lihat merkle_anchor)
+- sebelum kirim: preflight (duplikat / simulasi eth_call); yang pasti revert langsung 'gagal'
+  tanpa makan nonce + gas
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.hash_bloom import hash_bloom
+from app.services.merkle_anchor import process_next_batch
+from app.services.onchain import (
+    BroadcastRejected,
+    abandon_signed_tx,
+    broadcast_register_tx,
+    mark_tx_sent,
+    prepare_register_args,
+    record_signed_tx,
+    requeue_unsent,
+    sign_register_tx_async,
+)
+from app.services.preflight import NOT_PENDING_ELSEWHERE_SQL, mark_skipped, preflight
+
+logger = logging.getLogger(__name__)
+
+ONCHAIN_MENUNGGU = "menunggu"
+ONCHAIN_DALAM_ANTRIAN = "dalam antrian"
+ONCHAIN_GAGAL = "gagal"
+
+
+async def enqueue_deploy(karya_id: UUID | str, user_id: str, session: AsyncSession) -> dict:
+    """
+    Masukkan karya ke antrian deploy.
+    Syarat: status='draft' dan status_onchain='menunggu' (sudah di-approve).
+    """
+    rs = await session.execute(
+        text(
+            """
+            UPDATE karya
+            SET status_onchain = :antrian,
+                updated_at     = NOW()
+            WHERE id = :kid
+              AND status = 'draft'
+              AND status_onchain = :menunggu
+            RETURNING id, judul, status, status_onchain, updated_at
+            """
+        ),
+        {"kid": str(karya_id), "antrian": ONCHAIN_DALAM_ANTRIAN, "menunggu": ONCHAIN_MENUNGGU},
+    )
+    row = rs.mappings().first()
+
+    if not row:
+        rs2 = await session.execute(
+            text("SELECT status, status_onchain FROM karya WHERE id = :kid"),
+            {"kid": str(karya_id)},
+        )
+        cur = rs2.mappings().first()
+        await session.rollback()
+        if not cur:
+            raise ValueError("Karya tidak ditemukan")
+        raise ValueError(
+            f"Karya tidak dalam antrian deploy (status={cur['status']}, "
+            f"status_onchain={cur['status_onchain']})"
+        )
+
+    await session.execute(
+        text("""
+            INSERT INTO catatan_audit(pengguna_id, aksi, muatan)
+            VALUES (:uid, 'DEPLOY DIANTRIKAN',
+                    jsonb_build_object('karya_id', CAST(:kid AS text)))
+        """),
+        {"uid": user_id, "kid": str(karya_id)},
+    )
+    await session.commit()
+    return dict(row)
+
+
+async def process_next_job(session: AsyncSession) -> bool:
+    """
+    Claim & proses 1 job dari antrian.
+    Return True kalau ada job yang diproses (berhasil / gagal validasi),
+    False kalau antrian kosong.
+    Error RPC sebelum broadcast dilempar lagi -> transaksi rollback, row balik ke antrian.
+    """
+    rs = await session.execute(
+        text(
+            f"""
+            SELECT
+                k.id,
+                k.judul,
+                k.hash_berkas,
+                p.alamat_wallet
+            FROM karya k
+            JOIN pengguna p ON p.id = k.pengguna_id
+            WHERE k.status = 'draft'
+              AND k.status_onchain = :antrian
+              AND {NOT_PENDING_ELSEWHERE_SQL}
+            ORDER BY k.updated_at
+            LIMIT 1
+            FOR UPDATE OF k SKIP LOCKED
+            """
+        ),
+        {"antrian": ONCHAIN_DALAM_ANTRIAN},
+    )
+    job = rs.mappings().first()
+    if not job:
+        await session.rollback()
+        return False
+
+    try:
+        prepare_register_args(job["hash_berkas"], job["alamat_wallet"])
+    except ValueError as e:
+        # data karya nggak valid -> nggak ada gunanya di-retry
+        await session.execute(
+            text(
+                """
+                UPDATE karya
+                SET status_onchain   = :gagal,
+                    alasan_penolakan = :reason,
+                    updated_at       = NOW()
+                WHERE id = :kid
+                """
+            ),
+            {"kid": str(job["id"]), "gagal": ONCHAIN_GAGAL, "reason": f"Deploy gagal: {e}"},
+        )
+        await session.commit()
+        logger.warning("deploy karya %s gagal validasi: %s", job["id"], e)
+        return True
+
+    skip = await preflight(session, [dict(job)])
+    if skip:
+        await mark_skipped(session, [(str(job["id"]), skip[job["hash_berkas"]])])
+        await session.commit()
+        return True
+
+    # fase 1: error di sini dilempar -> rollback, job balik ke antrian
+    signed = await sign_register_tx_async(job["hash_berkas"], job["judul"], job["alamat_wallet"])
+    try:
+        await record_signed_tx(session, signed, job["hash_berkas"], job["judul"], job["alamat_wallet"])
+        await mark_tx_sent(session, job["id"], signed.tx_hash)
+        await session.commit()
+    except BaseException:
+        await abandon_signed_tx(signed)
+        raise
+    hash_bloom.add(job["hash_berkas"])  # false positive (kalau nanti ditolak) nggak masalah
+
+    # fase 2: broadcast
+    try:
+        await broadcast_register_tx(signed)
+    except BroadcastRejected as e:
+        await requeue_unsent(session, signed.tx_hash)
+        await session.commit()
+        logger.warning("tx karya %s ditolak node, balik ke antrian: %s", job["id"], e)
+        raise
+    except Exception as e:
+        # belum pasti: biarkan 'menunggu', receipt watcher / tx_replacer yang beresin
+        logger.warning("broadcast tx %s (karya %s) belum pasti: %s", signed.tx_hash, job["id"], e)
+        return True
+
+    logger.info("deploy karya %s terkirim, tx=%s", job["id"], signed.tx_hash)
+    return True
+
+
+class DeployWorkerPool:
+    """Sekumpulan worker async yang nge-drain antrian deploy."""
+
+    def __init__(
+        self,
+        workers: int = settings.DEPLOY_WORKERS,
+        poll_interval: float = settings.DEPLOY_POLL_INTERVAL,
+        retry_backoff: float = settings.DEPLOY_RETRY_BACKOFF,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def _run(self, idx: int) -> None:
+        while not self._stopping.is_set():
+            delay: Optional[float] = None
+            try:
+                async with AsyncSessionLocal() as session:
+                    if settings.DEPLOY_MODE == "merkle":
+                        processed = await process_next_batch(session)
+                    else:
+                        processed = await process_next_job(session)
+                    if not processed:
+                        delay = self.poll_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("deploy worker #%d error: %s", idx, e)
+                delay = self.retry_backoff
+
+            if delay:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"deploy-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, grace: float = 30.0) -> None:
+        # kasih waktu job yang lagi jalan buat commit tx_hash, baru cancel
+        self._stopping.set()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=grace)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+
+deploy_pool = DeployWorkerPool()
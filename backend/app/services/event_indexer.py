@@ -0,0 +1,248 @@
+# app/services/event_indexer.py
+"""
+Indexer event WorkRegistered dari KrearsipV2 -> tabel `work_registered_event`.
+
+- eth_getLogs per range blok, ukuran range adaptif (error -> dibagi 2, sukses -> x2)
+- cuma index sampai safe head (latest - INDEXER_CONFIRMATIONS)
+- checkpoint (block_number + block_hash) di tabel `indexer_checkpoint`
+- reorg: hash blok checkpoint beda dengan chain -> mundur INDEXER_REORG_DEPTH blok,
+  hapus event di atasnya, index ulang
+- 1 tick = 1 transaksi + pg_try_advisory_xact_lock -> cuma 1 proses yang jalan
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from eth_abi import decode as abi_decode
+from eth_utils import keccak
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.block_cache import block_cache
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
+
+logger = logging.getLogger(__name__)
+
+INDEXER_NAME = "krearsip_v2_work_registered"
+WORK_REGISTERED_TOPIC = "0x" + keccak(
+    text="WorkRegistered(bytes32,address,address,string,uint256)"
+).hex()
+
+
+def decode_work_registered(log: dict) -> dict:
+    """Decode 1 log WorkRegistered (format raw JSON-RPC) jadi row tabel."""
+    topics = log["topics"]
+    title, ts = abi_decode(["string", "uint256"], bytes.fromhex(log["data"][2:]))
+    return {
+        "file_hash": topics[1][2:].lower(),
+        "creator": "0x" + topics[2][-40:].lower(),
+        "registrar": "0x" + topics[3][-40:].lower(),
+        "title": title,
+        "ts": int(ts),
+        "block_number": hex_to_int(log["blockNumber"]),
+        "block_hash": log["blockHash"].lower(),
+        "tx_hash": log["transactionHash"].lower(),
+        "log_index": hex_to_int(log["logIndex"]),
+    }
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        contract_address: str = settings.KREARSIP_V2_ADDRESS,
+        start_block: int = settings.INDEXER_START_BLOCK,
+        confirmations: int = settings.INDEXER_CONFIRMATIONS,
+        reorg_depth: int = settings.INDEXER_REORG_DEPTH,
+        max_range: int = settings.INDEXER_MAX_RANGE,
+        poll_interval: float = settings.INDEXER_POLL_INTERVAL,
+    ):
+        self.contract_address = contract_address.lower()
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.max_range = max_range
+        self.range = max_range
+        self.poll_interval = poll_interval
+        self.head: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    # ---------------- checkpoint ----------------
+
+    async def _get_checkpoint(self, session: AsyncSession) -> Optional[dict]:
+        rs = await session.execute(
+            text("SELECT block_number, block_hash FROM indexer_checkpoint WHERE nama = :n"),
+            {"n": INDEXER_NAME},
+        )
+        row = rs.mappings().first()
+        return dict(row) if row else None
+
+    async def _save_checkpoint(self, session: AsyncSession, block_number: int, block_hash: str) -> None:
+        await session.execute(
+            text("""
+                INSERT INTO indexer_checkpoint (nama, block_number, block_hash, updated_at)
+                VALUES (:n, :bn, :bh, NOW())
+                ON CONFLICT (nama)
+                DO UPDATE SET block_number = EXCLUDED.block_number,
+                              block_hash   = EXCLUDED.block_hash,
+                              updated_at   = NOW()
+            """),
+            {"n": INDEXER_NAME, "bn": block_number, "bh": block_hash},
+        )
+
+    async def _rewind(self, session: AsyncSession, to_block: int) -> None:
+        await session.execute(
+            text("DELETE FROM work_registered_event WHERE block_number > :bn"),
+            {"bn": to_block},
+        )
+        if to_block < self.start_block:
+            await session.execute(
+                text("DELETE FROM indexer_checkpoint WHERE nama = :n"),
+                {"n": INDEXER_NAME},
+            )
+            return
+        block = await rpc_client.call("eth_getBlockByNumber", [hex(to_block), False])
+        await self._save_checkpoint(session, to_block, block["hash"].lower())
+
+    # ---------------- logs ----------------
+
+    async def _get_logs(self, from_block: int, to_block: int) -> list[dict]:
+        return await rpc_client.call(
+            "eth_getLogs",
+            [{
+                "address": self.contract_address,
+                "topics": [WORK_REGISTERED_TOPIC],
+                "fromBlock": hex(from_block),
+                "toBlock": hex(to_block),
+            }],
+        )
+
+    async def _store_events(self, session: AsyncSession, events: list[dict]) -> None:
+        if not events:
+            return
+        await session.execute(
+            text("""
+                INSERT INTO work_registered_event
+                    (file_hash, creator, registrar, title, registered_at,
+                     block_number, block_hash, tx_hash, log_index)
+                VALUES
+                    (:file_hash, :creator, :registrar, :title, to_timestamp(:ts),
+                     :block_number, :block_hash, :tx_hash, :log_index)
+                ON CONFLICT (tx_hash, log_index) DO NOTHING
+            """),
+            events,
+        )
+
+    async def index_once(self, max_ranges: int = 10) -> dict:
+        """
+        1 tick indexer. Return ringkasan (from/to/events) atau {"skipped": ...}.
+        """
+        async with AsyncSessionLocal() as session:
+            got_lock = (
+                await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(hashtext(:k))"),
+                    {"k": f"indexer:{INDEXER_NAME}"},
+                )
+            ).scalar_one()
+            if not got_lock:
+                await session.rollback()
+                return {"skipped": "dipegang proses lain"}
+
+            latest = hex_to_int(await rpc_client.call("eth_blockNumber", []))
+            safe_head = latest - self.confirmations
+            self.head = latest
+            block_cache.note_head(latest)
+
+            cp = await self._get_checkpoint(session)
+            if cp:
+                block = await rpc_client.call("eth_getBlockByNumber", [hex(cp["block_number"]), False])
+                if not block or block["hash"].lower() != cp["block_hash"]:
+                    to_block = max(self.start_block - 1, cp["block_number"] - self.reorg_depth)
+                    logger.warning("reorg terdeteksi di blok %s, mundur ke %s", cp["block_number"], to_block)
+                    await self._rewind(session, to_block)
+                    await session.commit()
+                    return {"reorg": cp["block_number"], "rewind_to": to_block}
+                next_block = cp["block_number"] + 1
+            else:
+                next_block = self.start_block
+
+            from_block = next_block
+            n_events = 0
+            for _ in range(max_ranges):
+                if next_block > safe_head:
+                    break
+                to_block = min(safe_head, next_block + self.range - 1)
+                try:
+                    logs = await self._get_logs(next_block, to_block)
+                except RpcError as e:
+                    if self.range == 1:
+                        raise
+                    # range kebesaran (limit hasil / timeout provider) -> perkecil
+                    self.range = max(1, self.range // 2)
+                    self.last_error = str(e)[:200]
+                    continue
+
+                events = [decode_work_registered(l) for l in logs if not l.get("removed")]
+                await self._store_events(session, events)
+                n_events += len(events)
+                next_block = to_block + 1
+                self.range = min(self.max_range, self.range * 2)
+
+            if next_block > from_block:
+                last_block = await rpc_client.call("eth_getBlockByNumber", [hex(next_block - 1), False])
+                await self._save_checkpoint(session, next_block - 1, last_block["hash"].lower())
+            await session.commit()
+
+        return {"from": from_block, "to": next_block - 1, "events": n_events, "head": latest}
+
+    # ---------------- loop ----------------
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            caught_up = True
+            try:
+                result = await self.index_once()
+                if "reorg" in result:
+                    caught_up = False
+                elif "to" in result:
+                    caught_up = result["to"] >= result["head"] - self.confirmations
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)[:200]
+                logger.warning("event indexer error: %s", e)
+
+            if caught_up:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="event-indexer")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "head": self.head,
+            "range": self.range,
+            "last_error": self.last_error,
+        }
+
+
+event_indexer = EventIndexer()
@@ -0,0 +1,173 @@
+# app/services/fee_oracle.py
+"""
+Estimasi fee EIP-1559 + gas limit untuk registerWork (pengganti angka hardcode 30/1 gwei, 200k gas).
+
+Fee:
+- 1x eth_feeHistory(FEE_HISTORY_BLOCKS, "latest", [FEE_PRIORITY_PERCENTILE]) per blok,
+  dishare semua worker (single-flight) -> tx berikutnya di blok yang sama nggak ke RPC lagi
+- priority = median reward persentil di N blok terakhir (min FEE_MIN_PRIORITY_GWEI)
+- maxFee   = baseFee blok berikutnya * FEE_BASE_MULTIPLIER + priority (maks FEE_MAX_GWEI)
+
+Gas:
+- gas registerWork cuma beda di panjang title (slot storage per 32 byte)
+  -> eth_estimateGas sekali per bucket ceil(len(title)/32), dikali GAS_MARGIN, hasil di-cache
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import NamedTuple, Optional
+
+from app.core.config import settings
+from app.services.block_cache import block_cache
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
+
+logger = logging.getLogger(__name__)
+
+GWEI = 10**9
+
+
+class Fees(NamedTuple):
+    max_fee: int       # wei
+    priority_fee: int  # wei
+    base_fee: int      # baseFee blok berikutnya
+    block: int         # head waktu fee dihitung
+
+
+def title_bucket(title: str) -> int:
+    return (len(title.encode("utf-8")) + 31) // 32
+
+
+class FeeOracle:
+    def __init__(
+        self,
+        history_blocks: int = settings.FEE_HISTORY_BLOCKS,
+        percentile: float = settings.FEE_PRIORITY_PERCENTILE,
+        base_multiplier: float = settings.FEE_BASE_MULTIPLIER,
+        min_priority_gwei: float = settings.FEE_MIN_PRIORITY_GWEI,
+        max_fee_gwei: float = settings.FEE_MAX_GWEI,
+        ttl: float = settings.FEE_CACHE_TTL,
+        gas_margin: float = settings.GAS_MARGIN,
+        gas_fallback: int = settings.GAS_FALLBACK,
+    ):
+        self.history_blocks = history_blocks
+        self.percentile = percentile
+        self.base_multiplier = base_multiplier
+        self.min_priority = int(min_priority_gwei * GWEI)
+        self.max_fee = int(max_fee_gwei * GWEI)
+        self.ttl = ttl
+        self.gas_margin = gas_margin
+        self.gas_fallback = gas_fallback
+        self._fees: Optional[Fees] = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._gas: dict[int, int] = {}
+        self.fee_fetches = 0
+        self.fee_hits = 0
+        self.gas_estimates = 0
+        self.gas_hits = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def _fresh(self) -> bool:
+        if self._fees is None or time.monotonic() - self._fetched_at > self.ttl:
+            return False
+        # head dari receipt watcher / sync sudah lewat -> blok baru, fee lama basi
+        return block_cache.head is None or block_cache.head <= self._fees.block
+
+    def _from_history(self, hist: dict) -> Fees:
+        base_fees = [hex_to_int(b) for b in hist["baseFeePerGas"]]
+        rewards = sorted(hex_to_int(r[0]) for r in hist.get("reward") or [] if r)
+        priority = rewards[len(rewards) // 2] if rewards else self.min_priority
+        priority = max(priority, self.min_priority)
+        # baseFeePerGas punya 1 elemen ekstra: baseFee blok berikutnya
+        base_next = base_fees[-1]
+        head = hex_to_int(hist["oldestBlock"]) + len(base_fees) - 2
+        max_fee = min(int(base_next * self.base_multiplier) + priority, self.max_fee)
+        return Fees(max_fee, min(priority, max_fee), base_next, head)
+
+    def fallback(self) -> Fees:
+        """Fee lama (hardcode sebelumnya) kalau RPC fee history gagal."""
+        return Fees(self.max_fee, self.min_priority, 0, block_cache.head or 0)
+
+    async def fees(self) -> Fees:
+        if self._fresh():
+            self.fee_hits += 1
+            return self._fees
+        async with self._lock:
+            if self._fresh():  # worker lain sudah ambil duluan
+                self.fee_hits += 1
+                return self._fees
+            try:
+                hist = await rpc_client.call(
+                    "eth_feeHistory", [hex(self.history_blocks), "latest", [self.percentile]]
+                )
+                fees = self._from_history(hist)
+            except (RpcError, KeyError, TypeError, ValueError) as e:
+                self.errors += 1
+                self.last_error = str(e)[:200]
+                logger.warning("eth_feeHistory gagal, pakai fee fallback: %s", e)
+                return self._fees or self.fallback()
+            block_cache.note_head(fees.block)
+            self._fees, self._fetched_at = fees, time.monotonic()
+            self.fee_fetches += 1
+            return fees
+
+    def bump(self, max_fee: int, priority_fee: int, bump_percent: float) -> Optional[Fees]:
+        """
+        Fee untuk replacement tx di nonce yang sama: node minta dua-duanya naik >= 10%.
+        Ambil yang lebih tinggi antara fee lama + bump dan fee pasar sekarang.
+        None kalau sudah mentok FEE_MAX_GWEI (replacement pasti ditolak "underpriced").
+        """
+        factor = 1 + bump_percent / 100
+        new_priority = int(priority_fee * factor) + 1
+        new_max = int(max_fee * factor) + 1
+        cur = self._fees
+        if cur is not None:
+            new_priority = max(new_priority, cur.priority_fee)
+            new_max = max(new_max, cur.max_fee)
+        if new_max > self.max_fee:
+            return None
+        return Fees(new_max, min(new_priority, new_max), cur.base_fee if cur else 0,
+                    cur.block if cur else block_cache.head or 0)
+
+    async def gas_limit(self, title: str, tx: dict) -> int:
+        """tx: {"from", "to", "data"} calldata registerWork lengkap (dipakai kalau bucket belum ada)."""
+        bucket = title_bucket(title)
+        gas = self._gas.get(bucket)
+        if gas is not None:
+            self.gas_hits += 1
+            return gas
+        try:
+            estimate = hex_to_int(await rpc_client.call("eth_estimateGas", [tx]))
+        except RpcError as e:
+            # revert / RPC error: jangan di-cache, pakai limit lama
+            self.errors += 1
+            self.last_error = str(e)[:200]
+            return self.gas_fallback
+        self.gas_estimates += 1
+        gas = int(estimate * self.gas_margin)
+        self._gas[bucket] = max(gas, self._gas.get(bucket, 0))
+        return self._gas[bucket]
+
+    def stats(self) -> dict:
+        f = self._fees
+        return {
+            "fees": {
+                "max_fee_gwei": f.max_fee / GWEI,
+                "priority_fee_gwei": f.priority_fee / GWEI,
+                "base_fee_gwei": f.base_fee / GWEI,
+                "block": f.block,
+            } if f else None,
+            "fee_fetches": self.fee_fetches,
+            "fee_hits": self.fee_hits,
+            "gas_buckets": dict(sorted(self._gas.items())),
+            "gas_estimates": self.gas_estimates,
+            "gas_hits": self.gas_hits,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+fee_oracle = FeeOracle()
@@ -0,0 +1,203 @@
+# app/services/hash_bloom.py
+"""
+Bloom filter in-process untuk hash_berkas karya berstatus on_chain / terverifikasi.
+
+Dipakai verify publik: hash yang "pasti tidak ada" di filter langsung dijawab tanpa query Postgres.
+Hash yang "mungkin ada" tetap dicek ke DB (false positive cuma bikin 1 query ekstra).
+
+- index bit diambil langsung dari byte SHA-256 (sudah acak), double hashing h1 + i*h2
+- build: query streaming (server-side cursor) saat startup / POST /admin/bloom/rebuild
+- incremental: add() lokal saat proses ini sendiri bikin karya on_chain, plus refresh delta
+  `updated_at >= since - overlap` tiap BLOOM_REFRESH_INTERVAL untuk tulisan dari proses lain.
+  Karya jadi on_chain jauh sebelum 'terverifikasi' (yang dicek verify publik), jadi jeda refresh
+  nggak bikin karya terverifikasi dijawab "tidak ada".
+- nggak bisa hapus: karya yang ditolak tetap ada di filter sampai rebuild (cuma nambah FP)
+- sebelum build pertama selesai -> might_contain selalu True (semua ke DB)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+BLOOM_STATUSES = "('on_chain', 'terverifikasi')"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.m = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0  # elemen unik (kira-kira: dihitung kalau ada bit baru yang nyala)
+
+    def _indexes(self, hash_hex: str):
+        raw = bytes.fromhex(hash_hex)
+        h1 = int.from_bytes(raw[0:8], "big")
+        h2 = int.from_bytes(raw[8:16], "big") | 1
+        m = self.m
+        return ((h1 + i * h2) % m for i in range(self.k))
+
+    def add(self, hash_hex: str) -> None:
+        new = False
+        bits = self.bits
+        for idx in self._indexes(hash_hex):
+            byte, mask = idx >> 3, 1 << (idx & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, hash_hex: str) -> bool:
+        bits = self.bits
+        return all(bits[idx >> 3] & (1 << (idx & 7)) for idx in self._indexes(hash_hex))
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.k * self.count / self.m)) ** self.k
+
+
+class HashBloom:
+    def __init__(
+        self,
+        capacity: int = settings.BLOOM_CAPACITY,
+        fp_rate: float = settings.BLOOM_FP_RATE,
+        refresh_interval: float = settings.BLOOM_REFRESH_INTERVAL,
+        refresh_overlap: float = settings.BLOOM_REFRESH_OVERLAP,
+    ):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self.filter: Optional[BloomFilter] = None
+        self._since: Optional[datetime] = None
+        self._build_lock = asyncio.Lock()
+        self.checks = 0
+        self.negatives = 0
+        self.builds = 0
+        self.last_error: Optional[str] = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.filter is not None
+
+    def might_contain(self, hash_hex: str) -> bool:
+        if self.filter is None:
+            return True
+        self.checks += 1
+        if hash_hex in self.filter:
+            return True
+        self.negatives += 1
+        return False
+
+    def add(self, hash_hex: str) -> None:
+        if self.filter is not None:
+            self.filter.add(hash_hex.strip().lower())
+
+    async def build(self) -> dict:
+        """Bangun ulang filter dari DB (streaming), lalu swap atomik."""
+        async with self._build_lock:
+            async with AsyncSessionLocal() as session:
+                since = (await session.execute(text("SELECT now()"))).scalar_one()
+                n = (
+                    await session.execute(
+                        text(f"SELECT COUNT(*) FROM karya WHERE status IN {BLOOM_STATUSES}")
+                    )
+                ).scalar_one()
+                bf = BloomFilter(max(self.capacity, n * 2), self.fp_rate)
+                result = await session.stream(
+                    text(f"SELECT hash_berkas FROM karya WHERE status IN {BLOOM_STATUSES}")
+                )
+                async for rows in result.partitions(10_000):
+                    for (h,) in rows:
+                        bf.add(h)
+                    await asyncio.sleep(0)  # jangan monopoli loop untuk tabel besar
+            self.filter = bf
+            self._since = since
+            self.builds += 1
+        return self.stats()
+
+    async def refresh(self) -> int:
+        """Tambah hash yang berubah status sejak refresh terakhir (termasuk dari proses lain)."""
+        if self.filter is None or self._since is None:
+            await self.build()
+            return 0
+        async with AsyncSessionLocal() as session:
+            now = (await session.execute(text("SELECT now()"))).scalar_one()
+            rs = await session.execute(
+                text(f"""
+                    SELECT hash_berkas FROM karya
+                    WHERE status IN {BLOOM_STATUSES}
+                      AND updated_at >= :since
+                """),
+                {"since": self._since - self.refresh_overlap},
+            )
+            hashes = rs.scalars().all()
+        for h in hashes:
+            self.filter.add(h)
+        self._since = now
+        if self.filter.count > self.filter.capacity:
+            # sudah lewat kapasitas -> FP naik, bangun ulang lebih besar
+            await self.build()
+        return len(hashes)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.refresh()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)[:200]
+                logger.warning("refresh bloom filter gagal: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="hash-bloom")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        bf = self.filter
+        return {
+            "ready": bf is not None,
+            "count": bf.count if bf else 0,
+            "capacity": bf.capacity if bf else None,
+            "bits": bf.m if bf else None,
+            "hashes": bf.k if bf else None,
+            "memory_bytes": len(bf.bits) if bf else 0,
+            "target_fp_rate": self.fp_rate,
+            "estimated_fp_rate": round(bf.estimated_fp_rate(), 8) if bf else None,
+            "checks": self.checks,
+            "negatives": self.negatives,
+            "builds": self.builds,
+            "last_error": self.last_error,
+        }
+
+
+hash_bloom = HashBloom()
@@ -0,0 +1,170 @@
+# app/services/merkle_anchor.py
+"""
+Mode deploy "merkle": banyak karya -> 1 transaksi registerWork.
+
+- karya 'dalam antrian' dikumpulkan (maks MERKLE_BATCH_MAX) jadi Merkle tree atas hash_berkas
+- root didaftarkan lewat registerWork(root, registrar, "krearsip-batch:<id>") yang sudah ada
+- proof inklusi per karya disimpan di karya.merkle_proof, root + tx di tabel batch_anchor
+- receipt watcher nggak perlu diubah: semua karya dalam batch punya tx_hash yang sama
+- leaf yang hash-nya sudah terdaftar / sedang dikirim karya lain dikeluarkan dulu (preflight)
+- 2 fase seperti deploy_queue: batch + tx_hash hasil tanda tangan dicommit dulu, baru broadcast
+  (proses mati setelah broadcast nggak bikin batch dikirim 2x)
+- skema tree: lihat app/utils/merkle.py
+"""
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.hash_bloom import hash_bloom
+from app.services.onchain import (
+    BroadcastRejected,
+    abandon_signed_tx,
+    broadcast_register_tx,
+    chain,
+    prepare_register_args,
+    record_signed_tx,
+    requeue_unsent,
+    sign_register_tx_async,
+)
+from app.services.preflight import NOT_PENDING_ELSEWHERE_SQL, mark_skipped, preflight
+from app.utils.merkle import MERKLE_SCHEME, build_tree, verify_proof  # noqa: F401 (re-export)
+
+logger = logging.getLogger(__name__)
+
+
+async def process_next_batch(session: AsyncSession, force: bool = False) -> bool:
+    """
+    Claim antrian -> 1 batch -> kirim root on-chain.
+    Batch baru dikirim kalau isinya >= MERKLE_BATCH_MIN atau job tertua sudah nunggu
+    >= MERKLE_MAX_WAIT detik (atau force). Return True kalau ada batch yang diproses.
+    Error RPC dilempar lagi -> rollback, semua row balik ke antrian.
+    """
+    rs = await session.execute(
+        text(
+            f"""
+            SELECT
+                k.id,
+                k.hash_berkas,
+                p.alamat_wallet,
+                k.updated_at < NOW() - make_interval(secs => :max_wait) AS stale
+            FROM karya k
+            JOIN pengguna p ON p.id = k.pengguna_id
+            WHERE k.status = 'draft'
+              AND k.status_onchain = 'dalam antrian'
+              AND {NOT_PENDING_ELSEWHERE_SQL}
+            ORDER BY k.updated_at
+            LIMIT :n
+            FOR UPDATE OF k SKIP LOCKED
+            """
+        ),
+        {"n": settings.MERKLE_BATCH_MAX, "max_wait": settings.MERKLE_MAX_WAIT},
+    )
+    jobs = rs.mappings().all()
+    if not jobs or not (force or len(jobs) >= settings.MERKLE_BATCH_MIN or jobs[0]["stale"]):
+        await session.rollback()
+        return False
+
+    good, bad = [], []
+    for job in jobs:
+        try:
+            prepare_register_args(job["hash_berkas"], job["alamat_wallet"])
+            good.append(job)
+        except ValueError as e:
+            bad.append((str(job["id"]), f"Deploy gagal: {e}"))
+
+    if bad:
+        await session.execute(
+            text(
+                """
+                UPDATE karya k
+                SET status_onchain   = 'gagal',
+                    alasan_penolakan = v.reason,
+                    updated_at       = NOW()
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:reasons AS text[])) AS v(id, reason)
+                WHERE k.id = v.id
+                """
+            ),
+            {"ids": [b[0] for b in bad], "reasons": [b[1] for b in bad]},
+        )
+
+    # leaf nggak dikirim sendiri -> cukup cek duplikat (isRegistered), tanpa simulasi per leaf
+    skip = await preflight(session, [dict(j) for j in good], simulate=False)
+    if skip:
+        await mark_skipped(
+            session,
+            [(str(j["id"]), skip[j["hash_berkas"]]) for j in good if j["hash_berkas"] in skip],
+        )
+        good = [j for j in good if j["hash_berkas"] not in skip]
+
+    if not good:
+        await session.commit()
+        return True
+
+    root, proofs = build_tree([j["hash_berkas"] for j in good])
+    batch_id = str(uuid.uuid4())
+    label = f"krearsip-batch:{batch_id}"
+
+    # fase 1: error di sini dilempar -> rollback, batch batal, job balik ke antrian
+    registrar = chain.registrar_account.address
+    signed = await sign_register_tx_async(root, label, registrar)
+    tx_hash = signed.tx_hash
+    try:
+        await record_signed_tx(session, signed, root, label, registrar)
+        await session.execute(
+            text(
+                """
+                INSERT INTO batch_anchor (id, merkle_root, leaf_count, label, tx_hash)
+                VALUES (:id, :root, :n, :label, :tx)
+                """
+            ),
+            {"id": batch_id, "root": root, "n": len(proofs), "label": label, "tx": tx_hash},
+        )
+        await session.execute(
+            text(
+                """
+                UPDATE karya k
+                SET tx_hash         = :tx,
+                    status          = 'on_chain',
+                    status_onchain  = 'menunggu',
+                    batch_id        = :batch_id,
+                    merkle_proof    = CAST(v.proof AS jsonb),
+                    updated_at      = NOW()
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:proofs AS text[])) AS v(id, proof)
+                WHERE k.id = v.id
+                """
+            ),
+            {
+                "tx": tx_hash,
+                "batch_id": batch_id,
+                "ids": [str(j["id"]) for j in good],
+                "proofs": [json.dumps(proofs[j["hash_berkas"]]) for j in good],
+            },
+        )
+        await session.commit()
+    except BaseException:
+        await abandon_signed_tx(signed)
+        raise
+    for j in good:
+        hash_bloom.add(j["hash_berkas"])
+
+    # fase 2: broadcast
+    try:
+        await broadcast_register_tx(signed)
+    except BroadcastRejected as e:
+        await requeue_unsent(session, tx_hash)
+        await session.commit()
+        logger.warning("tx batch %s ditolak node, %d karya balik ke antrian: %s", batch_id, len(good), e)
+        raise
+    except Exception as e:
+        # belum pasti: batch tetap 'menunggu', receipt watcher / tx_replacer yang beresin
+        logger.warning("broadcast tx %s (batch %s) belum pasti: %s", tx_hash, batch_id, e)
+        return True
+
+    logger.info("batch %s (%d karya) terkirim, root=%s tx=%s", batch_id, len(good), root, tx_hash)
+    return True
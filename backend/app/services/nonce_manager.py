@@ -0,0 +1,223 @@
+# app/services/nonce_manager.py
+"""
+Nonce allocator lokal untuk akun registrar.
+
+- Nonce disimpan di memori -> nggak perlu get_transaction_count tiap tx
+- Nonce yang gagal dibroadcast dikembalikan (gap) dan dipakai ulang duluan
+- Kalau RPC komplain soal nonce -> resync dari chain (pending count)
+- Antar proses/worker dikoordinasi lewat tabel `registrar_nonce` + pg_advisory_xact_lock:
+  gap juga disimpan di sana (kolom gaps), jadi nonce yang dilepas proses A tetap diisi
+  walaupun proses B sudah maju melewatinya (tanpa itu nonce bolong -> semua tx berikutnya nyangkut)
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal
+
+# potongan pesan error RPC yang artinya nonce lokal sudah nggak sinkron
+NONCE_ERROR_HINTS = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "already known",
+    "replacement transaction underpriced",
+)
+
+
+def is_nonce_error(exc: BaseException) -> bool:
+    msg = str(exc).lower()
+    return any(h in msg for h in NONCE_ERROR_HINTS)
+
+
+class NonceManager:
+    """Allocator nonce thread-safe untuk 1 alamat."""
+
+    def __init__(self, address: str, fetch_chain_nonce: Callable[[str], int]):
+        self.address = address
+        self._fetch_chain_nonce = fetch_chain_nonce
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+        self._gaps: list[int] = []      # min-heap nonce yang dilepas
+        self._pending: set[int] = set()  # nonce yang sudah dibroadcast, belum ke-mine
+
+    def _sync_locked(self) -> int:
+        chain_nonce = int(self._fetch_chain_nonce(self.address))
+        self._next = chain_nonce
+        self._gaps = []
+        self._pending = {n for n in self._pending if n < chain_nonce}
+        return chain_nonce
+
+    def allocate(self, floor: Optional[int] = None) -> int:
+        """
+        Ambil nonce berikutnya.
+        `floor` = next nonce versi DB (proses lain mungkin sudah maju duluan).
+        """
+        with self._lock:
+            if self._next is None:
+                self._sync_locked()
+
+            if floor is not None and floor > self._next:
+                self._next = floor
+                self._gaps = [n for n in self._gaps if n >= floor]
+                heapq.heapify(self._gaps)
+
+            if self._gaps:
+                nonce = heapq.heappop(self._gaps)
+            else:
+                nonce = self._next
+                self._next += 1
+
+            self._pending.add(nonce)
+            return nonce
+
+    def claim(self, nonce: int) -> None:
+        """Pakai gap yang dibagikan lewat DB (reserve_nonce): jangan sampai diambil lagi dari gap lokal."""
+        with self._lock:
+            if nonce in self._gaps:
+                self._gaps.remove(nonce)
+                heapq.heapify(self._gaps)
+            self._pending.add(nonce)
+
+    def release(self, nonce: int) -> None:
+        """Nonce nggak jadi dipakai (broadcast gagal) -> isi lagi nanti."""
+        with self._lock:
+            self._pending.discard(nonce)
+            if self._next is not None and nonce < self._next and nonce not in self._gaps:
+                heapq.heappush(self._gaps, nonce)
+
+    def confirm(self, nonce: int) -> None:
+        with self._lock:
+            self._pending.discard(nonce)
+
+    def resync(self) -> int:
+        """Samakan lagi dengan chain (dipanggil setelah error nonce)."""
+        with self._lock:
+            return self._sync_locked()
+
+    def handle_send_error(self, nonce: int, exc: BaseException) -> None:
+        if is_nonce_error(exc):
+            self.resync()
+        else:
+            self.release(nonce)
+
+    @property
+    def next_nonce(self) -> Optional[int]:
+        return self._next
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "address": self.address,
+                "next_nonce": self._next,
+                "pending": len(self._pending),
+                "gaps": sorted(self._gaps),
+            }
+
+
+def _lock_key(address: str) -> str:
+    return f"registrar_nonce:{address.lower()}"
+
+
+async def reserve_nonce(manager: NonceManager) -> int:
+    """
+    Alokasi nonce yang aman lintas proses:
+    - ambil advisory lock per alamat (transaksi pendek, session sendiri)
+    - gap di DB (dilepas proses mana pun) dipakai duluan
+    - selain itu next_nonce dari DB jadi batas bawah alokasi lokal
+    - simpan next_nonce baru, commit -> lock dilepas
+    """
+    address = manager.address.lower()
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:k))"),
+            {"k": _lock_key(address)},
+        )
+        row = (
+            await session.execute(
+                text("SELECT next_nonce, gaps FROM registrar_nonce WHERE alamat = :a"),
+                {"a": address},
+            )
+        ).first()
+
+        if row is not None and row[1]:
+            nonce = min(row[1])
+            manager.claim(nonce)
+            await session.execute(
+                text("""
+                    UPDATE registrar_nonce
+                    SET gaps = array_remove(gaps, CAST(:n AS bigint)), updated_at = NOW()
+                    WHERE alamat = :a
+                """),
+                {"a": address, "n": nonce},
+            )
+            await session.commit()
+            return nonce
+
+        # allocate bisa manggil RPC (sync pertama kali) -> lempar ke thread
+        nonce = await asyncio.to_thread(manager.allocate, row[0] if row is not None else None)
+
+        await session.execute(
+            text("""
+                INSERT INTO registrar_nonce (alamat, next_nonce, updated_at)
+                VALUES (:a, :n, NOW())
+                ON CONFLICT (alamat)
+                DO UPDATE SET next_nonce = GREATEST(registrar_nonce.next_nonce, EXCLUDED.next_nonce),
+                              updated_at = NOW()
+            """),
+            {"a": address, "n": nonce + 1},
+        )
+        await session.commit()
+    return nonce
+
+
+async def release_nonce(manager: NonceManager, nonce: int) -> None:
+    """
+    Nonce hasil reserve_nonce nggak jadi dibroadcast -> simpan sebagai gap di DB
+    (bukan gap lokal: proses lain yang sudah maju juga harus bisa mengisinya).
+    """
+    address = manager.address.lower()
+    manager.confirm(nonce)  # keluar dari pending lokal, tanpa masuk gap lokal
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:k))"),
+            {"k": _lock_key(address)},
+        )
+        await session.execute(
+            text("""
+                UPDATE registrar_nonce
+                SET gaps = array_append(gaps, CAST(:n AS bigint)), updated_at = NOW()
+                WHERE alamat = :a
+                  AND CAST(:n AS bigint) < next_nonce
+                  AND NOT (CAST(:n AS bigint) = ANY(gaps))
+            """),
+            {"a": address, "n": nonce},
+        )
+        await session.commit()
+
+
+async def resync_nonce(manager: NonceManager) -> int:
+    """Resync dari chain dan timpa next_nonce di DB, gap dikosongkan (dipakai setelah error nonce)."""
+    address = manager.address.lower()
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:k))"),
+            {"k": _lock_key(address)},
+        )
+        chain_nonce = await asyncio.to_thread(manager.resync)
+        await session.execute(
+            text("""
+                INSERT INTO registrar_nonce (alamat, next_nonce, updated_at)
+                VALUES (:a, :n, NOW())
+                ON CONFLICT (alamat)
+                DO UPDATE SET next_nonce = EXCLUDED.next_nonce, gaps = '{}', updated_at = NOW()
+            """),
+            {"a": address, "n": chain_nonce},
+        )
+        await session.commit()
+    return chain_nonce
@@ -0,0 +1,136 @@
+# app/services/nonce_store.py
+"""
+Penyimpanan nonce SIWE (pengganti dict NONCE_STORE per proses).
+
+- MemoryNonceStore : TTL + ukuran dibatasi, cuma valid kalau 1 proses (dev)
+- DbNonceStore     : tabel auth_nonce -> nonce dari /auth/nonce bisa dipakai di worker mana saja
+Pilih lewat settings.NONCE_STORE ("db" / "memory").
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.nonce_repository import NonceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryNonceStore:
+    def __init__(self, ttl: int = settings.NONCE_TTL, maxsize: int = settings.NONCE_MEMORY_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # wallet -> (nonce, expires_at); 1 nonce aktif per wallet (sama seperti dulu)
+        self._entries: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+
+    async def issue(self, wallet: str) -> str:
+        nonce = secrets.token_hex(8)
+        wallet = wallet.lower()
+        self._entries[wallet] = (nonce, time.monotonic() + self.ttl)
+        self._entries.move_to_end(wallet)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return nonce
+
+    async def consume(self, wallet: str, nonce: str) -> bool:
+        wallet = wallet.lower()
+        entry = self._entries.get(wallet)
+        if entry is None or entry[0] != nonce:
+            return False
+        del self._entries[wallet]
+        return time.monotonic() < entry[1]
+
+    async def purge(self) -> int:
+        now = time.monotonic()
+        expired = [w for w, (_, exp) in self._entries.items() if exp <= now]
+        for w in expired:
+            del self._entries[w]
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "size": len(self._entries)}
+
+
+class DbNonceStore:
+    def __init__(self, ttl: int = settings.NONCE_TTL, purge_batch: int = 1000):
+        self.ttl = ttl
+        self.purge_batch = purge_batch
+
+    async def issue(self, wallet: str) -> str:
+        nonce = secrets.token_hex(8)
+        async with AsyncSessionLocal() as session:
+            await NonceRepository.create(session, wallet, nonce, self.ttl)
+            await session.commit()
+        return nonce
+
+    async def consume(self, wallet: str, nonce: str) -> bool:
+        async with AsyncSessionLocal() as session:
+            ok = await NonceRepository.consume(session, wallet, nonce)
+            await session.commit()
+        return ok
+
+    async def purge(self) -> int:
+        """Hapus nonce expired per batch (transaksi pendek, nggak nge-lock tabel lama)."""
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                n = await NonceRepository.purge_expired(session, self.purge_batch)
+                await session.commit()
+            total += n
+            if n < self.purge_batch:
+                return total
+
+    def stats(self) -> dict:
+        return {"backend": "db"}
+
+
+class NoncePurger:
+    def __init__(self, store, interval: float = settings.NONCE_PURGE_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self.purged = 0
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.purged += await self.store.purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("purge nonce gagal: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="nonce-purger")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+
+def _make_store():
+    if settings.NONCE_STORE == "memory":
+        return MemoryNonceStore()
+    if settings.NONCE_STORE == "db":
+        return DbNonceStore()
+    raise ValueError(f"NONCE_STORE tidak dikenal: {settings.NONCE_STORE!r} (pakai 'db' / 'memory')")
+
+
+nonce_store = _make_store()
+nonce_purger = NoncePurger(nonce_store)
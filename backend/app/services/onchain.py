@@ -1,16 +1,23 @@
 # app/services/onchain.py
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from web3 import Web3
-from eth_account import Account
+from eth_utils import is_address, to_checksum_address
 
 from app.eth.krearsip_v2 import get_krearsip_contract
+from app.eth.provider import provider
 from app.core.config import settings
+from app.services.nonce_manager import is_nonce_error, release_nonce, reserve_nonce, resync_nonce
+from app.services.registrar_pool import RegistrarLane, RegistrarPool
+from app.services.block_cache import BlockInfo, block_cache
+from app.services.fee_oracle import Fees, fee_oracle
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
 
 # -------- Web3 + account setup --------
 
@@ -18,20 +25,84 @@ SEPOLIA_RPC = settings.SEPOLIA_RPC
 REGISTRAR_PRIVATE_KEY = settings.REGISTRAR_PRIVATE_KEY
 CHAIN_ID = int(getattr(settings, "ETH_CHAIN_ID", 11155111))
 
-w3 = Web3(Web3.HTTPProvider(SEPOLIA_RPC))
+# setting yang wajib ada untuk kirim tx / baca kontrak
+CHAIN_SETTINGS = ("SEPOLIA_RPC", "KREARSIP_V2_ADDRESS", "REGISTRAR_PRIVATE_KEY")
 
-# HATI-HATI: hanya dipanggil sekali di startup
-Account.enable_unaudited_hdwallet_features()
-registrar_account = Account.from_key(REGISTRAR_PRIVATE_KEY)
-
-contract = get_krearsip_contract()
 
+class ChainContext:
+    """
+    Objek chain (Web3, contract, pool registrar) dibuat saat pertama dipakai, bukan waktu import
+    -> app (mis. replika read-only) tetap bisa start tanpa RPC / key registrar.
+    """
 
-def send_register_tx(file_hash_hex: str, title: str, creator_address: str) -> str:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._contract = None
+        self._registrar_pool: Optional[RegistrarPool] = None
+
+    @staticmethod
+    def missing() -> list[str]:
+        return [name for name in CHAIN_SETTINGS if not getattr(settings, name)]
+
+    @property
+    def configured(self) -> bool:
+        return not self.missing()
+
+    @staticmethod
+    def _require(*names: str) -> None:
+        missing = [name for name in names if not getattr(settings, name)]
+        if missing:
+            raise RuntimeError(f"Konfigurasi chain belum lengkap: {', '.join(missing)} belum diset")
+
+    @property
+    def w3(self):
+        self._require("SEPOLIA_RPC")
+        return provider.w3  # pool koneksi shared (app/eth/provider.py)
+
+    @property
+    def contract(self):
+        if self._contract is None:
+            self._require("SEPOLIA_RPC", "KREARSIP_V2_ADDRESS")
+            self._contract = get_krearsip_contract()
+        return self._contract
+
+    @property
+    def registrar_pool(self) -> RegistrarPool:
+        if self._registrar_pool is None:
+            with self._lock:
+                if self._registrar_pool is None:
+                    self._require("SEPOLIA_RPC", "REGISTRAR_PRIVATE_KEY")
+                    # pool registrar: key utama + REGISTRAR_PRIVATE_KEYS, tiap key punya lane nonce
+                    # sendiri (pending count dari chain cuma dipakai waktu sync/resync)
+                    self._registrar_pool = RegistrarPool.from_keys(
+                        [REGISTRAR_PRIVATE_KEY, *settings.REGISTRAR_PRIVATE_KEYS.split(",")],
+                        lambda addr: self.w3.eth.get_transaction_count(addr, "pending"),
+                        max_failures=settings.REGISTRAR_MAX_FAILURES,
+                        cooldown_seconds=settings.REGISTRAR_COOLDOWN_SECONDS,
+                    )
+        return self._registrar_pool
+
+    @property
+    def registrar_account(self):
+        return self.registrar_pool.primary.account
+
+
+chain = ChainContext()
+
+
+async def check_registrars() -> list[dict]:
+    """Cek otorisasi semua lane registrar ke kontrak (owner / isRegistrar)."""
+    pool = chain.registrar_pool
+    await asyncio.to_thread(pool.check_authorization, chain.contract)
+    return pool.stats()
+
+
+def prepare_register_args(file_hash_hex: str, creator_address: str) -> Tuple[bytes, str]:
     """
-    Kirim tx registerWork(fileHash, creator, title) ke KrearsipV2.
+    Validasi + normalisasi argumen registerWork (tanpa RPC).
     - file_hash_hex: sha256 hex string (64 char), boleh dengan / tanpa '0x'
     - creator_address: alamat wallet kreator (0x....40 char)
+    Return: (fileHash bytes32, creator checksum address)
     """
 
     # --- normalisasi & validasi hash ---
@@ -53,41 +124,305 @@ def send_register_tx(file_hash_hex: str, title: str, creator_address: str) -> st
         raise ValueError("hash_berkas mengandung karakter non-hex")
 
     # jadikan bytes32
-    file_hash_bytes32 = Web3.to_bytes(hexstr="0x" + h)
+    file_hash_bytes32 = bytes.fromhex(h)
 
     # --- normalisasi & validasi alamat creator ---
     if not creator_address:
         raise ValueError("alamat_wallet kreator kosong")
 
     addr = creator_address.strip()
-    if not Web3.is_address(addr):
+    if not is_address(addr):
         raise ValueError(f"alamat_wallet kreator tidak valid: {addr}")
 
-    creator_checksum = Web3.to_checksum_address(addr)
+    return file_hash_bytes32, to_checksum_address(addr)
+
 
-    # --- build & sign tx ---
-    nonce = w3.eth.get_transaction_count(registrar_account.address)
+class BroadcastRejected(Exception):
+    """Node menolak tx (error JSON-RPC) -> pasti nggak masuk mempool, aman dikirim ulang dari awal."""
 
-    tx = contract.functions.registerWork(
+
+class SignedRegisterTx(NamedTuple):
+    tx_hash: str
+    raw: bytes
+    lane: RegistrarLane
+    nonce: int
+    fees: Fees
+    gas: int
+
+
+def sign_register_tx(
+    file_hash_hex: str,
+    title: str,
+    creator_address: str,
+    nonce: int,
+    lane: RegistrarLane,
+    fees: Fees,
+    gas: int,
+) -> Tuple[str, bytes]:
+    """Build + tanda tangan registerWork (tanpa broadcast). Return (tx_hash, raw tx)."""
+    file_hash_bytes32, creator_checksum = prepare_register_args(file_hash_hex, creator_address)
+    tx = chain.contract.functions.registerWork(
         file_hash_bytes32,
         creator_checksum,
         title,
     ).build_transaction(
         {
-            "from": registrar_account.address,
+            "from": lane.account.address,
             "nonce": nonce,
             "chainId": CHAIN_ID,
-            "gas": 200_000,
-            "maxFeePerGas": w3.to_wei("30", "gwei"),
-            "maxPriorityFeePerGas": w3.to_wei("1", "gwei"),
+            "gas": gas,
+            "maxFeePerGas": fees.max_fee,
+            "maxPriorityFeePerGas": fees.priority_fee,
         }
     )
+    signed = lane.account.sign_transaction(tx)
+    return "0x" + signed.hash.hex().removeprefix("0x"), signed.rawTransaction
+
 
-    signed = registrar_account.sign_transaction(tx)
-    tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
+def broadcast_raw_tx(raw: bytes) -> str:
+    """eth_sendRawTransaction. Error JSON-RPC (ValueError di web3) -> BroadcastRejected."""
+    try:
+        tx_hash = chain.w3.eth.send_raw_transaction(raw)
+    except ValueError as e:
+        raise BroadcastRejected(str(e)) from e
     return tx_hash.hex()
 
 
+def send_register_tx(
+    file_hash_hex: str,
+    title: str,
+    creator_address: str,
+    nonce: Optional[int] = None,
+    lane: Optional[RegistrarLane] = None,
+    fees: Optional[Fees] = None,
+    gas: Optional[int] = None,
+) -> str:
+    """
+    Kirim tx registerWork(fileHash, creator, title) ke KrearsipV2.
+    - lane: akun registrar yang dipakai (default: registrar utama)
+    - nonce: hasil reserve_nonce() (deploy worker). Kalau None, ambil dari nonce manager lane.
+    - fees / gas: dari fee_oracle (default: fee fallback + GAS_FALLBACK, tanpa RPC)
+    """
+    prepare_register_args(file_hash_hex, creator_address)
+
+    lane = lane or chain.registrar_pool.primary
+    fees = fees or fee_oracle.fallback()
+
+    own_nonce = nonce is None
+    if own_nonce:
+        nonce = lane.nonces.allocate()
+
+    try:
+        _, raw = sign_register_tx(
+            file_hash_hex, title, creator_address, nonce, lane, fees, gas or settings.GAS_FALLBACK
+        )
+        return broadcast_raw_tx(raw)
+    except Exception as e:
+        if own_nonce:
+            lane.nonces.handle_send_error(nonce, e)
+        raise
+
+
+async def sign_register_tx_async(file_hash_hex: str, title: str, creator_address: str) -> SignedRegisterTx:
+    """
+    Siapkan tx registerWork tanpa broadcast:
+    - validasi dulu (ValueError) sebelum makan nonce
+    - registrar dipilih dari pool (lane paling longgar yang sehat)
+    - fee dari fee_oracle (cache per blok), gas limit per bucket panjang title
+    - nonce di-reserve lewat DB advisory lock per alamat (aman lintas worker/proses)
+    - signing jalan di thread
+    Lane tetap ke-acquire sampai broadcast_register_tx dipanggil.
+    """
+    file_hash_bytes32, creator_checksum = prepare_register_args(file_hash_hex, creator_address)
+
+    registrar_pool = chain.registrar_pool
+    contract = chain.contract
+    lane = registrar_pool.acquire()
+    try:
+        fees = await fee_oracle.fees()
+        gas = await fee_oracle.gas_limit(
+            title,
+            {
+                "from": lane.address,
+                "to": contract.address,
+                "data": contract.encodeABI(
+                    fn_name="registerWork", args=[file_hash_bytes32, creator_checksum, title]
+                ),
+            },
+        )
+        nonce = await reserve_nonce(lane.nonces)
+    except Exception:
+        registrar_pool.release(lane)
+        raise
+
+    try:
+        tx_hash, raw = await asyncio.to_thread(
+            sign_register_tx, file_hash_hex, title, creator_address, nonce, lane, fees, gas
+        )
+    except Exception:
+        registrar_pool.release(lane)
+        await release_nonce(lane.nonces, nonce)
+        raise
+    return SignedRegisterTx(tx_hash, raw, lane, nonce, fees, gas)
+
+
+async def broadcast_register_tx(signed: SignedRegisterTx) -> str:
+    """
+    Broadcast tx hasil sign_register_tx_async.
+    - BroadcastRejected: nonce dikembalikan (gap) / resync kalau error nonce, lalu dilempar
+    - error lain (timeout, koneksi putus di tengah): tx mungkin sudah sampai node ->
+      nonce NGGAK dilepas; kalau ternyata nggak sampai, tx_replacer yang kirim ulang di nonce sama
+    """
+    registrar_pool = chain.registrar_pool
+    try:
+        tx_hash = await asyncio.to_thread(broadcast_raw_tx, signed.raw)
+    except BroadcastRejected as e:
+        registrar_pool.report_failure(signed.lane, e)
+        if is_nonce_error(e):
+            await resync_nonce(signed.lane.nonces)
+        else:
+            await release_nonce(signed.lane.nonces, signed.nonce)
+        raise
+    except Exception as e:
+        registrar_pool.report_failure(signed.lane, e)
+        raise
+    registrar_pool.report_success(signed.lane)
+    return tx_hash
+
+
+async def abandon_signed_tx(signed: SignedRegisterTx) -> None:
+    """Tx sudah ditandatangani tapi fase 1 gagal commit -> belum pernah dikirim, nonce + lane dilepas."""
+    chain.registrar_pool.release(signed.lane)
+    await release_nonce(signed.lane.nonces, signed.nonce)
+
+
+async def record_signed_tx(
+    session: AsyncSession, signed: SignedRegisterTx, file_hash_hex: str, title: str, creator_address: str
+) -> None:
+    await record_sent_tx(
+        session, signed.tx_hash, signed.lane.address, signed.nonce, signed.fees, signed.gas,
+        file_hash_hex, title, creator_address,
+    )
+
+
+async def send_register_tx_async(
+    file_hash_hex: str,
+    title: str,
+    creator_address: str,
+    session: Optional[AsyncSession] = None,
+) -> str:
+    """
+    Sign + broadcast sekaligus (jalur admin manual).
+    - session: kalau ada, nonce + fee dicatat di registrar_tx (buat tx_replacer),
+      commit diserahkan ke caller
+    Deploy worker pakai jalur 2 fase (lihat deploy_queue): tx_hash dicommit dulu, baru broadcast.
+    """
+    signed = await sign_register_tx_async(file_hash_hex, title, creator_address)
+    try:
+        tx_hash = await broadcast_register_tx(signed)
+    except BroadcastRejected:
+        raise
+    except Exception:
+        # tx nggak dicatat di mana pun -> nonce dilepas (kalau ternyata sampai, tx berikutnya
+        # kena "nonce too low" lalu resync; lebih baik daripada nonce bolong selamanya)
+        await release_nonce(signed.lane.nonces, signed.nonce)
+        raise
+    if session is not None:
+        await record_signed_tx(session, signed, file_hash_hex, title, creator_address)
+    return tx_hash
+
+
+async def requeue_unsent(session: AsyncSession, tx_hash: str) -> int:
+    """
+    Tx yang sudah dicommit (fase 1) ternyata ditolak node -> karya balik ke antrian,
+    batch / catatan registrar_tx-nya dihapus. Commit diserahkan ke caller.
+    """
+    rs = await session.execute(
+        text(
+            """
+            UPDATE karya
+            SET tx_hash        = NULL,
+                status         = 'draft',
+                status_onchain = 'dalam antrian',
+                batch_id       = NULL,
+                merkle_proof   = NULL,
+                updated_at     = NOW()
+            WHERE tx_hash = :tx AND status_onchain = 'menunggu'
+            """
+        ),
+        {"tx": tx_hash},
+    )
+    await session.execute(text("DELETE FROM batch_anchor WHERE tx_hash = :tx"), {"tx": tx_hash})
+    await session.execute(text("DELETE FROM registrar_tx WHERE tx_hash = :tx"), {"tx": tx_hash})
+    return rs.rowcount
+
+
+async def record_sent_tx(
+    session: AsyncSession,
+    tx_hash: str,
+    sender: str,
+    nonce: int,
+    fees: Fees,
+    gas: int,
+    file_hash_hex: str,
+    title: str,
+    creator_address: str,
+    replaces: Optional[str] = None,
+) -> None:
+    """Catat tx registerWork yang sudah dibroadcast (argumen lengkap -> bisa ditandatangani ulang)."""
+    await session.execute(
+        text(
+            """
+            INSERT INTO registrar_tx (
+                tx_hash, sender, nonce, max_fee, priority_fee, gas,
+                file_hash, title, creator, sent_block, replaces, replacements
+            )
+            SELECT :tx, :sender, :nonce, :max_fee, :priority_fee, :gas,
+                   :file_hash, :title, :creator, :block, CAST(:replaces AS varchar),
+                   COALESCE(
+                     (SELECT p.replacements + 1 FROM registrar_tx p WHERE p.tx_hash = :replaces), 0
+                   )
+            ON CONFLICT (tx_hash) DO NOTHING
+            """
+        ),
+        {
+            "tx": tx_hash,
+            "sender": sender.lower(),
+            "nonce": nonce,
+            "max_fee": fees.max_fee,
+            "priority_fee": fees.priority_fee,
+            "gas": gas,
+            "file_hash": file_hash_hex.lower().removeprefix("0x"),
+            "title": title,
+            "creator": creator_address.lower(),
+            "block": fees.block or block_cache.head,
+            "replaces": replaces,
+        },
+    )
+
+
+async def mark_tx_sent(session: AsyncSession, karya_id: UUID | str, tx_hash: str) -> None:
+    """
+    Simpan tx_hash hasil registerWork:
+    - status jadi 'on_chain', status_onchain 'menunggu' (nunggu receipt)
+    - commit diserahkan ke caller (biar bisa satu transaksi dengan lock antrian)
+    """
+    await session.execute(
+        text(
+            """
+            UPDATE karya
+            SET 
+                tx_hash = :tx_hash,
+                status = 'on_chain',
+                status_onchain = 'menunggu',
+                updated_at = NOW()
+            WHERE id = :kid
+            """
+        ),
+        {"kid": str(karya_id), "tx_hash": tx_hash},
+    )
+
+
 async def send_register_tx_for_karya(karya_id: UUID, session: AsyncSession) -> str:
     """
     Wrapper level DB:
@@ -128,37 +463,121 @@ async def send_register_tx_for_karya(karya_id: UUID, session: AsyncSession) -> s
     title = row["judul"]
     creator_wallet = row["alamat_wallet"]
 
-    tx_hash = send_register_tx(file_hash_hex, title, creator_wallet)
+    tx_hash = await send_register_tx_async(file_hash_hex, title, creator_wallet, session)
 
-    # simpan tx_hash dan tetap status_onchain='menunggu'
-    await session.execute(
+    await mark_tx_sent(session, karya_id, tx_hash)
+    await session.commit()
+
+    return tx_hash
+
+
+async def apply_receipts(
+    session: AsyncSession,
+    receipts: Dict[str, dict],
+    blocks: Dict[int, BlockInfo | RpcError],
+) -> List[dict]:
+    """
+    Update banyak karya sekaligus dari receipt (format raw JSON-RPC) + info blok (block_cache).
+    - status_onchain: 'berhasil' / 'gagal' sesuai receipt.status
+    - alamat_kontrak diisi alamat KrearsipV2 kalau berhasil
+    - 1 statement UPDATE ... FROM unnest(...) untuk semua tx
+    Commit diserahkan ke caller.
+    """
+    txs, statuses, block_numbers, block_ts = [], [], [], []
+    for tx_hash, receipt in receipts.items():
+        bn = hex_to_int(receipt["blockNumber"])
+        block = blocks.get(bn)
+        if not block or isinstance(block, RpcError):
+            continue
+        txs.append(tx_hash)
+        statuses.append("berhasil" if hex_to_int(receipt.get("status")) == 1 else "gagal")
+        block_numbers.append(bn)
+        block_ts.append(block.timestamp)
+
+    if not txs:
+        return []
+
+    rs = await session.execute(
         text(
             """
-            UPDATE karya
-            SET 
-                tx_hash = :tx_hash,
-                status = 'on_chain',
-                status_onchain = 'menunggu',
-                updated_at = NOW()
-            WHERE id = :kid
+            UPDATE karya k
+            SET status_onchain = CAST(v.status_onchain AS status_onchain),
+                alamat_kontrak = CASE WHEN v.status_onchain = 'berhasil'
+                                      THEN :alamat_kontrak
+                                      ELSE k.alamat_kontrak END,
+                block_number   = v.block_number,
+                waktu_blok     = to_timestamp(v.block_ts),
+                updated_at     = NOW()
+            FROM unnest(
+                CAST(:txs AS text[]),
+                CAST(:statuses AS text[]),
+                CAST(:block_numbers AS bigint[]),
+                CAST(:block_ts AS bigint[])
+            ) AS v(tx_hash, status_onchain, block_number, block_ts)
+            WHERE k.tx_hash = v.tx_hash
+              AND k.status = 'on_chain'
+            RETURNING k.id, k.judul, k.status, k.status_onchain,
+                      k.alamat_kontrak, k.block_number, k.waktu_blok, k.tx_hash
             """
         ),
-        {"kid": str(karya_id), "tx_hash": tx_hash},
+        {
+            "alamat_kontrak": chain.contract.address.lower(),
+            "txs": txs,
+            "statuses": statuses,
+            "block_numbers": block_numbers,
+            "block_ts": block_ts,
+        },
+    )
+    return [dict(r) for r in rs.mappings().all()]
+
+
+async def sync_txs(session: AsyncSession, tx_hashes: List[str]) -> Dict[str, List]:
+    """
+    Sync banyak tx sekaligus: 1 batch receipt + 1 batch block (bukan 2 RPC per karya).
+    Return: updated (row karya), pending (belum ter-mine), errors (tx -> pesan).
+    """
+    hashes = list(dict.fromkeys(h.strip().lower() for h in tx_hashes if h and h.strip()))
+    # eth_blockNumber ikut 1 batch dengan receipt -> block_cache tahu blok mana yang final
+    results = await rpc_client.batch(
+        [("eth_blockNumber", [])] + [("eth_getTransactionReceipt", [h]) for h in hashes]
     )
+    if not isinstance(results[0], RpcError):
+        block_cache.note_head(hex_to_int(results[0]))
+
+    mined: Dict[str, dict] = {}
+    pending: List[str] = []
+    errors: Dict[str, str] = {}
+    for tx_hash, receipt in zip(hashes, results[1:]):
+        if isinstance(receipt, RpcError):
+            errors[tx_hash] = str(receipt)
+        elif receipt is None:
+            pending.append(tx_hash)
+        else:
+            mined[tx_hash] = receipt
+
+    blocks = await block_cache.get_many(
+        (hex_to_int(r["blockNumber"]) for r in mined.values()), session
+    )
+    for tx_hash, receipt in mined.items():
+        block = blocks.get(hex_to_int(receipt["blockNumber"]))
+        if block is None or isinstance(block, RpcError):
+            errors[tx_hash] = f"Gagal ambil blok: {block}"
+
+    updated = await apply_receipts(session, mined, blocks)
     await session.commit()
 
-    return tx_hash
+    return {"updated": updated, "pending": pending, "errors": errors}
 
 
 async def sync_tx_for_karya(karya_id: UUID, session: AsyncSession) -> Dict:
     """
-    Tarik receipt tx_hash dari chain, update status_onchain + status + alamat_kontrak.
+    Tarik receipt tx_hash dari chain, update status_onchain + alamat_kontrak + info blok.
     """
     # Ambil data karya dulu
     rs = await session.execute(
         text(
             """
-            SELECT id, tx_hash, status, status_onchain, alamat_kontrak
+            SELECT id, tx_hash
             FROM karya
             WHERE id = :kid
             """
@@ -173,48 +592,13 @@ async def sync_tx_for_karya(karya_id: UUID, session: AsyncSession) -> Dict:
     if not tx_hash:
         raise ValueError("Karya belum punya tx_hash untuk di-sync")
 
-    # Ambil receipt di chain
-    receipt = w3.eth.get_transaction_receipt(tx_hash)
-    new_onchain_status = "berhasil" if receipt["status"] == 1 else "gagal"
-
-    # Tentukan status karya baru: kalau tx berhasil -> on_chain
-    current_status: str = row["status"]
-    # new_status = "on_chain" if new_onchain_status == "berhasil" else current_status
-
-    # Ambil info blok
-    block_number = receipt["blockNumber"]
-    block = w3.eth.get_block(block_number)
-    block_ts = block["timestamp"]
-
-    # Alamat kontrak: pakai alamat kontrak Krearsip V2 kalau berhasil, kalau tidak pakai nilai lama
-    old_kontrak = row["alamat_kontrak"]
-    new_kontrak = contract.address if new_onchain_status == "berhasil" else old_kontrak
-
-    rs2 = await session.execute(
-        text(
-            """
-            UPDATE karya
-            SET status_onchain = :status_onchain,
-                status        = :status,
-                alamat_kontrak = :alamat_kontrak,
-                block_number  = :block_number,
-                waktu_blok    = to_timestamp(:block_ts),
-                updated_at    = NOW()
-            WHERE id = :kid
-            RETURNING id, judul, status, status_onchain,
-                      alamat_kontrak, block_number, waktu_blok, tx_hash
-            """
-        ),
-        {
-            "kid": karya_id,
-            "status_onchain": new_onchain_status,
-            "status": current_status,
-            "alamat_kontrak": new_kontrak,
-            "block_number": block_number,
-            "block_ts": block_ts,
-        },
-    )
-    data = rs2.mappings().first()
-    await session.commit()
+    result = await sync_txs(session, [tx_hash])
+    if result["errors"]:
+        raise RuntimeError(next(iter(result["errors"].values())))
+    if result["pending"]:
+        raise ValueError("Transaksi belum ter-mine, coba sync lagi nanti")
 
-    return dict(data)
\ No newline at end of file
+    for data in result["updated"]:
+        if str(data["id"]) == str(karya_id):
+            return data
+    raise ValueError("Karya tidak ter-update (status bukan on_chain?)")
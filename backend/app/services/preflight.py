@@ -0,0 +1,248 @@
+# app/services/preflight.py
+"""
+Pre-flight sebelum registerWork dikirim: karya yang pasti revert nggak usah makan nonce + gas.
+
+Urutan cek (yang sudah ketahuan di tahap awal nggak ikut tahap berikutnya):
+1. DB      : hash yang sama sudah berhasil didaftarkan karya lain (status_onchain 'berhasil')
+             -> tx kedua pasti revert "sudah terdaftar"
+             (tx karya lain yang masih 'menunggu' bisa saja revert / hilang -> jangan digagalkan;
+             job seperti itu nggak di-claim dulu, lihat NOT_PENDING_ELSEWHERE_SQL)
+2. mirror  : work_registered_event (kalau INDEXER_ENABLED) -> tanpa RPC
+3. RPC     : 1 JSON-RPC batch: isRegistered(hash) + eth_call simulasi registerWork dari registrar
+             (simulasi ikut nangkep require lain di kontrak, mis. "hash kosong")
+
+Hasil per hash: alasan skip (str) atau None (boleh dikirim).
+Error RPC / revert karena registrar ("not registrar", "not owner") dianggap nggak konklusif
+-> tetap dikirim seperti sebelumnya; preflight nggak boleh jadi alasan antrian macet.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from eth_abi import decode as abi_decode
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.event_repository import WorkEventRepository
+from app.services.onchain import chain, prepare_register_args
+from app.services.rpc_client import RpcError, RpcTransportError, rpc_client
+from app.services.verify_service import IS_REGISTERED_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+SKIP_PREFIX = "Deploy dilewati"
+ERROR_STRING_SELECTOR = "08c379a0"  # Error(string)
+# revert karena akun pengirim, bukan karena karyanya -> jangan tandai karya gagal
+INCONCLUSIVE_REVERTS = ("not registrar", "not owner")
+
+# filter claim antrian (alias k): tunda job yang hash-nya lagi ditunggu receipt-nya di karya lain,
+# job ikut di-claim lagi begitu tx itu berhasil (-> preflight skip) atau gagal (-> dikirim)
+NOT_PENDING_ELSEWHERE_SQL = """
+    NOT EXISTS (
+        SELECT 1 FROM karya o
+        WHERE o.hash_berkas = k.hash_berkas
+          AND o.id <> k.id
+          AND o.tx_hash IS NOT NULL
+          AND o.status_onchain = 'menunggu'
+    )
+"""
+
+
+def revert_reason(err: RpcError) -> Optional[str]:
+    """Ambil alasan revert dari error eth_call (None kalau bukan revert)."""
+    data = err.data
+    if isinstance(data, dict):  # sebagian node: {"data": "0x..."} bersarang
+        data = data.get("data")
+    if isinstance(data, str) and data[2:10] == ERROR_STRING_SELECTOR:
+        try:
+            return abi_decode(["string"], bytes.fromhex(data[10:]))[0]
+        except Exception:
+            pass
+    msg = str(err)
+    if "execution reverted" in msg or err.code == 3:
+        tail = msg.split("execution reverted", 1)[-1]
+        return tail.strip(" :'\"}") or "revert tanpa alasan"
+    return None
+
+
+class PreflightStats:
+    def __init__(self) -> None:
+        self.checked = 0
+        self.skipped_duplicate = 0
+        self.skipped_registered = 0
+        self.skipped_revert = 0
+        self.inconclusive = 0
+        self.rpc_errors = 0
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": settings.DEPLOY_PREFLIGHT,
+            "simulate": settings.DEPLOY_PREFLIGHT_SIMULATE,
+            "checked": self.checked,
+            "skipped": self.skipped_duplicate + self.skipped_registered + self.skipped_revert,
+            "skipped_duplicate": self.skipped_duplicate,
+            "skipped_registered": self.skipped_registered,
+            "skipped_revert": self.skipped_revert,
+            "inconclusive": self.inconclusive,
+            "rpc_errors": self.rpc_errors,
+            "last_error": self.last_error,
+        }
+
+
+preflight_stats = PreflightStats()
+
+
+async def _registered_elsewhere(session: AsyncSession, jobs: list[dict]) -> dict[str, str]:
+    rs = await session.execute(
+        text("""
+            SELECT DISTINCT ON (k.hash_berkas) k.hash_berkas, k.id::text AS id, k.tx_hash
+            FROM karya k
+            WHERE k.hash_berkas = ANY(CAST(:hs AS bpchar[]))
+              AND k.id <> ALL(CAST(:ids AS uuid[]))
+              AND k.tx_hash IS NOT NULL
+              AND k.status_onchain = 'berhasil'
+            ORDER BY k.hash_berkas, k.created_at
+        """),
+        {"hs": [j["hash_berkas"] for j in jobs], "ids": [str(j["id"]) for j in jobs]},
+    )
+    return {
+        r["hash_berkas"]: f"{SKIP_PREFIX}: hash sudah didaftarkan karya lain (karya {r['id']}, tx {r['tx_hash']})"
+        for r in rs.mappings().all()
+    }
+
+
+async def _registered_in_mirror(session: AsyncSession, hashes: list[str]) -> dict[str, str]:
+    found = await WorkEventRepository.get_many(session, hashes)
+    return {
+        h: f"{SKIP_PREFIX}: hash sudah terdaftar on-chain (tx {ev['tx_hash']}, blok {ev['block_number']})"
+        for h, ev in found.items()
+    }
+
+
+async def _check_rpc(jobs: list[dict], simulate: bool) -> dict[str, str]:
+    to = settings.KREARSIP_V2_ADDRESS
+    calls, owners = [], []
+    for j in jobs:
+        h = j["hash_berkas"]
+        calls.append(("eth_call", [{"to": to, "data": IS_REGISTERED_SELECTOR + h}, "latest"]))
+        owners.append((h, "registered"))
+        if simulate:
+            file_hash, creator = prepare_register_args(h, j["alamat_wallet"])
+            data = chain.contract.encodeABI(fn_name="registerWork", args=[file_hash, creator, j["judul"]])
+            calls.append(
+                ("eth_call", [{"from": chain.registrar_account.address, "to": to, "data": data}, "latest"])
+            )
+            owners.append((h, "simulate"))
+
+    out: dict[str, str] = {}
+    for (h, kind), r in zip(owners, await rpc_client.batch(calls)):
+        if h in out:
+            continue
+        if isinstance(r, RpcError):
+            reason = None if isinstance(r, RpcTransportError) else revert_reason(r)
+            if kind == "simulate" and reason and not reason.startswith(INCONCLUSIVE_REVERTS):
+                out[h] = f"{SKIP_PREFIX}: simulasi registerWork revert: {reason}"
+                preflight_stats.skipped_revert += 1
+            elif reason:
+                preflight_stats.inconclusive += 1
+            else:
+                preflight_stats.rpc_errors += 1
+                preflight_stats.last_error = str(r)[:200]
+            continue
+        if kind == "registered" and r and r != "0x" and int(r, 16) != 0:
+            out[h] = f"{SKIP_PREFIX}: hash sudah terdaftar on-chain (isRegistered)"
+            preflight_stats.skipped_registered += 1
+    return out
+
+
+async def preflight(
+    session: AsyncSession,
+    jobs: list[dict],
+    simulate: Optional[bool] = None,
+) -> dict[str, str]:
+    """
+    jobs: row antrian (id, hash_berkas, alamat_wallet, judul) yang argumennya sudah lolos
+    prepare_register_args. Return {hash_berkas: alasan} untuk yang harus dilewati.
+    simulate=False dipakai batch Merkle (leaf nggak dikirim sendiri-sendiri, cukup isRegistered).
+    """
+    if not settings.DEPLOY_PREFLIGHT or not jobs:
+        return {}
+    if simulate is None:
+        simulate = settings.DEPLOY_PREFLIGHT_SIMULATE
+    preflight_stats.checked += len(jobs)
+
+    skip = await _registered_elsewhere(session, jobs)
+    preflight_stats.skipped_duplicate += len(skip)
+
+    if settings.INDEXER_ENABLED:
+        rest = [j["hash_berkas"] for j in jobs if j["hash_berkas"] not in skip]
+        mirror = await _registered_in_mirror(session, rest) if rest else {}
+        preflight_stats.skipped_registered += len(mirror)
+        skip.update(mirror)
+
+    rest_jobs = [j for j in jobs if j["hash_berkas"] not in skip]
+    if rest_jobs:
+        try:
+            skip.update(await _check_rpc(rest_jobs, simulate))
+        except RpcError as e:
+            # batch ditolak / node mati -> kirim seperti biasa, error aslinya muncul di send
+            preflight_stats.rpc_errors += 1
+            preflight_stats.last_error = str(e)[:200]
+            logger.warning("preflight RPC gagal, lanjut kirim tanpa preflight: %s", e)
+    return skip
+
+
+async def mark_skipped(session: AsyncSession, skipped: list[tuple[str, str]]) -> None:
+    """(karya_id, alasan) -> status_onchain 'gagal' + catatan audit 'DEPLOY DILEWATI'. Commit di caller."""
+    if not skipped:
+        return
+    params = {"ids": [s[0] for s in skipped], "reasons": [s[1] for s in skipped]}
+    await session.execute(
+        text("""
+            UPDATE karya k
+            SET status_onchain   = 'gagal',
+                alasan_penolakan = v.reason,
+                updated_at       = NOW()
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:reasons AS text[])) AS v(id, reason)
+            WHERE k.id = v.id
+        """),
+        params,
+    )
+    await session.execute(
+        text("""
+            INSERT INTO catatan_audit(pengguna_id, aksi, muatan)
+            SELECT NULL, 'DEPLOY DILEWATI',
+                   jsonb_build_object('karya_id', v.id, 'alasan', v.reason)
+            FROM unnest(CAST(:ids AS text[]), CAST(:reasons AS text[])) AS v(id, reason)
+        """),
+        params,
+    )
+    for kid, reason in skipped:
+        logger.info("deploy karya %s dilewati: %s", kid, reason)
+
+
+async def skip_report(session: AsyncSession, days: int = 30) -> dict:
+    """Rekap transaksi yang nggak jadi dikirim (dari catatan audit, lintas proses & restart)."""
+    rs = await session.execute(
+        text("""
+            SELECT split_part(muatan->>'alasan', ' (', 1) AS alasan,
+                   COUNT(*) AS jumlah,
+                   MAX(created_at) AS terakhir
+            FROM catatan_audit
+            WHERE aksi = 'DEPLOY DILEWATI'
+              AND created_at >= NOW() - make_interval(days => :days)
+            GROUP BY 1
+            ORDER BY jumlah DESC
+        """),
+        {"days": days},
+    )
+    items = rs.mappings().all()
+    return {
+        "days": days,
+        "skipped_total": sum(i["jumlah"] for i in items),
+        "by_reason": items,
+        "process": preflight_stats.as_dict(),
+    }
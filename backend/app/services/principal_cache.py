@@ -0,0 +1,148 @@
+# app/services/principal_cache.py
+"""
+Cache hasil verifikasi JWT + resolusi user (user_id / wallet / peran).
+
+- key = sha256 token utuh (token beda 1 byte = key beda), value = principal
+- umur entry = min(PRINCIPAL_CACHE_TTL, sisa exp token) -> token expired nggak pernah lolos dari cache
+- invalidasi: UPDATE/DELETE pengguna lewat app -> cache dikosongkan setelah transaksinya commit
+  (app/db/commit_hooks.py), jadi request yang jalan barengan nggak bisa nge-cache ulang peran lama.
+  Cuma di proses yang menulis; perubahan peran langsung di DB / dashboard Supabase dan worker
+  lain paling lambat berlaku PRINCIPAL_CACHE_TTL detik.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from jose import jwt
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.commit_hooks import on_commit_after_write
+
+_PENGGUNA_WRITE_RE = re.compile(
+    r"^\s*(?:UPDATE|DELETE\s+FROM)\s+(?:public\.)?pengguna\b", re.IGNORECASE
+)
+
+
+def _looks_like_uuid(s: str) -> bool:
+    return isinstance(s, str) and len(s) == 36 and "-" in s
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float = settings.PRINCIPAL_CACHE_TTL, maxsize: int = settings.PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # key -> (principal, expires_at monotonic)
+        self._entries: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        k = self.key(token)
+        entry = self._entries.get(k)
+        if entry is None or time.monotonic() >= entry[1]:
+            self._entries.pop(k, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(k)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, principal: dict, exp: Optional[float]) -> None:
+        ttl = self.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        k = self.key(token)
+        self._entries[k] = (principal, time.monotonic() + ttl)
+        self._entries.move_to_end(k)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache()
+
+on_commit_after_write("principal_cache", _PENGGUNA_WRITE_RE, principal_cache.clear)
+
+
+def decode_token(token: str) -> dict:
+    """Decode + verifikasi JWT (raise JWTError kalau nggak valid)."""
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET,
+        audience=settings.JWT_AUD,
+        issuer=settings.JWT_ISS,
+    )
+
+
+async def resolve_principal(token: str, session: AsyncSession) -> dict:
+    """
+    Token -> {"user_id", "wallet", "peran"}; cache dulu, baru decode + DB kalau miss.
+    - sub UUID -> langsung pakai (peran dari token, kalau kosong ambil dari DB)
+    - sub masih 0x... (token versi awal) -> map ke `pengguna` via alamat_wallet (buat baru kalau belum ada)
+    Raise JWTError / ValueError kalau token nggak valid.
+    """
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+
+    payload = decode_token(token)
+    sub = payload.get("sub")
+    wallet = (payload.get("wallet") or "").lower()
+    peran = payload.get("peran")
+
+    if sub and _looks_like_uuid(sub):
+        user_id = sub
+        if peran is None:
+            rs = await session.execute(
+                text("SELECT peran FROM pengguna WHERE id = :uid"),
+                {"uid": user_id},
+            )
+            peran = rs.scalar_one_or_none() or "pencipta"
+    else:
+        addr = (wallet or sub or "").lower()
+        if not addr.startswith("0x"):
+            raise ValueError("Format token tidak dikenali")
+        wallet = addr
+
+        # alamat_wallet selalu lowercase (CHECK constraint) -> bisa pakai unique index langsung
+        row = (
+            await session.execute(
+                text("SELECT id, peran FROM pengguna WHERE alamat_wallet = :w LIMIT 1"),
+                {"w": addr},
+            )
+        ).mappings().first()
+        if row is None:
+            row = (
+                await session.execute(
+                    text("""
+                        INSERT INTO pengguna (alamat_wallet)
+                        VALUES (:w)
+                        RETURNING id, peran
+                    """),
+                    {"w": addr},
+                )
+            ).mappings().one()
+            await session.commit()
+        user_id = str(row["id"])
+        peran = row["peran"]
+
+    principal = {"user_id": user_id, "wallet": wallet or None, "peran": peran}
+    principal_cache.put(token, principal, payload.get("exp"))
+    return dict(principal)
@@ -0,0 +1,135 @@
+# app/services/rate_limit.py
+"""
+Rate limiter sisi client untuk kuota request/detik provider RPC.
+
+- 1 token bucket untuk SEMUA jalur RPC: rpc_client (httpx, async) dan provider Web3 sync
+  (requests, jalan di thread) -> state dijaga threading.Lock, nunggu pakai sleep sesuai jalurnya
+- 1 token = 1 request JSON-RPC (item batch dihitung satu-satu, sama seperti hitungan provider)
+- priority lane: "interactive" (aksi admin) boleh pakai seluruh bucket,
+  "background" (watcher, indexer, deploy worker) cuma boleh pakai token di atas
+  RPC_RATE_INTERACTIVE_RESERVE -> sync massal nggak bisa bikin aksi admin ikut ngantri lama
+- lane dibawa contextvar: diset dependency router admin, ikut terbawa ke asyncio.to_thread
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.core.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+rpc_priority: contextvars.ContextVar[str] = contextvars.ContextVar("rpc_priority", default=BACKGROUND)
+
+
+@contextmanager
+def priority(lane: str) -> Iterator[None]:
+    token = rpc_priority.set(lane)
+    try:
+        yield
+    finally:
+        rpc_priority.reset(token)
+
+
+async def interactive_rpc() -> None:
+    """Dependency FastAPI (async -> contextvar berlaku di handler endpoint)."""
+    rpc_priority.set(INTERACTIVE)
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float = settings.RPC_RATE_LIMIT,
+        burst: Optional[float] = None,
+        interactive_reserve: float = settings.RPC_RATE_INTERACTIVE_RESERVE,
+    ):
+        self.rate = rate  # token/detik, <= 0 = tanpa limit
+        self.burst = burst if burst is not None else (settings.RPC_RATE_BURST or max(1.0, rate))
+        self.reserve = self.burst * interactive_reserve
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.waits = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.wait_seconds = {INTERACTIVE: 0.0, BACKGROUND: 0.0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, cost: float, lane: str) -> float:
+        """Ambil token kalau cukup (return 0) atau return berapa detik harus nunggu."""
+        with self._lock:
+            self._refill(time.monotonic())
+            floor = 0.0 if lane == INTERACTIVE else self.reserve
+            # request lebih besar dari bucket tetap dilayani (tunggu sampai bucket penuh)
+            need = min(cost, self.burst - floor)
+            if self._tokens - floor >= need:
+                self._tokens -= cost
+                self.granted[lane] += 1
+                return 0.0
+            return (need - (self._tokens - floor)) / self.rate
+
+    def try_acquire(self, cost: float = 1, lane: Optional[str] = None) -> bool:
+        if not self.enabled:
+            return True
+        return self._take(cost, lane or rpc_priority.get()) == 0.0
+
+    async def acquire(self, cost: float = 1, lane: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        lane = lane or rpc_priority.get()
+        started = None
+        while True:
+            wait = self._take(cost, lane)
+            if wait == 0.0:
+                break
+            if started is None:
+                started = time.monotonic()
+                self.waits[lane] += 1
+            await asyncio.sleep(wait)
+        if started is not None:
+            self.wait_seconds[lane] += time.monotonic() - started
+
+    def acquire_sync(self, cost: float = 1, lane: Optional[str] = None) -> None:
+        """Versi blocking untuk kode yang jalan di thread (Web3 sync)."""
+        if not self.enabled:
+            return
+        lane = lane or rpc_priority.get()
+        started = None
+        while True:
+            wait = self._take(cost, lane)
+            if wait == 0.0:
+                break
+            if started is None:
+                started = time.monotonic()
+                self.waits[lane] += 1
+            time.sleep(wait)
+        if started is not None:
+            self.wait_seconds[lane] += time.monotonic() - started
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            tokens = self._tokens
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "interactive_reserve": self.reserve,
+            "tokens": round(tokens, 2),
+            "granted": dict(self.granted),
+            "waits": dict(self.waits),
+            "wait_seconds": {k: round(v, 3) for k, v in self.wait_seconds.items()},
+        }
+
+
+rpc_limiter = TokenBucket()
@@ -0,0 +1,170 @@
+# app/services/receipt_watcher.py
+"""
+Watcher background: majuin status_onchain karya 'menunggu' tanpa admin hit /admin/sync-tx.
+
+Tiap tick:
+- ambil RECEIPT_BATCH_SIZE tx_hash berbeda dari karya on_chain + 'menunggu', yang paling lama
+  nggak dicek duluan (receipt_checked_at), lalu claim karya-nya (FOR UPDATE SKIP LOCKED -> aman
+  multi proses). 1 batch Merkle = banyak karya, tapi cuma 1 slot tx.
+- 1 JSON-RPC batch: eth_blockNumber + semua receipt
+- receipt yang sudah >= RECEIPT_CONFIRMATIONS konfirmasi -> ambil blok (1 batch) -> apply_receipts
+- receipt_checked_at semua row yang di-claim di-bump -> tx yang nggak kunjung ter-mine pindah ke
+  belakang, tx lebih baru tetap kebagian dicek
+Interval adaptif: cepat kalau ada yang pending, melambat (x2) kalau antrian kosong / RPC error.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.block_cache import block_cache
+from app.services.onchain import apply_receipts
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
+
+logger = logging.getLogger(__name__)
+
+
+async def poll_once(batch_size: int, confirmations: int) -> dict:
+    """
+    1 putaran watcher. Return ringkasan: txs / claimed / applied / waiting.
+    """
+    async with AsyncSessionLocal() as session:
+        rs = await session.execute(
+            text(
+                """
+                WITH txs AS (
+                    SELECT tx_hash
+                    FROM karya
+                    WHERE status = 'on_chain'
+                      AND status_onchain = 'menunggu'
+                      AND tx_hash IS NOT NULL
+                    GROUP BY tx_hash
+                    ORDER BY MIN(receipt_checked_at) NULLS FIRST
+                    LIMIT :n
+                )
+                SELECT k.id, k.tx_hash
+                FROM karya k
+                JOIN txs ON txs.tx_hash = k.tx_hash
+                WHERE k.status = 'on_chain'
+                  AND k.status_onchain = 'menunggu'
+                FOR UPDATE OF k SKIP LOCKED
+                """
+            ),
+            {"n": batch_size},
+        )
+        rows = rs.mappings().all()
+        if not rows:
+            await session.rollback()
+            return {"txs": 0, "claimed": 0, "applied": 0, "waiting": 0}
+
+        hashes = list(dict.fromkeys(r["tx_hash"] for r in rows))
+        results = await rpc_client.batch(
+            [("eth_blockNumber", [])] + [("eth_getTransactionReceipt", [h]) for h in hashes]
+        )
+        latest = results[0]
+        if isinstance(latest, RpcError):
+            raise latest
+        latest = hex_to_int(latest)
+        block_cache.note_head(latest)
+
+        confirmed: dict[str, dict] = {}
+        for tx_hash, receipt in zip(hashes, results[1:]):
+            if receipt is None or isinstance(receipt, RpcError):
+                continue
+            if latest - hex_to_int(receipt["blockNumber"]) + 1 >= confirmations:
+                confirmed[tx_hash] = receipt
+
+        applied = []
+        if confirmed:
+            blocks = await block_cache.get_many(
+                (hex_to_int(r["blockNumber"]) for r in confirmed.values()), session
+            )
+            applied = await apply_receipts(session, confirmed, blocks)
+        # updated_at sengaja nggak disentuh (dipakai list / pagination)
+        await session.execute(
+            text("UPDATE karya SET receipt_checked_at = NOW() WHERE id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": [str(r["id"]) for r in rows]},
+        )
+        await session.commit()
+
+    return {
+        "txs": len(hashes),
+        "claimed": len(rows),
+        "applied": len(applied),
+        "waiting": len(rows) - len(applied),
+    }
+
+
+class ReceiptWatcher:
+    def __init__(
+        self,
+        confirmations: int = settings.RECEIPT_CONFIRMATIONS,
+        min_interval: float = settings.RECEIPT_POLL_MIN,
+        max_interval: float = settings.RECEIPT_POLL_MAX,
+        batch_size: int = settings.RECEIPT_BATCH_SIZE,
+    ):
+        self.confirmations = max(1, confirmations)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+        self.interval = min_interval
+        self.last_result: dict = {}
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    def _next_interval(self, result: dict | None) -> float:
+        if result is None or result["claimed"] == 0:
+            # error / antrian kosong -> melambat (interval bisa 0 habis batch penuh, mulai dari min)
+            return min(self.max_interval, max(self.interval, self.min_interval) * 2)
+        if result["txs"] >= self.batch_size and result["applied"]:
+            # masih banyak backlog -> langsung lanjut (tx yang masih pending sudah dirotasi ke belakang)
+            return 0.0
+        return self.min_interval
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            result = None
+            try:
+                result = await poll_once(self.batch_size, self.confirmations)
+                self.last_result = result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("receipt watcher error: %s", e)
+
+            self.interval = self._next_interval(result)
+            if self.interval <= 0:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self.interval = self.min_interval
+        self._task = asyncio.create_task(self._run(), name="receipt-watcher")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "confirmations": self.confirmations,
+            "last_result": self.last_result,
+        }
+
+
+receipt_watcher = ReceiptWatcher()
@@ -0,0 +1,168 @@
+# app/services/registrar_pool.py
+"""
+Pool beberapa akun registrar untuk registerWork.
+
+Tiap key punya "lane" sendiri:
+- NonceManager sendiri (urutan nonce per EOA independen)
+- health tracking: gagal beruntun -> cooldown, lane di-skip sementara
+- lane yang tidak diotorisasi kontrak (bukan owner / registrar) nggak dipakai
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from app.services.nonce_manager import NonceManager
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+
+
+@dataclass
+class RegistrarLane:
+    account: LocalAccount
+    nonces: NonceManager
+    authorized: Optional[bool] = None  # None = belum dicek
+    in_flight: int = 0
+    sent: int = 0
+    failed: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        return self.account.address
+
+    def is_available(self, now: float) -> bool:
+        return self.authorized is not False and now >= self.cooldown_until
+
+
+@dataclass
+class RegistrarPool:
+    lanes: list[RegistrarLane]
+    max_failures: int = 3
+    cooldown_seconds: float = 60.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _rr: int = 0
+
+    @classmethod
+    def from_keys(
+        cls,
+        private_keys: Iterable[str],
+        fetch_chain_nonce: Callable[[str], int],
+        **kwargs,
+    ) -> "RegistrarPool":
+        from eth_account import Account  # berat, cuma perlu saat pool dibuat
+
+        lanes: list[RegistrarLane] = []
+        seen: set[str] = set()
+        for key in private_keys:
+            key = key.strip()
+            if not key:
+                continue
+            acct = Account.from_key(key)
+            if acct.address in seen:
+                continue
+            seen.add(acct.address)
+            lanes.append(RegistrarLane(acct, NonceManager(acct.address, fetch_chain_nonce)))
+        if not lanes:
+            raise ValueError("Minimal 1 registrar private key harus diset")
+        return cls(lanes=lanes, **kwargs)
+
+    @property
+    def primary(self) -> RegistrarLane:
+        return self.lanes[0]
+
+    def get(self, address: str) -> Optional[RegistrarLane]:
+        address = address.lower()
+        return next((l for l in self.lanes if l.address.lower() == address), None)
+
+    def acquire(self) -> RegistrarLane:
+        """
+        Pilih lane: yang available dengan in_flight paling kecil,
+        tie-break round-robin. Kalau semua lagi cooldown, pakai yang cooldown-nya paling cepat habis.
+        """
+        with self._lock:
+            now = time.monotonic()
+            n = len(self.lanes)
+            order = [self.lanes[(self._rr + i) % n] for i in range(n)]
+            self._rr = (self._rr + 1) % n
+
+            candidates = [l for l in order if l.is_available(now)]
+            if not candidates:
+                candidates = sorted(
+                    (l for l in order if l.authorized is not False),
+                    key=lambda l: l.cooldown_until,
+                )[:1]
+            if not candidates:
+                raise RuntimeError("Tidak ada registrar yang diotorisasi kontrak")
+
+            lane = min(candidates, key=lambda l: l.in_flight)
+            lane.in_flight += 1
+            return lane
+
+    def report_success(self, lane: RegistrarLane) -> None:
+        with self._lock:
+            lane.in_flight = max(0, lane.in_flight - 1)
+            lane.sent += 1
+            lane.consecutive_failures = 0
+            lane.cooldown_until = 0.0
+
+    def report_failure(self, lane: RegistrarLane, exc: BaseException) -> None:
+        with self._lock:
+            lane.in_flight = max(0, lane.in_flight - 1)
+            lane.failed += 1
+            lane.consecutive_failures += 1
+            lane.last_error = str(exc)[:200]
+            if lane.consecutive_failures >= self.max_failures:
+                lane.cooldown_until = time.monotonic() + self.cooldown_seconds
+
+    def release(self, lane: RegistrarLane) -> None:
+        """Lane nggak jadi dipakai (mis. validasi gagal) -> tanpa ngubah health."""
+        with self._lock:
+            lane.in_flight = max(0, lane.in_flight - 1)
+
+    def check_authorization(self, contract) -> None:
+        """
+        Cek lane mana yang boleh registerWork di kontrak: owner, atau `isRegistrar(address)`
+        kalau ABI-nya punya (versi dengan role registrar). Kontrak lama yang belum di-redeploy
+        nggak punya fungsi itu -> call gagal -> cuma owner yang authorized.
+        """
+        owner = contract.functions.owner().call()
+        has_role = any(
+            item.get("type") == "function" and item.get("name") == "isRegistrar"
+            for item in contract.abi
+        )
+        for lane in self.lanes:
+            if lane.address.lower() == str(owner).lower():
+                lane.authorized = True
+            elif has_role:
+                try:
+                    lane.authorized = bool(contract.functions.isRegistrar(lane.address).call())
+                except Exception as e:
+                    lane.authorized = False
+                    lane.last_error = f"isRegistrar gagal: {e}"[:200]
+            else:
+                lane.authorized = False
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "address": l.address,
+                    "authorized": l.authorized,
+                    "available": l.is_available(now),
+                    "in_flight": l.in_flight,
+                    "sent": l.sent,
+                    "failed": l.failed,
+                    "consecutive_failures": l.consecutive_failures,
+                    "cooldown_remaining": max(0.0, round(l.cooldown_until - now, 1)),
+                    "last_error": l.last_error,
+                    "nonce": l.nonces.stats(),
+                }
+                for l in self.lanes
+            ]
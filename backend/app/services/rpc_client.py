@@ -0,0 +1,477 @@
+# app/services/rpc_client.py
+"""
+Client JSON-RPC async yang dishare seluruh app.
+
+- 1 httpx.AsyncClient (connection pool persistent, HTTP/2 kalau paket `h2` ada)
+- support JSON-RPC batch: N request -> 1 round-trip (dipecah per RPC_BATCH_SIZE)
+- beberapa endpoint (RPC_URLS): dipilih berdasarkan EWMA latency, circuit breaker per endpoint,
+  failover kalau gagal transport / HTTP 429 / 5xx
+- call read-only (receipt, blok, eth_call, ...) di-hedge: kalau endpoint utama belum jawab
+  setelah p95 latency-nya, request yang sama dikirim ke endpoint kedua, yang duluan menang
+- tiap request upstream ambil token dari rpc_limiter (kuota req/detik provider, lihat rate_limit);
+  hedge cuma dikirim kalau token tersedia saat itu juga
+- single-flight: call read-only yang identik (method + params) dan lagi jalan di-share,
+  mis. receipt yang sama diminta watcher + admin sync barengan -> 1 request upstream
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import itertools
+import json
+import time
+from collections import deque
+from typing import Any, Iterable, Optional, Sequence
+
+import httpx
+
+from app.core.config import settings
+from app.services.rate_limit import rpc_limiter
+
+
+class RpcError(Exception):
+    """Error dari node (field `error` di respon JSON-RPC) / respon HTTP yang nggak valid."""
+
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class RpcTransportError(RpcError):
+    """Masalah jaringan (koneksi / DNS / timeout)."""
+
+
+def hex_to_int(v: Any) -> Optional[int]:
+    if v is None:
+        return None
+    if isinstance(v, int):
+        return v
+    return int(v, 16)
+
+
+# method read-only: aman dikirim 2x (hedge) / diulang ke endpoint lain
+IDEMPOTENT_METHODS = frozenset({
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_getBlockByHash",
+    "eth_getBlockByNumber",
+    "eth_getLogs",
+    "eth_getTransactionByHash",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+})
+# status HTTP yang artinya endpoint lagi bermasalah (bukan request-nya yang salah)
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class _OwnerCancelled(RpcTransportError):
+    """Pemilik request coalesced di-cancel; follower kirim ulang sendiri."""
+
+
+class RpcEndpoint:
+    """
+    Health 1 URL RPC: EWMA latency, sampel latency terakhir (p95 untuk hedge),
+    circuit breaker (gagal beruntun -> open selama cooldown, lalu half-open 1 percobaan).
+    Selama probe half-open masih jalan, endpoint dianggap belum available -> request lain
+    nggak ikut diarahkan ke situ (paling cuma jadi cadangan terakhir di _ranked).
+    """
+
+    def __init__(self, url: str, alpha: float, breaker_failures: int, breaker_cooldown: float):
+        self.url = url
+        self.alpha = alpha
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.ewma: Optional[float] = None
+        self.samples: deque[float] = deque(maxlen=200)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False  # probe half-open sedang jalan
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def tripped(self) -> bool:
+        return self.consecutive_failures >= self.breaker_failures
+
+    def available(self, now: float) -> bool:
+        return now >= self.open_until and not self.probing
+
+    def begin_probe(self, now: float) -> bool:
+        """Request ini jadi probe half-open? (breaker trip, cooldown lewat, belum ada probe lain)"""
+        if self.tripped and self.available(now):
+            self.probing = True
+            return True
+        return False
+
+    def score(self) -> float:
+        # endpoint yang belum pernah dipakai dicoba duluan biar dapat sampel
+        return self.ewma if self.ewma is not None else 0.0
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def record_success(self, latency: float) -> None:
+        self.samples.append(latency)
+        self.ewma = latency if self.ewma is None else self.alpha * latency + (1 - self.alpha) * self.ewma
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, exc: BaseException) -> None:
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.last_error = str(exc)[:200]
+        if self.tripped:
+            self.open_until = time.monotonic() + self.breaker_cooldown
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        p95 = self.p95()
+        return {
+            "url": self.url,
+            "state": "closed" if not self.tripped
+            else ("open" if now < self.open_until else "half-open"),
+            "probing": self.probing,
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "last_error": self.last_error,
+        }
+
+
+class RpcClient:
+    def __init__(
+        self,
+        urls: str | Sequence[str],
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        batch_size: int = 100,
+        http2: bool = True,
+        ewma_alpha: float = 0.2,
+        breaker_failures: int = 3,
+        breaker_cooldown: float = 30.0,
+        hedge: bool = True,
+        hedge_min_delay: float = 0.05,
+    ):
+        if isinstance(urls, str):
+            urls = [urls]
+        # kosong = RPC belum dikonfigurasi (replika tanpa chain), error baru muncul saat dipakai
+        urls = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+        self.endpoints = [RpcEndpoint(u, ewma_alpha, breaker_failures, breaker_cooldown) for u in urls]
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self._client: Optional[httpx.AsyncClient] = None
+        self._ids = itertools.count(1)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    @property
+    def url(self) -> str:
+        """URL yang sekarang paling diutamakan ("" kalau belum dikonfigurasi)."""
+        ranked = self._ranked()
+        return ranked[0].url if ranked else ""
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    # pool httpx per host -> tiap endpoint dapat max_connections sendiri
+                    max_connections=self.max_connections * len(self.endpoints),
+                    max_keepalive_connections=self.max_connections * len(self.endpoints),
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _ranked(self) -> list[RpcEndpoint]:
+        """Endpoint sehat urut EWMA; yang breaker-nya open ditaruh belakang (jadi cadangan terakhir)."""
+        now = time.monotonic()
+        healthy = sorted((e for e in self.endpoints if e.available(now)), key=RpcEndpoint.score)
+        tripped = sorted((e for e in self.endpoints if not e.available(now)), key=lambda e: e.open_until)
+        return healthy + tripped
+
+    async def _post_to(self, ep: RpcEndpoint, payload: Any, limited: bool = True) -> Any:
+        if limited:
+            await rpc_limiter.acquire(len(payload) if isinstance(payload, list) else 1)
+        ep.requests += 1
+        started = time.monotonic()
+        probe = ep.begin_probe(started)
+        try:
+            return await self._send_to(ep, payload, started)
+        finally:
+            if probe:
+                # hasil probe sudah dicatat (sukses -> closed, gagal -> open lagi); cancel -> boleh probe ulang
+                ep.probing = False
+
+    async def _send_to(self, ep: RpcEndpoint, payload: Any, started: float) -> Any:
+        try:
+            resp = await self.client.post(ep.url, json=payload)
+        except httpx.RequestError as e:
+            # Masalah jaringan / DNS / dll
+            err = RpcTransportError(f"RPC connection error ({ep.url}): {e}")
+            ep.record_failure(err)
+            raise err
+
+        if resp.status_code != 200:
+            if resp.status_code in RETRYABLE_STATUS:
+                err = RpcTransportError(f"RPC HTTP {resp.status_code} ({ep.url}): {resp.text[:200]}")
+                ep.record_failure(err)
+                raise err
+            raise RpcError(f"RPC HTTP {resp.status_code}: {resp.text[:200]}")
+
+        try:
+            data = resp.json()
+        except Exception as e:
+            err = RpcTransportError(f"RPC response is not JSON ({ep.url}): {e}; body={resp.text[:200]}")
+            ep.record_failure(err)
+            raise err
+        ep.record_success(time.monotonic() - started)
+        return data
+
+    async def _hedged(self, primary: RpcEndpoint, backup: RpcEndpoint, payload: Any) -> Any:
+        """
+        Kirim ke primary; kalau belum jawab setelah p95 primary, kirim juga ke backup.
+        Jawaban sukses pertama dipakai, sisanya di-cancel.
+        """
+        delay = max(primary.p95() or self.timeout / 4, self.hedge_min_delay)
+        first = asyncio.create_task(self._post_to(primary, payload))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            if first.exception() is None:
+                return first.result()
+            # primary gagal cepat -> langsung failover ke backup (bukan hedge)
+            return await self._post_to(backup, payload)
+        if not rpc_limiter.try_acquire(len(payload) if isinstance(payload, list) else 1):
+            return await first  # kuota lagi mepet -> jangan buang token untuk hedge
+
+        primary.hedges += 1
+        second = asyncio.create_task(self._post_to(backup, payload, limited=False))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is second:
+                            backup.hedge_wins += 1
+                        return t.result()
+                    error = t.exception()
+        finally:
+            for t in pending:
+                t.cancel()
+        raise error
+
+    async def _post(self, payload: Any, idempotent: bool = False) -> Any:
+        """
+        Kirim ke endpoint terbaik; gagal transport / breaker -> failover ke endpoint berikutnya.
+        Request idempotent boleh di-hedge ke endpoint kedua.
+        """
+        ranked = self._ranked()
+        if not ranked:
+            raise RpcTransportError("RPC belum dikonfigurasi (SEPOLIA_RPC / RPC_URLS kosong)")
+        last: Optional[RpcError] = None
+        i = 0
+        while i < len(ranked):
+            ep = ranked[i]
+            try:
+                if idempotent and self.hedge and i + 1 < len(ranked) and ranked[i + 1].available(time.monotonic()):
+                    i += 1  # backup ikut dipakai di _hedged, kalau gagal lanjut ke berikutnya
+                    return await self._hedged(ep, ranked[i], payload)
+                return await self._post_to(ep, payload)
+            except RpcTransportError as e:
+                last = e
+            i += 1
+        raise last
+
+    @staticmethod
+    def _unwrap(item: dict) -> Any:
+        if "error" in item and item["error"] is not None:
+            err = item["error"]
+            if isinstance(err, dict):
+                return RpcError(f"RPC error: {err}", err.get("code"), err.get("data"))
+            return RpcError(f"RPC error: {err}")
+        return item.get("result")
+
+    @staticmethod
+    def _flight_key(method: str, params: Sequence[Any]) -> Optional[str]:
+        if method not in IDEMPOTENT_METHODS:
+            return None
+        return method + json.dumps(list(params), sort_keys=True, separators=(",", ":"))
+
+    async def _send(self, calls: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        if len(calls) == 1:
+            method, params = calls[0]
+            data = await self._post(
+                {"jsonrpc": "2.0", "method": method, "params": list(params), "id": next(self._ids)},
+                idempotent=method in IDEMPOTENT_METHODS,
+            )
+            if not isinstance(data, dict):
+                raise RpcError(f"RPC response tidak valid: {str(data)[:200]}")
+            return [self._unwrap(data)]
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        results = await asyncio.gather(*(self._batch_chunk(c) for c in chunks))
+        return [r for chunk in results for r in chunk]
+
+    async def _coalesced(self, calls: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        """
+        Kirim `calls`, tapi item read-only yang identik dengan request yang sedang jalan
+        (dari caller lain / duplikat di list ini) nunggu hasil request itu saja.
+        Error per item = instance RpcError; error transport dilempar.
+        """
+        loop = asyncio.get_running_loop()
+        keys = [self._flight_key(m, p) for m, p in calls]
+        waiting: dict[int, asyncio.Future] = {}
+        owned: dict[str, asyncio.Future] = {}
+        send: list[int] = []
+        for i, key in enumerate(keys):
+            if key is not None:
+                fut = self._inflight.get(key)
+                if fut is not None:
+                    waiting[i] = fut
+                    if key not in owned:
+                        self.coalesced += 1
+                    continue
+                fut = owned[key] = self._inflight[key] = loop.create_future()
+                # hasil/error cukup diambil follower; tanpa follower jangan jadi warning
+                fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            send.append(i)
+
+        results: dict[int, Any] = {}
+        try:
+            if send:
+                for i, r in zip(send, await self._send([calls[i] for i in send])):
+                    results[i] = r
+                    if keys[i] is not None:
+                        owned[keys[i]].set_result(r)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                # yang di-cancel cuma owner; follower jangan ikut kena CancelledError
+                e = _OwnerCancelled("request RPC yang di-share dibatalkan pemiliknya")
+            for fut in owned.values():
+                if not fut.done():
+                    fut.set_exception(e)
+            raise
+        finally:
+            for key in owned:
+                self._inflight.pop(key, None)
+
+        for i, fut in waiting.items():
+            try:
+                results[i] = await asyncio.shield(fut)
+            except _OwnerCancelled:
+                # owner batal di tengah jalan -> kirim sendiri (atau ikut owner baru)
+                results[i] = (await self._coalesced([calls[i]]))[0]
+        return [results[i] for i in range(len(calls))]
+
+    async def call(self, method: str, params: Sequence[Any] = ()) -> Any:
+        result = (await self._coalesced([(method, params)]))[0]
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def _batch_chunk(self, calls: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "method": m, "params": list(p), "id": i}
+            for (m, p), i in zip(calls, ids)
+        ]
+        data = await self._post(payload, idempotent=all(m in IDEMPOTENT_METHODS for m, _ in calls))
+        if isinstance(data, dict):
+            # sebagian node balikin 1 error object untuk seluruh batch
+            raise RpcError(f"RPC batch ditolak: {data.get('error', data)}")
+        by_id = {item.get("id"): item for item in data}
+        return [
+            self._unwrap(by_id[i]) if i in by_id else RpcError("RPC batch: respon hilang")
+            for i in ids
+        ]
+
+    async def batch(self, calls: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        """
+        Kirim banyak call sekaligus. Hasil urut sama dengan `calls`;
+        error per item dikembalikan sebagai instance RpcError (nggak di-raise).
+        """
+        if not calls:
+            return []
+        return await self._coalesced(calls)
+
+    def stats(self) -> dict:
+        return {
+            "hedge": self.hedge,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "endpoints": [e.stats() for e in self.endpoints],
+        }
+
+    # ---------------- helper spesifik Ethereum ----------------
+
+    async def get_receipts(self, tx_hashes: Iterable[str]) -> dict[str, Any]:
+        """tx_hash -> receipt (None kalau belum ter-mine / RpcError kalau gagal)."""
+        hashes = list(dict.fromkeys(tx_hashes))
+        results = await self.batch([("eth_getTransactionReceipt", [h]) for h in hashes])
+        return dict(zip(hashes, results))
+
+    async def get_blocks(self, numbers: Iterable[int]) -> dict[int, Any]:
+        """block_number -> block header (tanpa full tx)."""
+        nums = sorted(set(numbers))
+        results = await self.batch([("eth_getBlockByNumber", [hex(n), False]) for n in nums])
+        return dict(zip(nums, results))
+
+    async def warm(self, connections: int = 1) -> dict[str, Any]:
+        """
+        Buka `connections` koneksi keep-alive ke tiap endpoint (eth_blockNumber paralel,
+        langsung ke endpoint -> nggak di-coalesce / di-hedge). Sekalian isi sampel latency
+        EWMA, jadi ranking endpoint sudah masuk akal sebelum traffic pertama.
+        url -> head (int) atau pesan error.
+        """
+        out: dict[str, Any] = {}
+        for ep in self.endpoints:
+            payloads = [
+                {"jsonrpc": "2.0", "id": next(self._ids), "method": "eth_blockNumber", "params": []}
+                for _ in range(max(1, connections))
+            ]
+            results = await asyncio.gather(*(self._post_to(ep, p) for p in payloads), return_exceptions=True)
+            ok = [r for r in results if isinstance(r, dict) and "result" in r]
+            if ok:
+                out[ep.url] = max(hex_to_int(r["result"]) for r in ok)
+            else:
+                out[ep.url] = str(next((r for r in results if isinstance(r, BaseException)), "no result"))[:200]
+        return out
+
+
+rpc_client = RpcClient(
+    settings.RPC_URLS.split(",") if settings.RPC_URLS else settings.SEPOLIA_RPC,
+    timeout=settings.RPC_TIMEOUT,
+    max_connections=settings.RPC_MAX_CONNECTIONS,
+    batch_size=settings.RPC_BATCH_SIZE,
+    http2=settings.RPC_HTTP2,
+    ewma_alpha=settings.RPC_EWMA_ALPHA,
+    breaker_failures=settings.RPC_BREAKER_FAILURES,
+    breaker_cooldown=settings.RPC_BREAKER_COOLDOWN,
+    hedge=settings.RPC_HEDGE,
+    hedge_min_delay=settings.RPC_HEDGE_MIN_DELAY,
+)
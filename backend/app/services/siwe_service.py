@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.security import make_jwt
 from app.repositories.nonce_repository import NonceRepository
+from app.services.crypto_pool import crypto_pool
 from app.repositories.user_repository import UserRepository
 from app.utils.siwe import parse_siwe_message, recover_address, ADDR_RE
 
@@ -11,7 +12,7 @@ class SIWEService:
     async def issue_nonce(session: AsyncSession, wallet: str) -> str:
         if not ADDR_RE.match(wallet): raise ValueError("Alamat wallet tidak valid")
         nonce = secrets.token_urlsafe(16)[:16]
-        await NonceRepository.create(session, wallet.lower(), nonce)
+        await NonceRepository.create(session, wallet.lower(), nonce, settings.NONCE_TTL)
         await session.commit()
         return nonce
 
@@ -25,14 +26,11 @@ class SIWEService:
         if int(m["chainId"]) != settings.CHAIN_ID: raise ValueError("Chain ID tidak cocok")
         if m["address"].lower() != wallet.lower(): raise ValueError("Alamat pada SIWE tidak cocok")
 
-        rec = await NonceRepository.get_valid(session, wallet.lower())
-        if not rec: raise ValueError("Nonce tidak ditemukan/kedaluwarsa")
-        if rec["nonce"] != m["nonce"]: raise ValueError("Nonce tidak cocok")
-
-        recovered = recover_address(message, signature).lower()
+        recovered = (await crypto_pool.run(recover_address, message, signature)).lower()
         if recovered != wallet.lower(): raise ValueError("Signature tidak cocok")
 
-        await NonceRepository.delete_by_id(session, rec["id"])
+        if not await NonceRepository.consume(session, wallet.lower(), m["nonce"]):
+            raise ValueError("Nonce tidak ditemukan/kedaluwarsa")
 
         user = await UserRepository.upsert_by_wallet(session, wallet.lower())
         await session.commit()
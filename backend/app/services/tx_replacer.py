@@ -0,0 +1,286 @@
+# app/services/tx_replacer.py
+"""
+Worker background: tx registerWork yang nyangkut (belum ter-mine > TX_STUCK_BLOCKS blok)
+dikirim ulang di nonce yang sama dengan fee dinaikkan (replacement / speed-up).
+
+Sumber data: tabel registrar_tx (diisi send_register_tx_async): nonce, fee, argumen registerWork.
+Tiap tick:
+- claim tx terbuka (replaced_by NULL, karya masih 'menunggu') yang sent_block <= head - N
+- 1 JSON-RPC batch: receipt tiap tx + nonce 'latest' tiap sender
+- sudah ada receipt                 -> biarkan, receipt watcher yang update karya
+- nonce sudah kepakai tanpa receipt -> versi lain (tx sebelum replacement) yang ter-mine:
+                                       karya.tx_hash dikembalikan ke tx itu
+- masih pending                     -> tanda tangan ulang, fee +TX_BUMP_PERCENT (min fee pasar),
+                                       karya / batch_anchor pindah ke tx_hash baru
+2 fase seperti deploy_queue: semua replacement dicatat + dicommit dulu (lock row dilepas),
+baru dibroadcast. Proses mati setelah broadcast -> hash baru tetap tercatat. Broadcast ditolak
+node -> pemindahan dibatalkan, tx lama terbuka lagi untuk tick berikutnya.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.block_cache import block_cache
+from app.services.fee_oracle import fee_oracle
+from app.services.nonce_manager import is_nonce_error
+from app.services.onchain import (
+    BroadcastRejected,
+    broadcast_raw_tx,
+    chain,
+    record_sent_tx,
+    sign_register_tx,
+)
+from app.services.rpc_client import RpcError, hex_to_int, rpc_client
+
+logger = logging.getLogger(__name__)
+
+# perkiraan waktu blok, cuma untuk tx yang sent_block-nya nggak tercatat
+BLOCK_TIME_ESTIMATE = 12
+
+
+async def _move_tx(session: AsyncSession, old: str, new: str) -> None:
+    await session.execute(
+        text("""
+            UPDATE karya SET tx_hash = :new, updated_at = NOW()
+            WHERE tx_hash = :old AND status_onchain = 'menunggu'
+        """),
+        {"old": old, "new": new},
+    )
+    await session.execute(
+        text("UPDATE batch_anchor SET tx_hash = :new WHERE tx_hash = :old"),
+        {"old": old, "new": new},
+    )
+
+
+async def _undo_replacement(session: AsyncSession, old: str, new: str) -> None:
+    """Replacement nggak pernah masuk mempool -> karya balik ke tx lama, tx baru dihapus."""
+    await _move_tx(session, new, old)
+    await session.execute(
+        text("UPDATE registrar_tx SET replaced_by = NULL WHERE tx_hash = :old AND replaced_by = :new"),
+        {"old": old, "new": new},
+    )
+    await session.execute(text("DELETE FROM registrar_tx WHERE tx_hash = :new"), {"new": new})
+
+
+async def replace_stuck(
+    session: AsyncSession,
+    stuck_blocks: int,
+    bump_percent: float,
+    max_replacements: int,
+    limit: int = 50,
+) -> dict:
+    result = {"claimed": 0, "mined": 0, "reconciled": 0, "replaced": 0, "capped": 0, "errors": 0}
+    head = hex_to_int(await rpc_client.call("eth_blockNumber"))
+    block_cache.note_head(head)
+
+    rs = await session.execute(
+        text("""
+            SELECT r.tx_hash, r.sender, r.nonce, r.max_fee, r.priority_fee, r.gas,
+                   r.file_hash, r.title, r.creator, r.replacements
+            FROM registrar_tx r
+            WHERE r.replaced_by IS NULL
+              AND r.replacements < :max_rep
+              AND (r.sent_block <= :cutoff
+                   OR (r.sent_block IS NULL
+                       AND r.created_at < NOW() - make_interval(secs => :cutoff_secs)))
+              AND EXISTS (
+                SELECT 1 FROM karya k
+                WHERE k.tx_hash = r.tx_hash AND k.status_onchain = 'menunggu'
+              )
+            ORDER BY r.sender, r.nonce
+            LIMIT :n
+            FOR UPDATE OF r SKIP LOCKED
+        """),
+        {
+            "max_rep": max_replacements,
+            "cutoff": head - stuck_blocks,
+            "cutoff_secs": stuck_blocks * BLOCK_TIME_ESTIMATE,
+            "n": limit,
+        },
+    )
+    rows = rs.mappings().all()
+    result["claimed"] = len(rows)
+    if not rows:
+        await session.rollback()
+        return result
+
+    senders = list(dict.fromkeys(r["sender"] for r in rows))
+    answers = await rpc_client.batch(
+        [("eth_getTransactionReceipt", [r["tx_hash"]]) for r in rows]
+        + [("eth_getTransactionCount", [s, "latest"]) for s in senders]
+    )
+    receipts = answers[: len(rows)]
+    mined_nonce = {
+        s: (None if isinstance(n, RpcError) else hex_to_int(n))
+        for s, n in zip(senders, answers[len(rows):])
+    }
+
+    fees = await fee_oracle.fees()  # fee pasar terkini, jadi batas bawah bump
+    pending: list[tuple[dict, str, bytes, object]] = []  # (row, tx baru, raw, fee) -> fase 2
+    for row, receipt in zip(rows, receipts):
+        if isinstance(receipt, RpcError) or mined_nonce[row["sender"]] is None:
+            result["errors"] += 1
+            continue
+        if receipt is not None:
+            result["mined"] += 1
+            continue
+
+        if mined_nonce[row["sender"]] > row["nonce"]:
+            # nonce sudah dipakai: cari versi lain tx ini yang ter-mine
+            siblings = (
+                await session.execute(
+                    text("""
+                        SELECT tx_hash FROM registrar_tx
+                        WHERE sender = :s AND nonce = :n AND tx_hash <> :tx
+                    """),
+                    {"s": row["sender"], "n": row["nonce"], "tx": row["tx_hash"]},
+                )
+            ).scalars().all()
+            found = await rpc_client.batch([("eth_getTransactionReceipt", [h]) for h in siblings])
+            winner = next(
+                (h for h, r in zip(siblings, found) if r and not isinstance(r, RpcError)), None
+            )
+            if winner:
+                await _move_tx(session, row["tx_hash"], winner)
+                result["reconciled"] += 1
+            else:
+                logger.warning(
+                    "nonce %s %d sudah dipakai tx lain di luar registrar_tx (tx %s)",
+                    row["sender"], row["nonce"], row["tx_hash"],
+                )
+                result["errors"] += 1
+            continue
+
+        lane = chain.registrar_pool.get(row["sender"])
+        bumped = fee_oracle.bump(row["max_fee"], row["priority_fee"], bump_percent)
+        if lane is None or bumped is None:
+            result["capped"] += 1
+            continue
+
+        # fase 1: tanda tangan (tanpa broadcast) + catat, dicommit bareng di akhir loop
+        try:
+            new_hash, raw = await asyncio.to_thread(
+                sign_register_tx,
+                row["file_hash"], row["title"], row["creator"],
+                row["nonce"], lane, bumped, row["gas"],
+            )
+        except Exception as e:
+            result["errors"] += 1
+            logger.warning("tanda tangan replacement tx %s gagal: %s", row["tx_hash"], e)
+            continue
+
+        await record_sent_tx(
+            session, new_hash, row["sender"], row["nonce"], bumped._replace(block=head), row["gas"],
+            row["file_hash"], row["title"], row["creator"], replaces=row["tx_hash"],
+        )
+        await session.execute(
+            text("UPDATE registrar_tx SET replaced_by = :new WHERE tx_hash = :old"),
+            {"old": row["tx_hash"], "new": new_hash},
+        )
+        await _move_tx(session, row["tx_hash"], new_hash)
+        pending.append((row, new_hash, raw, bumped))
+
+    await session.commit()  # lock FOR UPDATE dilepas sebelum broadcast
+
+    # fase 2: broadcast
+    undone = 0
+    for row, new_hash, raw, bumped in pending:
+        try:
+            await asyncio.to_thread(broadcast_raw_tx, raw)
+        except BroadcastRejected as e:
+            await _undo_replacement(session, row["tx_hash"], new_hash)
+            undone += 1
+            if not is_nonce_error(e):
+                result["errors"] += 1
+                logger.warning("replacement tx %s ditolak node: %s", row["tx_hash"], e)
+            # nonce error: tx lama baru saja ter-mine, tick berikutnya yang rekonsiliasi
+            continue
+        except Exception as e:
+            # belum pasti masuk mempool: tx baru tetap tercatat, kalau nyangkut diganti lagi
+            result["errors"] += 1
+            logger.warning("broadcast replacement %s (tx %s) belum pasti: %s", new_hash, row["tx_hash"], e)
+            continue
+        result["replaced"] += 1
+        logger.info(
+            "tx %s nyangkut, diganti %s (nonce %d, maxFee %d -> %d)",
+            row["tx_hash"], new_hash, row["nonce"], row["max_fee"], bumped.max_fee,
+        )
+    if undone:
+        await session.commit()
+    return result
+
+
+class TxReplacer:
+    def __init__(
+        self,
+        interval: float = settings.TX_REPLACER_INTERVAL,
+        stuck_blocks: int = settings.TX_STUCK_BLOCKS,
+        bump_percent: float = settings.TX_BUMP_PERCENT,
+        max_replacements: int = settings.TX_REPLACE_MAX,
+    ):
+        self.interval = interval
+        self.stuck_blocks = stuck_blocks
+        self.bump_percent = bump_percent
+        self.max_replacements = max_replacements
+        self.last_result: dict = {}
+        self.totals = {"replaced": 0, "reconciled": 0, "capped": 0, "errors": 0}
+        self.last_error: str | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    async def tick(self) -> dict:
+        async with AsyncSessionLocal() as session:
+            result = await replace_stuck(
+                session, self.stuck_blocks, self.bump_percent, self.max_replacements
+            )
+        for k in self.totals:
+            self.totals[k] += result[k]
+        self.last_result = result
+        return result
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.tick()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)[:200]
+                logger.warning("tx replacer error: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="tx-replacer")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "stuck_blocks": self.stuck_blocks,
+            "bump_percent": self.bump_percent,
+            "totals": self.totals,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+tx_replacer = TxReplacer()
@@ -0,0 +1,274 @@
+# app/services/upload_sessions.py
+"""
+Sesi upload resumable: create -> PUT chunk di offset (boleh paralel / acak urutan) -> finalize.
+
+Disk (UPLOAD_SPOOL_DIR/<upload_id>/):
+- data      : file dengan ukuran final (di-truncate di awal), chunk ditulis pakai pwrite di offset-nya
+- meta.json : pemilik, judul, size, range yang sudah diterima, progress hash
+- meta.lock : fcntl.flock untuk read-modify-write meta.json -> aman lintas worker uvicorn
+              (asyncio.Lock cuma berlaku di 1 proses; tanpa flock PUT paralel bisa saling timpa range)
+
+Hash incremental: objek sha256 disimpan di memori per sesi dan dimajukan setiap kali prefix
+data yang kontigu bertambah (baca ulang cuma bagian baru, biasanya masih di page cache).
+Saat finalize hash sudah jadi -> nggak perlu baca ulang seluruh file. Kalau proses restart
+(state sha256 nggak bisa diserialisasi) atau chunk diterima worker lain, finalize melanjutkan
+hash dari file.
+
+Catatan: spool lokal per mesin -> kalau multi instance, sesi harus sticky / spool di volume bersama.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import time
+from pathlib import Path
+from typing import AsyncIterable
+
+from app.core.config import settings
+
+READ_BLOCK = 1024 * 1024
+
+
+def _merge(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    out: list[list[int]] = []
+    for s, e in sorted(ranges + [[start, end]]):
+        if out and s <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], e)
+        else:
+            out.append([s, e])
+    return out
+
+
+def _missing(ranges: list[list[int]], size: int) -> list[list[int]]:
+    gaps, pos = [], 0
+    for s, e in ranges:
+        if s > pos:
+            gaps.append([pos, s])
+        pos = max(pos, e)
+    if pos < size:
+        gaps.append([pos, size])
+    return gaps
+
+
+class _Live:
+    """State in-memory per sesi (lock + sha256 yang sedang berjalan)."""
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.sha = hashlib.sha256()
+        self.hashed_upto = 0
+
+
+class UploadSessionStore:
+    def __init__(
+        self,
+        spool_dir: str = settings.UPLOAD_SPOOL_DIR,
+        ttl: float = settings.UPLOAD_SESSION_TTL,
+        chunk_max: int = settings.UPLOAD_CHUNK_MAX,
+        max_size: int = settings.UPLOAD_MAX_BYTES,
+    ):
+        self.root = Path(spool_dir)
+        self.ttl = ttl
+        self.chunk_max = chunk_max
+        self.max_size = max_size
+        self._live: dict[str, _Live] = {}
+
+    # ---------------- file helper ----------------
+
+    def _dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise LookupError("Sesi upload tidak ditemukan")
+        return self.root / upload_id
+
+    def _read_meta(self, upload_id: str) -> dict:
+        try:
+            return json.loads((self._dir(upload_id) / "meta.json").read_text())
+        except FileNotFoundError:
+            raise LookupError("Sesi upload tidak ditemukan")
+
+    def _write_meta(self, meta: dict) -> None:
+        d = self._dir(meta["id"])
+        tmp = d / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, d / "meta.json")  # atomik
+
+    def _add_range(self, upload_id: str, start: int, end: int) -> dict:
+        """Catat range yang diterima (blocking, flock eksklusif per sesi lintas proses)."""
+        try:
+            lock = open(self._dir(upload_id) / "meta.lock", "a")
+        except FileNotFoundError:
+            raise LookupError("Sesi upload tidak ditemukan")
+        with lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                meta = self._read_meta(upload_id)
+                meta["ranges"] = _merge(meta["ranges"], start, end)
+                self._write_meta(meta)
+                return meta
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self, upload_id: str, user_id: str) -> dict:
+        meta = self._read_meta(upload_id)
+        if meta["user_id"] != str(user_id):
+            raise PermissionError("Sesi upload bukan milik Anda")
+        if time.time() > meta["expires_at"]:
+            raise LookupError("Sesi upload sudah kedaluwarsa")
+        return meta
+
+    def _live_for(self, upload_id: str) -> _Live:
+        live = self._live.get(upload_id)
+        if live is None:
+            live = self._live[upload_id] = _Live()
+        return live
+
+    @staticmethod
+    def _hash_range(sha, path: Path, start: int, end: int) -> None:
+        with open(path, "rb") as f:
+            f.seek(start)
+            left = end - start
+            while left > 0:
+                block = f.read(min(READ_BLOCK, left))
+                if not block:
+                    raise IOError("data spool lebih pendek dari yang tercatat")
+                sha.update(block)
+                left -= len(block)
+
+    def _status(self, meta: dict) -> dict:
+        live = self._live.get(meta["id"])
+        return {
+            "upload_id": meta["id"],
+            "judul": meta["judul"],
+            "size": meta["size"],
+            "received": sum(e - s for s, e in meta["ranges"]),
+            "ranges": meta["ranges"],
+            "missing": _missing(meta["ranges"], meta["size"]),
+            "hashed_upto": live.hashed_upto if live else 0,
+            "chunk_max": self.chunk_max,
+            "expires_at": meta["expires_at"],
+        }
+
+    # ---------------- API ----------------
+
+    async def create(self, user_id: str, judul: str, size: int) -> dict:
+        if size <= 0:
+            raise ValueError("Ukuran file harus > 0")
+        if self.max_size and size > self.max_size:
+            raise ValueError(f"File melebihi batas {self.max_size} byte")
+        await asyncio.to_thread(self.purge_expired)
+
+        upload_id = secrets.token_hex(16)
+        d = self._dir(upload_id)
+
+        def _init() -> None:
+            d.mkdir(parents=True)
+            with open(d / "data", "wb") as f:
+                f.truncate(size)  # sparse, nggak makan disk sebelum ditulis
+
+        await asyncio.to_thread(_init)
+        meta = {
+            "id": upload_id,
+            "user_id": str(user_id),
+            "judul": judul,
+            "size": size,
+            "ranges": [],
+            "expires_at": time.time() + self.ttl,
+        }
+        await asyncio.to_thread(self._write_meta, meta)
+        self._live[upload_id] = _Live()
+        return self._status(meta)
+
+    async def status(self, upload_id: str, user_id: str) -> dict:
+        return self._status(await asyncio.to_thread(self._load, upload_id, user_id))
+
+    async def put_chunk(
+        self,
+        upload_id: str,
+        user_id: str,
+        offset: int,
+        body: AsyncIterable[bytes],
+    ) -> dict:
+        meta = await asyncio.to_thread(self._load, upload_id, user_id)
+        size = meta["size"]
+        if offset < 0 or offset >= size:
+            raise ValueError(f"offset di luar file (0..{size - 1})")
+
+        # tulis langsung ke posisinya; chunk lain boleh ditulis paralel (region beda)
+        path = self._dir(upload_id) / "data"
+        fd = await asyncio.to_thread(os.open, path, os.O_WRONLY)
+        pos = offset
+        try:
+            async for piece in body:
+                if pos + len(piece) > size:
+                    raise ValueError("chunk melewati ukuran file")
+                if pos + len(piece) - offset > self.chunk_max:
+                    raise ValueError(f"chunk melebihi {self.chunk_max} byte")
+                await asyncio.to_thread(os.pwrite, fd, piece, pos)
+                pos += len(piece)
+        finally:
+            await asyncio.to_thread(os.close, fd)
+        if pos == offset:
+            raise ValueError("chunk kosong")
+
+        meta = await asyncio.to_thread(self._add_range, upload_id, offset, pos)
+
+        live = self._live_for(upload_id)
+        async with live.lock:
+            # majukan hash sejauh prefix kontigu
+            first = meta["ranges"][0]
+            if first[0] == 0 and first[1] > live.hashed_upto:
+                await asyncio.to_thread(self._hash_range, live.sha, path, live.hashed_upto, first[1])
+                live.hashed_upto = first[1]
+        return self._status(meta)
+
+    async def finalize(self, upload_id: str, user_id: str) -> tuple[dict, str]:
+        """Return (meta, hash_berkas). Raise ValueError kalau masih ada bagian yang belum diterima."""
+        meta = await asyncio.to_thread(self._load, upload_id, user_id)
+        gaps = _missing(meta["ranges"], meta["size"])
+        if gaps:
+            raise ValueError(f"Upload belum lengkap, bagian hilang: {gaps[:10]}")
+
+        live = self._live_for(upload_id)
+        async with live.lock:
+            if live.hashed_upto < meta["size"]:
+                # state hash hilang (restart) / belum maju -> lanjutkan dari posisi terakhir
+                path = self._dir(upload_id) / "data"
+                await asyncio.to_thread(self._hash_range, live.sha, path, live.hashed_upto, meta["size"])
+                live.hashed_upto = meta["size"]
+            return meta, live.sha.hexdigest()
+
+    async def discard(self, upload_id: str) -> None:
+        self._live.pop(upload_id, None)
+        await asyncio.to_thread(shutil.rmtree, self._dir(upload_id), True)
+
+    async def abort(self, upload_id: str, user_id: str) -> None:
+        await asyncio.to_thread(self._load, upload_id, user_id)
+        await self.discard(upload_id)
+
+    def purge_expired(self) -> int:
+        if not self.root.exists():
+            return 0
+        now, n = time.time(), 0
+        for d in self.root.iterdir():
+            try:
+                meta = json.loads((d / "meta.json").read_text())
+                expired = now > meta["expires_at"]
+            except (OSError, ValueError, KeyError):
+                # sesi setengah jadi: buang kalau sudah lebih tua dari TTL
+                try:
+                    expired = now - d.stat().st_mtime > self.ttl
+                except OSError:
+                    continue
+            if expired:
+                shutil.rmtree(d, ignore_errors=True)
+                self._live.pop(d.name, None)
+                n += 1
+        return n
+
+
+upload_sessions = UploadSessionStore()
@@ -0,0 +1,124 @@
+# app/services/verify_service.py
+"""
+Verifikasi publik "file/hash ini sudah terdaftar?".
+
+- hash yang pasti belum terdaftar (bloom filter, lihat hash_bloom) dijawab tanpa query DB
+- sisanya lookup DB: 1 query `hash_berkas = ANY(bpchar[])` (kena index hash_berkas)
+- opsional cross-check on-chain: KrearsipV2.isRegistered(bytes32) untuk semua hash
+  dikirim sebagai 1 JSON-RPC batch eth_call; endpoint publik tanpa auth -> dibatasi
+  VERIFY_ONCHAIN_MAX hash per request biar kuota provider RPC nggak dihabisin anonim
+- yang dianggap terdaftar (dan bukti dikembalikan) cuma karya 'terverifikasi',
+  sama dengan aturan GET /public/works/{id}
+- karya dari batch Merkle: bukti ikut field `merkle` {batch_id, root, proof, scheme}
+  (bentuk sama dengan GET /public/works/{id}), cek on-chain pakai root
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from eth_utils import keccak
+
+from app.core.config import settings
+from app.services.hash_bloom import hash_bloom
+from app.services.rpc_client import RpcError, rpc_client
+from app.utils.merkle import with_merkle
+
+_HASH_RE = re.compile(r"^(?:0x)?([0-9a-fA-F]{64})$")
+IS_REGISTERED_SELECTOR = "0x" + keccak(text="isRegistered(bytes32)")[:4].hex()
+
+
+def normalize_hash(h: str) -> str:
+    m = _HASH_RE.match(h.strip())
+    if not m:
+        raise ValueError(f"hash tidak valid: {h[:80]!r} (harus 64 hex, boleh pakai 0x)")
+    return m.group(1).lower()
+
+
+async def lookup_hashes(session: AsyncSession, hashes: list[str]) -> dict[str, dict]:
+    """hash -> bukti karya terverifikasi (hash yang nggak ketemu nggak ada di dict)."""
+    if not hashes:
+        return {}
+    rs = await session.execute(
+        text("""
+            SELECT DISTINCT ON (k.hash_berkas)
+                k.hash_berkas,
+                k.id::text AS karya_id,
+                k.judul,
+                k.tx_hash,
+                k.alamat_kontrak,
+                k.jaringan_ket,
+                k.block_number,
+                k.waktu_blok,
+                CASE
+                  WHEN k.jaringan_ket = 'sepolia'
+                       AND k.tx_hash ~* '^0x[0-9a-f]{64}$'
+                  THEN 'https://sepolia.etherscan.io/tx/' || lower(k.tx_hash)
+                  ELSE NULL
+                END AS etherscan_url,
+                k.batch_id::text AS batch_id,
+                b.merkle_root,
+                k.merkle_proof
+            FROM karya k
+            LEFT JOIN batch_anchor b ON b.id = k.batch_id
+            WHERE k.hash_berkas = ANY(CAST(:hs AS bpchar[]))
+              AND k.status = 'terverifikasi'
+            ORDER BY k.hash_berkas, k.block_number NULLS LAST, k.created_at
+        """),
+        {"hs": hashes},
+    )
+    return {r["hash_berkas"]: with_merkle(dict(r)) for r in rs.mappings().all()}
+
+
+async def check_onchain(hashes: list[str]) -> dict[str, Optional[bool]]:
+    """hash -> isRegistered di kontrak (None kalau eth_call gagal)."""
+    to = settings.KREARSIP_V2_ADDRESS
+    results = await rpc_client.batch(
+        [("eth_call", [{"to": to, "data": IS_REGISTERED_SELECTOR + h}, "latest"]) for h in hashes]
+    )
+    out: dict[str, Optional[bool]] = {}
+    for h, r in zip(hashes, results):
+        if isinstance(r, RpcError) or not r or r == "0x":
+            out[h] = None
+        else:
+            out[h] = int(r, 16) != 0
+    return out
+
+
+async def verify_hashes(
+    session: AsyncSession,
+    raw_hashes: Iterable[str],
+    onchain: bool = False,
+) -> list[dict]:
+    """
+    Verifikasi banyak hash sekaligus; urutan hasil = urutan input (duplikat dibuang).
+    Raise ValueError kalau ada hash yang formatnya salah, atau onchain=True dengan
+    hash lebih dari VERIFY_ONCHAIN_MAX.
+    """
+    hashes = list(dict.fromkeys(normalize_hash(h) for h in raw_hashes))
+    if onchain and len(hashes) > settings.VERIFY_ONCHAIN_MAX:
+        raise ValueError(
+            f"onchain=true maksimal {settings.VERIFY_ONCHAIN_MAX} hash per request (dapat {len(hashes)})"
+        )
+    # bloom filter: hash yang pasti belum terdaftar nggak perlu ke DB
+    candidates = [h for h in hashes if hash_bloom.might_contain(h)]
+    found = await lookup_hashes(session, candidates)
+    chain: dict[str, Optional[bool]] = {}
+    if onchain:
+        # karya batch Merkle: yang terdaftar di kontrak adalah root-nya
+        keys = {h: (found[h]["merkle"]["root"] if h in found and found[h]["merkle"] else h) for h in hashes}
+        by_key = await check_onchain(list(dict.fromkeys(keys.values())))
+        chain = {h: by_key.get(k) for h, k in keys.items()}
+
+    items = []
+    for h in hashes:
+        proof = found.get(h)
+        item = {"hash_berkas": h, "registered": proof is not None}
+        if proof:
+            item.update({k: v for k, v in proof.items() if k != "hash_berkas"})
+        if onchain:
+            item["onchain_registered"] = chain.get(h)
+        items.append(item)
+    return items
@@ -0,0 +1,191 @@
+# app/services/warmup.py
+"""
+Warmup instance baru sebelum dikasih traffic (dijalankan lifespan sebagai task background).
+
+Langkah (berurutan, masing-masing dibatasi WARMUP_TIMEOUT):
+- db         : buka WARMUP_DB_CONNECTIONS koneksi sekaligus (TCP + TLS + auth ke pooler Supabase),
+               lalu dikembalikan ke pool -> request pertama nggak bayar handshake
+- block_cache: muat blok final dari tabel block_cache
+- counts     : hitung total list yang didaftarkan router (add_count) -> count_cache terisi
+- bloom      : build bloom filter hash terdaftar, lalu loop refresh-nya dijalankan
+- rpc        : WARMUP_RPC_CONNECTIONS koneksi keep-alive ke tiap endpoint rpc_client
+- web3       : (kalau chain dikonfigurasi) import web3, contract + ABI, 1 koneksi sync
+- fees       : (kalau deploy worker jalan) fee history pertama untuk fee_oracle
+
+Readiness (GET /readyz) terpisah dari liveness (GET /healthz):
+- /healthz selalu 200 selama proses hidup
+- /readyz 503 sampai warmup selesai dan langkah wajib (db) sukses; langkah lain best effort,
+  gagal cuma dicatat (mis. RPC mati tetap boleh serve endpoint read-only)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.eth.provider import load_abi, provider
+from app.services.block_cache import block_cache
+from app.services.count_cache import count_total
+from app.services.fee_oracle import fee_oracle
+from app.services.hash_bloom import hash_bloom
+from app.services.onchain import chain
+from app.services.rpc_client import rpc_client
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_STEPS = ("db",)  # gagal -> /readyz tetap 503
+
+
+async def _warm_db(connections: int) -> dict:
+    # koneksi di atas pool_size dibuang lagi waktu dikembalikan -> percuma dibuka
+    n = max(1, min(connections, settings.DB_POOL_SIZE))
+
+    async def _open():
+        return await engine.connect()
+
+    conns = await asyncio.gather(*(_open() for _ in range(n)), return_exceptions=True)
+    opened = [c for c in conns if not isinstance(c, BaseException)]
+    try:
+        await asyncio.gather(*(c.execute(text("SELECT 1")) for c in opened))
+    finally:
+        await asyncio.gather(*(c.close() for c in opened), return_exceptions=True)
+    errors = [c for c in conns if isinstance(c, BaseException)]
+    if not opened:
+        raise errors[0]
+    return {"opened": len(opened), "failed": len(errors), "pool": engine.pool.status()}
+
+
+class Warmup:
+    def __init__(
+        self,
+        enabled: bool = settings.WARMUP_ENABLED,
+        db_connections: int = settings.WARMUP_DB_CONNECTIONS,
+        rpc_connections: int = settings.WARMUP_RPC_CONNECTIONS,
+        timeout: float = settings.WARMUP_TIMEOUT,
+    ):
+        self.enabled = enabled
+        self.db_connections = db_connections
+        self.rpc_connections = rpc_connections
+        self.timeout = timeout
+        self.state = "cold"  # cold -> warming -> ready / failed
+        self.steps: dict[str, dict] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._counts: list[tuple[str, dict]] = []
+        self._task: asyncio.Task | None = None
+
+    def add_count(self, from_where: str, params: Optional[dict] = None) -> None:
+        """Daftarkan total list yang sering diminta (dipanggil modul router waktu import)."""
+        self._counts.append((from_where, params or {}))
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def _step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        started = time.monotonic()
+        try:
+            detail = await asyncio.wait_for(fn(), timeout=self.timeout)
+            self.steps[name] = {"ok": True, "ms": round((time.monotonic() - started) * 1000, 1), "detail": detail}
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.steps[name] = {
+                "ok": False,
+                "ms": round((time.monotonic() - started) * 1000, 1),
+                "error": (str(e) or type(e).__name__)[:200],
+            }
+            logger.warning("warmup %s gagal: %s", name, e)
+            return False
+
+    async def _block_cache(self) -> int:
+        async with AsyncSessionLocal() as session:
+            return await block_cache.warm(session)
+
+    async def _counts_step(self) -> int:
+        async with AsyncSessionLocal() as session:
+            for from_where, params in self._counts:
+                await count_total(session, from_where, params, "cached")
+        return len(self._counts)
+
+    async def _bloom(self) -> int:
+        try:
+            await hash_bloom.build()
+        finally:
+            hash_bloom.start()  # build gagal -> loop refresh yang coba lagi
+        return hash_bloom.filter.count
+
+    async def _web3(self) -> int:
+        load_abi("KrearsipV2")
+        return await asyncio.to_thread(provider.warm)
+
+    async def _fees(self) -> dict:
+        return (await fee_oracle.fees())._asdict()
+
+    async def run(self) -> None:
+        self.state = "warming"
+        self.started_at = time.monotonic()
+        await self._step("db", lambda: _warm_db(self.db_connections))
+        await self._step("block_cache", self._block_cache)
+        if self._counts:
+            await self._step("counts", self._counts_step)
+        if settings.BLOOM_ENABLED:
+            await self._step("bloom", self._bloom)
+        if rpc_client.endpoints:
+            await self._step("rpc", lambda: rpc_client.warm(self.rpc_connections))
+        if settings.SEPOLIA_RPC and settings.KREARSIP_V2_ADDRESS:
+            await self._step("web3", self._web3)
+        if settings.DEPLOY_WORKERS > 0 and chain.configured:
+            await self._step("fees", self._fees)
+        self.finished_at = time.monotonic()
+        failed = [s for s in REQUIRED_STEPS if not self.steps.get(s, {}).get("ok")]
+        self.state = "failed" if failed else "ready"
+        logger.info(
+            "warmup %s dalam %.1fs (%s)", self.state, self.finished_at - self.started_at,
+            ", ".join(f"{k}={'ok' if v['ok'] else 'gagal'}" for k, v in self.steps.items()),
+        )
+
+    async def recheck(self) -> bool:
+        """Dipanggil /readyz kalau warmup 'failed': coba lagi langkah wajib (mis. DB baru pulih)."""
+        if self.state != "failed":
+            return self.ready
+        if await self._step("db", lambda: _warm_db(1)):
+            self.state = "ready"
+        return self.ready
+
+    def start(self) -> None:
+        if not self.enabled:
+            # tanpa warmup: langsung ready, bloom build pertama jalan di loop-nya sendiri
+            self.state = "ready"
+            if settings.BLOOM_ENABLED:
+                hash_bloom.start()
+            return
+        self._task = asyncio.create_task(self.run(), name="warmup")
+
+    async def stop(self) -> None:
+        self.state = "cold"
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "steps": self.steps,
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+from typing import AsyncIterable, Tuple
+
+from app.core.config import settings
+
+
+class StreamingSha256:
+    """
+    SHA-256 incremental untuk body yang datang per potongan.
+    Potongan kecil dikumpulkan sampai `chunk_size`, lalu di-hash di thread
+    (hashlib lepas GIL untuk buffer besar) -> event loop nggak ketahan, memori konstan.
+    """
+
+    def __init__(self, chunk_size: int = settings.UPLOAD_HASH_CHUNK):
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._h = hashlib.sha256()
+        self._buf = bytearray()
+
+    async def update(self, data: bytes) -> None:
+        self.size += len(data)
+        self._buf += data
+        if len(self._buf) >= self.chunk_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._buf:
+            return
+        buf, self._buf = self._buf, bytearray()
+        await asyncio.to_thread(self._h.update, buf)
+
+    async def hexdigest(self) -> str:
+        await self._flush()
+        return self._h.hexdigest()
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+async def sha256_stream(
+    chunks: AsyncIterable[bytes],
+    max_bytes: int = 0,
+    chunk_size: int = settings.UPLOAD_HASH_CHUNK,
+) -> Tuple[str, int]:
+    """
+    Hash seluruh stream -> (hex digest, jumlah byte).
+    Raise UploadTooLarge kalau lewat max_bytes (0 = tanpa batas), ValueError kalau kosong.
+    """
+    hasher = StreamingSha256(chunk_size)
+    async for chunk in chunks:
+        await hasher.update(chunk)
+        if max_bytes and hasher.size > max_bytes:
+            raise UploadTooLarge(f"File melebihi batas {max_bytes} byte")
+    if hasher.size == 0:
+        raise ValueError("File kosong")
+    return await hasher.hexdigest(), hasher.size
@@ -0,0 +1,74 @@
+# app/utils/merkle.py
+"""
+Merkle tree batch anchor (dipakai merkle_anchor untuk bikin batch, endpoint publik untuk bukti).
+
+Skema tree (kompatibel OpenZeppelin MerkleProof.verify):
+- leaf  = keccak256(hash_berkas 32 byte)
+- node  = keccak256(min(a, b) || max(a, b))   (pasangan diurutkan -> proof tanpa bit arah)
+- leaf diurutkan & unik; node ganjil di ujung level naik apa adanya
+"""
+from __future__ import annotations
+
+from eth_utils import keccak
+
+MERKLE_SCHEME = "keccak256-sorted-pairs"
+
+
+def leaf_hash(hash_hex: str) -> bytes:
+    return keccak(bytes.fromhex(hash_hex))
+
+
+def _pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+def build_tree(hashes: list[str]) -> tuple[str, dict[str, list[str]]]:
+    """hash_berkas (hex) -> (root hex, {hash: proof [hex sibling, dari bawah ke atas]})."""
+    by_leaf = {leaf_hash(h): h for h in hashes}
+    level = sorted(by_leaf)
+    if not level:
+        raise ValueError("batch kosong")
+    proofs: dict[bytes, list[bytes]] = {leaf: [] for leaf in level}
+    # posisi tiap leaf asli di level sekarang
+    members: list[list[bytes]] = [[leaf] for leaf in level]
+
+    while len(level) > 1:
+        next_level, next_members = [], []
+        for i in range(0, len(level), 2):
+            if i + 1 == len(level):
+                next_level.append(level[i])
+                next_members.append(members[i])
+                continue
+            left, right = level[i], level[i + 1]
+            for leaf in members[i]:
+                proofs[leaf].append(right)
+            for leaf in members[i + 1]:
+                proofs[leaf].append(left)
+            next_level.append(_pair(left, right))
+            next_members.append(members[i] + members[i + 1])
+        level, members = next_level, next_members
+
+    return level[0].hex(), {by_leaf[l]: [p.hex() for p in ps] for l, ps in proofs.items()}
+
+
+def verify_proof(hash_hex: str, proof: list[str], root_hex: str) -> bool:
+    node = leaf_hash(hash_hex)
+    for sibling in proof:
+        node = _pair(node, bytes.fromhex(sibling))
+    return node.hex() == root_hex.lower()
+
+
+def with_merkle(row: dict) -> dict:
+    """
+    Bentuk bukti batch yang sama untuk semua endpoint publik:
+    kolom batch_id / merkle_root / merkle_proof diganti 1 field `merkle`
+    ({batch_id, root, proof, scheme}, None kalau karya bukan dari batch).
+    """
+    batch_id = row.pop("batch_id", None)
+    root = row.pop("merkle_root", None)
+    proof = row.pop("merkle_proof", None)
+    row["merkle"] = (
+        {"batch_id": batch_id, "root": root, "proof": proof, "scheme": MERKLE_SCHEME}
+        if batch_id else None
+    )
+    return row
@@ -1,10 +1,19 @@
-import httpx
+from datetime import datetime, timezone
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.services.block_cache import block_cache
+
 ETHERSCAN_API = "https://sepolia.infura.io/v3/898ffde753034c058587295ccd47b683"  # optional; kalau kosong kita pakai RPC kamu sendiri
 
-async def fill_block_info(session: AsyncSession, jaringan: str, tx_hash: str, block_number: int, iso_time: str):
+async def fill_block_info(session: AsyncSession, jaringan: str, tx_hash: str, block_number: int, iso_time: Optional[str] = None):
+    # waktu blok nggak dikirim -> ambil dari block_cache (bukan fetch full block)
+    if iso_time is None:
+        info = await block_cache.get(block_number, session)
+        iso_time = datetime.fromtimestamp(info.timestamp, tz=timezone.utc).isoformat()
+
     q = text("""
       UPDATE karya
       SET block_number = :bn,
@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Mapping, Optional, Tuple
+
+
+def encode_cursor(ts: datetime, id_: Any) -> str:
+    """Cursor opaque untuk keyset pagination: (timestamp, id) -> base64url."""
+    raw = json.dumps({"t": ts.isoformat(), "i": str(id_)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + pad))
+        return datetime.fromisoformat(data["t"]), str(data["i"])
+    except Exception:
+        raise ValueError("cursor tidak valid")
+
+
+def next_cursor(rows: list[Mapping], limit: int, ts_key: str) -> Optional[str]:
+    """Cursor halaman berikutnya (None kalau sudah halaman terakhir)."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[ts_key], last["id"])
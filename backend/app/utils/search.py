@@ -0,0 +1,55 @@
+import re
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+# hex 6..64 char (boleh pakai 0x) -> bisa jadi prefix hash_berkas
+_HASH_PREFIX_RE = re.compile(r"^(0x)?([0-9a-fA-F]{6,64})$")
+
+
+def hash_prefix(qstr: str) -> Optional[str]:
+    """Return prefix hash (lowercase, tanpa 0x) kalau q kelihatan seperti hash_berkas."""
+    m = _HASH_PREFIX_RE.match(qstr.strip())
+    return m.group(2).lower() if m else None
+
+
+def hash_only(qstr: str) -> bool:
+    """Pasti hash (pakai 0x / 64 char penuh) -> judul nggak perlu dicari."""
+    m = _HASH_PREFIX_RE.match(qstr.strip())
+    return bool(m) and (m.group(1) is not None or len(m.group(2)) == 64)
+
+
+def escape_like(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search(qstr: str, alias: str = "k") -> Tuple[str, str, dict]:
+    """
+    Bangun (filter_sql, rank_sql, params) untuk search karya.
+
+    - q pasti hash (0x... / 64 char) -> `hash_berkas LIKE 'prefix%'` (btree bpchar_pattern_ops), rank 0
+    - q cuma mirip hash ("decade", "123456") -> prefix hash OR search judul,
+      yang cocok hash diurut paling atas
+    - selain itu -> full-text (kolom generated search_tsv, GIN) OR substring judul
+      (ILIKE, GIN pg_trgm); rank = ts_rank_cd + similarity judul
+    """
+    qstr = qstr.strip()
+    prefix = hash_prefix(qstr)
+    if prefix and hash_only(qstr):
+        return (
+            f"{alias}.hash_berkas LIKE :q_hash",
+            "0",
+            {"q_hash": prefix + "%"},
+        )
+
+    tsq = "websearch_to_tsquery(CAST(:q_cfg AS regconfig), :q)"
+    text_match = f"{alias}.search_tsv @@ {tsq} OR {alias}.judul ILIKE :q_like"
+    filter_sql = f"({text_match})"
+    rank_sql = f"(ts_rank_cd({alias}.search_tsv, {tsq}) + similarity({alias}.judul, :q))"
+    params = {"q": qstr, "q_cfg": settings.SEARCH_TS_CONFIG, "q_like": f"%{escape_like(qstr)}%"}
+    if prefix:
+        # OR antar index (BitmapOr btree + GIN); match hash dapat bonus rank
+        filter_sql = f"({alias}.hash_berkas LIKE :q_hash OR {text_match})"
+        rank_sql = f"(CASE WHEN {alias}.hash_berkas LIKE :q_hash THEN 10 ELSE 0 END + {rank_sql})"
+        params["q_hash"] = prefix + "%"
+    return filter_sql, rank_sql, params
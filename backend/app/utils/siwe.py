@@ -1,7 +1,5 @@
 import re
-from eth_account.messages import encode_defunct
-from eth_account import Account
-from web3 import Web3
+from eth_utils import to_checksum_address
 
 ADDR_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
 
@@ -25,6 +23,10 @@ def parse_siwe_message(msg: str) -> dict:
     }
 
 def recover_address(message: str, signature: str) -> str:
+    # eth_account berat -> baru di-import saat login pertama, bukan waktu app start
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+
     eth_message = encode_defunct(text=message)
     rec = Account.recover_message(eth_message, signature=signature)
-    return Web3.to_checksum_address(rec)
+    return to_checksum_address(rec)
@@ -5,11 +5,19 @@ pragma solidity ^0.8.20;
 contract KrearsipV2 {
     address public owner;
 
+    // registrar tambahan (selain owner) yang boleh registerWork
+    mapping(address => bool) private registrars;
+
     modifier onlyOwner() {
         require(msg.sender == owner, "not owner");
         _;
     }
 
+    modifier onlyRegistrar() {
+        require(msg.sender == owner || registrars[msg.sender], "not registrar");
+        _;
+    }
+
     constructor() {
         owner = msg.sender;
     }
@@ -19,6 +27,18 @@ contract KrearsipV2 {
         owner = newOwner;
     }
 
+    event RegistrarUpdated(address indexed registrar, bool allowed);
+
+    function setRegistrar(address registrar, bool allowed) external onlyOwner {
+        require(registrar != address(0), "zero address");
+        registrars[registrar] = allowed;
+        emit RegistrarUpdated(registrar, allowed);
+    }
+
+    function isRegistrar(address account) external view returns (bool) {
+        return account == owner || registrars[account];
+    }
+
     struct WorkInfo {
         address creator;
         address registrar;
@@ -40,7 +60,7 @@ contract KrearsipV2 {
         bytes32 fileHash,
         address creator,
         string calldata title
-    ) external onlyOwner {
+    ) external onlyRegistrar {
         require(fileHash != bytes32(0), "hash kosong");
         require(creator != address(0), "creator kosong");
         require(works[fileHash].creator == address(0), "sudah terdaftar");
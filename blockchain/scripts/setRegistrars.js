@@ -0,0 +1,39 @@
+// scripts/setRegistrars.js (ethers murni)
+// Otorisasi beberapa alamat registrar backend (REGISTRAR_ADDRESSES, dipisah koma)
+import { readFileSync } from "fs";
+import { fileURLToPath } from "url";
+import path from "path";
+import "dotenv/config";
+import { ethers } from "ethers";
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const { SEPOLIA_RPC, PRIVATE_KEY, KREARSIP_V2_ADDRESS, REGISTRAR_ADDRESSES } = process.env;
+if (!SEPOLIA_RPC || !PRIVATE_KEY) throw new Error("SEPOLIA_RPC/PRIVATE_KEY belum di .env");
+if (!KREARSIP_V2_ADDRESS || !REGISTRAR_ADDRESSES) {
+  throw new Error("KREARSIP_V2_ADDRESS/REGISTRAR_ADDRESSES belum di .env");
+}
+
+const provider = new ethers.JsonRpcProvider(SEPOLIA_RPC);
+const wallet = new ethers.Wallet(PRIVATE_KEY, provider); // harus owner kontrak
+
+const artifactPath = path.join(__dirname, "..", "artifacts", "contracts", "KrearsipV2.sol", "KrearsipV2.json");
+const { abi } = JSON.parse(readFileSync(artifactPath, "utf8"));
+
+async function main() {
+  const contract = new ethers.Contract(KREARSIP_V2_ADDRESS, abi, wallet);
+  const addrs = REGISTRAR_ADDRESSES.split(",").map((a) => a.trim()).filter(Boolean);
+
+  for (const addr of addrs) {
+    if (await contract.isRegistrar(addr)) {
+      console.log("sudah registrar:", addr);
+      continue;
+    }
+    const tx = await contract.setRegistrar(addr, true);
+    await tx.wait();
+    console.log("registrar ditambah:", addr, "tx:", tx.hash);
+  }
+}
+
+main().catch((e) => { console.error(e); process.exit(1); });
@@ -61,4 +61,106 @@ CREATE TABLE public.pengguna (
   created_at timestamp with time zone DEFAULT now(),
   updated_at timestamp with time zone DEFAULT now(),
   CONSTRAINT pengguna_pkey PRIMARY KEY (id)
-);
\ No newline at end of file
+);
+CREATE TABLE public.registrar_nonce (
+  alamat character varying NOT NULL,
+  next_nonce bigint NOT NULL,
+  gaps bigint[] NOT NULL DEFAULT '{}'::bigint[],
+  updated_at timestamp with time zone DEFAULT now(),
+  CONSTRAINT registrar_nonce_pkey PRIMARY KEY (alamat)
+);
+
+CREATE TABLE public.work_registered_event (
+  file_hash character(64) NOT NULL,
+  creator character varying NOT NULL,
+  registrar character varying NOT NULL,
+  title text,
+  registered_at timestamp with time zone NOT NULL,
+  block_number bigint NOT NULL,
+  block_hash character varying NOT NULL,
+  tx_hash character varying NOT NULL,
+  log_index integer NOT NULL,
+  CONSTRAINT work_registered_event_pkey PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX work_registered_event_file_hash_idx ON public.work_registered_event (file_hash);
+CREATE INDEX work_registered_event_block_number_idx ON public.work_registered_event (block_number);
+
+CREATE TABLE public.indexer_checkpoint (
+  nama character varying NOT NULL,
+  block_number bigint NOT NULL,
+  block_hash character varying NOT NULL,
+  updated_at timestamp with time zone DEFAULT now(),
+  CONSTRAINT indexer_checkpoint_pkey PRIMARY KEY (nama)
+);
+
+CREATE TABLE public.block_cache (
+  block_number bigint NOT NULL,
+  block_ts bigint NOT NULL,
+  block_hash character varying NOT NULL,
+  CONSTRAINT block_cache_pkey PRIMARY KEY (block_number)
+);
+
+-- keyset pagination: (ts, id) sesuai ORDER BY list endpoint
+CREATE INDEX karya_updated_at_id_idx ON public.karya (updated_at DESC, id DESC);
+CREATE INDEX karya_pengguna_updated_at_id_idx ON public.karya (pengguna_id, updated_at DESC, id DESC);
+CREATE INDEX karya_created_at_id_idx ON public.karya (created_at DESC, id DESC);
+CREATE INDEX karya_status_onchain_created_at_id_idx ON public.karya (status, status_onchain, created_at DESC, id DESC);
+CREATE INDEX karya_public_updated_at_id_idx ON public.karya (updated_at DESC, id DESC)
+  WHERE status = 'terverifikasi'::status_karya AND block_number IS NOT NULL;
+
+-- search karya: full-text (generated tsvector, config = settings.SEARCH_TS_CONFIG),
+-- trigram untuk ILIKE '%..%' di judul, dan prefix hash_berkas
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE public.karya
+  ADD COLUMN search_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(judul, ''))) STORED;
+CREATE INDEX karya_search_tsv_idx ON public.karya USING gin (search_tsv);
+CREATE INDEX karya_judul_trgm_idx ON public.karya USING gin (judul gin_trgm_ops);
+CREATE INDEX karya_hash_berkas_prefix_idx ON public.karya (hash_berkas bpchar_pattern_ops);
+
+-- nonce SIWE di DB (settings.NONCE_STORE = "db")
+CREATE INDEX auth_nonce_wallet_expired_idx ON public.auth_nonce (alamat_wallet, expired_at);
+CREATE INDEX auth_nonce_expired_at_idx ON public.auth_nonce (expired_at);
+
+-- batch anchoring Merkle (settings.DEPLOY_MODE = "merkle")
+CREATE TABLE public.batch_anchor (
+  id uuid NOT NULL DEFAULT gen_random_uuid(),
+  merkle_root character(64) NOT NULL CHECK (merkle_root ~ '^[0-9a-f]{64}$'::text),
+  leaf_count integer NOT NULL,
+  label character varying NOT NULL,
+  tx_hash character varying CHECK (tx_hash IS NULL OR tx_hash::text ~ '^0x[0-9a-f]{64}$'::text),
+  created_at timestamp with time zone DEFAULT now(),
+  CONSTRAINT batch_anchor_pkey PRIMARY KEY (id),
+  CONSTRAINT batch_anchor_merkle_root_key UNIQUE (merkle_root)
+);
+ALTER TABLE public.karya
+  ADD COLUMN batch_id uuid REFERENCES public.batch_anchor(id),
+  ADD COLUMN merkle_proof jsonb;
+CREATE INDEX karya_batch_id_idx ON public.karya (batch_id);
+
+-- tx registerWork yang dibroadcast (nonce + fee + argumen) untuk replacement tx nyangkut
+CREATE TABLE public.registrar_tx (
+  tx_hash character varying NOT NULL CHECK (tx_hash::text ~ '^0x[0-9a-f]{64}$'::text),
+  sender character varying NOT NULL,
+  nonce bigint NOT NULL,
+  max_fee bigint NOT NULL,
+  priority_fee bigint NOT NULL,
+  gas bigint NOT NULL,
+  file_hash character(64) NOT NULL,
+  title character varying NOT NULL,
+  creator character varying NOT NULL,
+  sent_block bigint,
+  replaces character varying,
+  replaced_by character varying,
+  replacements integer NOT NULL DEFAULT 0,
+  created_at timestamp with time zone DEFAULT now(),
+  CONSTRAINT registrar_tx_pkey PRIMARY KEY (tx_hash)
+);
+CREATE INDEX registrar_tx_sender_nonce_idx ON public.registrar_tx (sender, nonce);
+CREATE INDEX registrar_tx_open_idx ON public.registrar_tx (sent_block) WHERE replaced_by IS NULL;
+
+-- receipt watcher: tx yang belum ada receipt dirotasi (yang paling lama nggak dicek duluan)
+ALTER TABLE public.karya
+  ADD COLUMN receipt_checked_at timestamp with time zone;
+CREATE INDEX karya_receipt_pending_idx ON public.karya (receipt_checked_at NULLS FIRST, tx_hash)
+  WHERE status_onchain = 'menunggu'::status_onchain AND tx_hash IS NOT NULL;